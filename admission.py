@@ -0,0 +1,126 @@
+"""
+手动请求的准入控制
+/get_news 每次都要获取、绘制并发送早报，群内刷屏或多个群同时请求时会在事件循环与绘制线程上堆积任务：
+- 冷却：同一用户、同一会话在冷却时间内的重复请求直接拒绝
+- 并发上限：同时处理的手动请求达到上限时拒绝新请求，而不是排队等待
+- 请求合并：相同的工作（获取当期早报、绘制同一期同一档位的图片）进行中时，后来的请求等待同一个结果
+"""
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+@dataclass
+class AdmissionStats:
+    """手动请求计数，供 /get_status 展示"""
+
+    admitted: int = 0
+    rejected_cooldown: int = 0
+    rejected_busy: int = 0
+    collapsed: int = 0  # 与进行中的相同工作合并的次数
+    cached: int = 0  # 直接使用最近获取的早报、未访问网络的次数
+
+    def summary(self) -> str:
+        return (
+            f"受理 {self.admitted} / 冷却拒绝 {self.rejected_cooldown} / 繁忙拒绝 {self.rejected_busy} / "
+            f"合并 {self.collapsed} / 缓存 {self.cached}"
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Rejection:
+    """
+    拒绝原因：cooldown（冷却中）或 busy（并发已满）
+    notify 为 False 时表示冷却期内已经提示过该用户，不必再回复，避免刷屏的请求换来刷屏的提示
+    """
+
+    reason: str
+    retry_after: float = 0.0
+    notify: bool = True
+
+    @property
+    def message(self) -> str:
+        """回复给用户的提示"""
+        if self.reason == "cooldown":
+            return f"⏳ 请求过于频繁，请 {int(self.retry_after) + 1} 秒后再试"
+        return "⏳ 当前获取早报的请求较多，请稍后再试"
+
+
+class AdmissionController:
+    """手动请求的冷却、并发上限与请求合并；只在事件循环线程中使用，无需加锁"""
+
+    def __init__(
+        self,
+        user_cooldown: float = 0,
+        group_cooldown: float = 0,
+        max_concurrent: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.user_cooldown = max(0.0, float(user_cooldown))
+        self.group_cooldown = max(0.0, float(group_cooldown))
+        self.max_concurrent = max(0, int(max_concurrent))  # 0 表示不限制
+        self.active = 0
+        self.stats = AdmissionStats()
+        self._clock = clock
+        self._user_until: Dict[str, float] = {}
+        self._group_until: Dict[str, float] = {}
+        self._notified_until: Dict[str, float] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def _prune(self, now: float) -> None:
+        """清理已过期的冷却记录，使记录数只与冷却期内的请求者数量有关"""
+        for records in (self._user_until, self._group_until, self._notified_until):
+            expired = [key for key, until in records.items() if until <= now]
+            for key in expired:
+                del records[key]
+
+    def try_acquire(self, user_id: str, group_id: str) -> Optional[Rejection]:
+        """尝试受理一个手动请求，受理时返回 None（处理完后需调用 release），否则返回拒绝原因"""
+        now = self._clock()
+        self._prune(now)
+
+        until = max(self._user_until.get(user_id, 0.0), self._group_until.get(group_id, 0.0))
+        if until > now:
+            self.stats.rejected_cooldown += 1
+            notify_key = user_id or group_id
+            notify = notify_key not in self._notified_until
+            if notify:
+                self._notified_until[notify_key] = until
+            return Rejection("cooldown", until - now, notify)
+        if self.max_concurrent and self.active >= self.max_concurrent:
+            self.stats.rejected_busy += 1
+            return Rejection("busy")
+
+        self.active += 1
+        self.stats.admitted += 1
+        if user_id and self.user_cooldown:
+            self._user_until[user_id] = now + self.user_cooldown
+        if group_id and self.group_cooldown:
+            self._group_until[group_id] = now + self.group_cooldown
+        return None
+
+    def release(self) -> None:
+        self.active = max(0, self.active - 1)
+
+    async def collapse(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        相同 key 的工作进行中时等待其结果，否则启动新的工作
+        工作本身不会因某个等待者被取消而中断，其他等待者仍能拿到结果
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.collapsed += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(factory())
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # 所有等待者都已取消时，避免事件循环报告“异常未被获取”
+            future.exception()
@@ -0,0 +1,386 @@
+"""
+离线推送压测
+不连接真实机器人与真实 60s 接口，测量推送吞吐：
+- FakeContext：按平台前缀模拟 send_message 的延迟与失败
+- 本地 aiohttp 服务模拟 60s 镜像：正常、缓慢、HTTP 500、非法 JSON、缺少字段
+- 虚拟时钟事件循环：事件循环空闲时直接跳到下一个定时器，逐群推送的 1 秒间隔、
+  发送延迟与 daily_task 的跨天等待都不占用真实时间
+
+分别测量 send_daily_news（推送总耗时、各群送达延迟 p50/p99、峰值内存）、
+/get_news 突发请求（准入控制计数、接口请求次数）与 daily_task（虚拟时间下的定时触发）
+
+需要在安装了 AstrBot 的 Python 环境中运行（插件依赖 astrbot.api），例如在插件目录下：
+    python benchmarks/push_load.py --groups 10 100 1000
+"""
+import os
+import sys
+import time
+import types
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import datetime
+import importlib
+import selectors
+import tempfile
+import tracemalloc
+from collections import Counter
+from typing import Dict, List
+
+from aiohttp import web
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 平台前缀 -> (平均发送延迟秒, 延迟标准差秒, 失败率)
+PLATFORMS = {
+    "aiocqhttp": (0.08, 0.04, 0.01),
+    "telegram": (0.25, 0.10, 0.02),
+    "qq_official": (0.15, 0.05, 0.05),
+}
+# 事件循环空闲时先真实等待的时间，给本机回环连接上的 I/O 到达的机会，再跳过虚拟时间
+REAL_IO_GRACE = 0.005
+# 模拟镜像的请求顺序：前几个都会失败（缓慢镜像超过插件的读取超时），最后一个正常
+MIRROR_KINDS = ("malformed", "fail", "partial", "slow", "ok")
+SLOW_MIRROR_DELAY = 15.0
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    loop = None
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        if self.loop.executor_jobs:
+            # 线程池中的绘制/解析等真实工作未完成时不能跳过时间
+            return super().select(timeout)
+        grace = REAL_IO_GRACE if timeout is None else min(timeout, REAL_IO_GRACE)
+        events = super().select(grace)
+        if events or timeout is None:
+            return events or super().select(None)
+        self.loop.offset += timeout - grace
+        return []
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """没有就绪的 I/O 与线程池任务时，时间直接跳到下一个定时器到期"""
+
+    def __init__(self):
+        selector = _VirtualSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self.offset = 0.0
+        self.executor_jobs = 0
+
+    def time(self) -> float:
+        return super().time() + self.offset
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_jobs += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, _future) -> None:
+        self.executor_jobs -= 1
+
+
+def virtual_datetime_module(loop: VirtualClockLoop, start: datetime.datetime) -> types.ModuleType:
+    """datetime 模块的替身：datetime.now() 从 start 开始随虚拟时钟前进，供 daily_task 计算等待时间"""
+    origin = loop.time()
+
+    class VirtualDateTime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return start + datetime.timedelta(seconds=loop.time() - origin)
+
+    module = types.ModuleType("datetime")
+    module.__dict__.update(datetime.__dict__)
+    module.datetime = VirtualDateTime
+    return module
+
+
+class FakeContext:
+    """模拟 AstrBot Context：按平台前缀模拟发送延迟与失败，记录每个会话最后一次送达的虚拟时间"""
+
+    def __init__(self, loop: VirtualClockLoop, rng: random.Random):
+        self.loop = loop
+        self.rng = rng
+        self.delivered: Dict[str, float] = {}
+        self.sent = 0
+        self.failed = 0
+
+    def reset(self) -> None:
+        self.delivered.clear()
+        self.sent = self.failed = 0
+
+    async def send_message(self, origin: str, message_chain) -> bool:
+        mean, stddev, failure_rate = PLATFORMS.get(origin.split(":", 1)[0], (0.1, 0.05, 0.01))
+        await asyncio.sleep(max(0.0, self.rng.gauss(mean, stddev)))
+        if self.rng.random() < failure_rate:
+            self.failed += 1
+            if self.rng.random() < 0.5:
+                raise ConnectionError("模拟的平台发送失败")
+            return False
+        self.sent += 1
+        self.delivered[origin] = self.loop.time()
+        return True
+
+
+class FakeEvent:
+    """/get_news 用到的 AstrMessageEvent 接口"""
+
+    def __init__(self, origin: str, sender_id: str):
+        self.unified_msg_origin = origin
+        self.sender_id = sender_id
+
+    def get_sender_id(self) -> str:
+        return self.sender_id
+
+    def plain_result(self, text: str) -> str:
+        return text
+
+    def stop_event(self) -> None:
+        pass
+
+
+class MockMirrors:
+    """本地 60s 镜像：/ok 正常、/slow 超过读取超时、/fail HTTP 500、/malformed 非法 JSON、/partial 缺少 news"""
+
+    def __init__(self, date: str, news_count: int = 15):
+        self.payload = {
+            "date": date,
+            "news": [f"第{i}条模拟新闻：" + "用于压测的新闻正文，" * (2 + i % 4) for i in range(1, news_count + 1)],
+            "tip": "压测数据，与真实早报无关。",
+        }
+        self.requests: Counter = Counter()
+        self._runner = None
+        self.base_url = ""
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{kind}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def urls(self) -> List[str]:
+        return [f"{self.base_url}/{kind}" for kind in MIRROR_KINDS]
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        kind = request.match_info["kind"]
+        self.requests[kind] += 1
+        if kind == "fail":
+            return web.Response(status=500)
+        if kind == "malformed":
+            return web.Response(body=b'{"data": {"date": ', content_type="application/json")
+        if kind == "partial":
+            return web.json_response({"data": {"date": self.payload["date"]}})
+        if kind == "slow":
+            await asyncio.sleep(SLOW_MIRROR_DELAY)
+        return web.json_response({"code": 200, "data": self.payload})
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_memory_mb() -> str:
+    """tracemalloc 统计的 Python 对象峰值，以及进程 RSS 峰值（Pillow 的像素缓冲不在 tracemalloc 统计内）"""
+    traced = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    if resource is None:
+        return f"{traced:.1f}MB"
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+    return f"{traced:.1f}MB / rss {rss_mb:.0f}MB"
+
+
+def make_groups(count: int) -> List[str]:
+    platforms = list(PLATFORMS)
+    return [f"{platforms[i % len(platforms)]}:GroupMessage:{100000 + i}" for i in range(count)]
+
+
+class Harness:
+    def __init__(self, main_module, loop: VirtualClockLoop, mirrors: MockMirrors, seed: int, text: bool):
+        self.main = main_module
+        self.loop = loop
+        self.mirrors = mirrors
+        self.rng = random.Random(seed)
+        self.text = text
+        self.context = FakeContext(loop, self.rng)
+        self._data_root = tempfile.mkdtemp(prefix="morning_news_bench_")
+        self._data_dir = self._data_root
+        self._plugins = 0
+        # 存档、字体子集缓存、用户模板目录都来自 config.get_plugin_data_dir（main 按名字导入了一份），
+        # 两处都替换，压测不会写入真实的插件数据目录
+        config_module = importlib.import_module(f"{main_module.__package__}.config")
+        config_module.get_plugin_data_dir = main_module.get_plugin_data_dir = lambda: self._data_dir
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self._data_root, ignore_errors=True)
+
+    def make_plugin(self, groups: List[str], **extra):
+        """
+        每个插件实例使用独立的数据目录，存档与图片缓存互不影响
+        字体子集缓存与模板注册表在进程内只创建一次，位于第一个实例的数据目录中，同样在临时目录内
+        """
+        self._plugins += 1
+        self._data_dir = os.path.join(self._data_root, str(self._plugins))
+        os.makedirs(self._data_dir, exist_ok=True)
+        config = {
+            "target_groups": groups,
+            "news_api_urls": self.mirrors.urls(),
+            "health_check_interval": 0,
+            "show_text_news": self.text,
+            "push_time": "08:00",
+        }
+        config.update(extra)
+        return self.main.DailyNewsPlugin(self.context, config)
+
+    async def run_push(self, group_count: int) -> None:
+        plugin = self.make_plugin(make_groups(group_count))
+        await plugin.terminate()  # 只测量一次推送，不让定时任务参与
+        self.context.reset()
+        self.mirrors.requests.clear()
+        tracemalloc.reset_peak()
+        real_start = time.perf_counter()
+        start = self.loop.time()
+        await plugin.send_daily_news()
+        duration = self.loop.time() - start
+        latencies = [at - start for at in self.context.delivered.values()]
+        print(
+            f"push  groups={group_count:<5} duration={duration:8.1f}s(virtual) real={time.perf_counter() - real_start:6.2f}s "
+            f"delivered={len(self.context.delivered)}/{group_count} failed_sends={self.context.failed} "
+            f"p50={percentile(latencies, 50):7.1f}s p99={percentile(latencies, 99):7.1f}s "
+            f"mirror_requests={dict(self.mirrors.requests)} peak={peak_memory_mb()}"
+        )
+
+    async def run_burst(self, requests: int, group_count: int) -> None:
+        """突发的 /get_news：请求在 2 秒内随机到达，用户与会话有重复，触发冷却、并发上限与请求合并"""
+        groups = make_groups(group_count)
+        plugin = self.make_plugin(groups)
+        await plugin.terminate()
+        self.context.reset()
+        self.mirrors.requests.clear()
+        tracemalloc.reset_peak()
+        users = [f"user{i}" for i in range(max(1, requests // 2))]
+        latencies: List[float] = []
+
+        async def one_request() -> None:
+            await asyncio.sleep(self.rng.uniform(0, 2))
+            event = FakeEvent(self.rng.choice(groups), self.rng.choice(users))
+            issued = self.loop.time()
+            async for _ in plugin.manual_get_news(event, "image"):
+                pass
+            latencies.append(self.loop.time() - issued)
+
+        real_start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        print(
+            f"burst requests={requests:<4} real={time.perf_counter() - real_start:6.2f}s "
+            f"p50={percentile(latencies, 50):6.1f}s p99={percentile(latencies, 99):6.1f}s "
+            f"sent={self.context.sent} mirror_requests={dict(self.mirrors.requests)} peak={peak_memory_mb()}\n"
+            f"      admission: {plugin.admission.stats.summary()}"
+        )
+
+    async def run_daily(self, group_count: int, days: int) -> None:
+        """在虚拟时间中从 07:50 开始运行 daily_task，记录每次定时推送的触发时间与耗时"""
+        start_at = datetime.datetime.combine(datetime.date.today(), datetime.time(7, 50))
+        original_datetime = self.main.datetime
+        self.main.datetime = virtual_datetime_module(self.loop, start_at)
+        origin = self.loop.time()
+        pushes = []
+        finished = asyncio.Event()
+        try:
+            plugin = self.make_plugin(make_groups(group_count))
+            send_daily_news = plugin.send_daily_news
+
+            async def timed_send():
+                began = self.loop.time()
+                await send_daily_news()
+                pushes.append((began, self.loop.time()))
+                if len(pushes) >= days:
+                    finished.set()
+
+            plugin.send_daily_news = timed_send
+            plugin._ensure_daily_task_started()
+            real_start = time.perf_counter()
+            await finished.wait()
+            await plugin.terminate()
+        finally:
+            self.main.datetime = original_datetime
+        for began, ended in pushes:
+            fired = start_at + datetime.timedelta(seconds=began - origin)
+            print(f"daily groups={group_count:<5} fired_at={fired:%Y-%m-%d %H:%M:%S}(virtual) duration={ended - began:7.1f}s")
+        print(f"daily real={time.perf_counter() - real_start:6.2f}s for {days} scheduled pushes")
+
+
+def load_plugin_module():
+    """以包的形式导入插件（main.py 使用相对导入）"""
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+    try:
+        return importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.main")
+    except ImportError as e:
+        sys.exit(f"无法导入插件（需要在安装了 AstrBot 的环境中运行）: {e}")
+
+
+async def run(args, loop: VirtualClockLoop) -> None:
+    main_module = load_plugin_module()
+    if not args.verbose:
+        main_module.logger.setLevel(logging.CRITICAL)
+    mirrors = MockMirrors(datetime.date.today().isoformat())
+    await mirrors.start()
+    tracemalloc.start()
+    harness = Harness(main_module, loop, mirrors, args.seed, args.text)
+    try:
+        for count in args.groups:
+            await harness.run_push(count)
+        if args.burst:
+            await harness.run_burst(args.burst, min(args.groups))
+        if args.days:
+            await harness.run_daily(min(args.groups), args.days)
+    finally:
+        tracemalloc.stop()
+        harness.cleanup()
+        await mirrors.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="每日早报插件离线推送压测")
+    parser.add_argument("--groups", type=int, nargs="+", default=[10, 100, 1000], help="推送的群组数量，可指定多个")
+    parser.add_argument("--burst", type=int, default=50, help="/get_news 突发请求数，0 为跳过")
+    parser.add_argument("--days", type=int, default=2, help="daily_task 运行的定时推送次数，0 为跳过")
+    parser.add_argument("--text", action="store_true", help="同时发送文字早报")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子（发送延迟、失败与请求到达时间）")
+    parser.add_argument("--verbose", action="store_true", help="输出插件日志")
+    args = parser.parse_args()
+
+    loop = VirtualClockLoop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(run(args, loop))
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
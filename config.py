@@ -1,3 +1,97 @@
 import os
+import json
+from typing import Optional
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_NAME = "astrbot_plugin_morning_news"
+
+# 按整数读取的配置项及其默认值（与 _conf_schema.json 一致）；热更新时先校验，无效的值不应用，保持原值
+INT_SETTINGS = {
+    "stale_refresh_window": 120,
+    "update_check_window": 180,
+    "health_check_interval": 600,
+    "image_page_height": 0,
+    "image_page_max_kb": 0,
+    "manual_cache_ttl": 300,
+    "archive_max_days": 30,
+    "memory_budget_mb": 0,
+    "manual_user_cooldown": 10,
+    "manual_group_cooldown": 0,
+    "manual_max_concurrent": 3,
+    "config_watch_interval": 10,
+}
+
+
+def get_plugin_data_dir() -> str:
+    """
+    插件持久化数据目录
+    优先使用 AstrBot 提供的 data/plugin_data/<插件名>（插件更新时不会被覆盖），
+    独立运行（如命令行渲染）时回退到插件目录下的 data/
+    """
+    try:
+        from astrbot.api.star import StarTools
+
+        path = str(StarTools.get_data_dir(PLUGIN_NAME))
+    except Exception:
+        path = os.path.join(CURRENT_DIR, "data")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def int_setting(config: dict, key: str, minimum: int = 0) -> int:
+    """按整数读取配置项，未填写（缺失、null 或空字符串）时使用默认值；无法转换时抛出 ValueError 或 TypeError"""
+    value = config.get(key)
+    if value is None or value == "":
+        value = INT_SETTINGS[key]
+    return max(minimum, int(value))
+
+
+def invalid_settings(config: dict) -> dict:
+    """返回无法按整数读取的配置项及其值"""
+    invalid = {}
+    for key in INT_SETTINGS:
+        try:
+            int_setting(config, key)
+        except (TypeError, ValueError):
+            invalid[key] = config.get(key)
+    return invalid
+
+
+class ConfigWatcher:
+    """
+    监视 AstrBot 保存的插件配置文件（data/config/<插件名>_config.json）
+    只比较文件的修改时间与大小，未变化时不读取；内容与上次应用的配置不同时返回新配置，
+    应用成功后调用 commit 记录，未记录的变化下次检查时重新返回
+    """
+
+    def __init__(self, path: str, snapshot: dict):
+        self.path = path
+        self.snapshot = snapshot
+        self._stamp = self._stat()
+        self._pending_stamp = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> Optional[dict]:
+        """检查一次配置文件，无变化返回 None；文件内容不完整（正在写入）时抛出 ValueError，下次检查时重试"""
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return None
+        with open(self.path, "r", encoding="utf-8-sig") as f:
+            config = json.load(f)
+        if not isinstance(config, dict) or config == self.snapshot:
+            self._stamp = stamp
+            return None
+        self._pending_stamp = stamp
+        return config
+
+    def commit(self, config: dict) -> None:
+        """记录 poll 返回的配置已应用"""
+        self.snapshot = config
+        if self._pending_stamp is not None:
+            self._stamp, self._pending_stamp = self._pending_stamp, None
@@ -0,0 +1,380 @@
+"""
+多实例协调
+多个 AstrBot 副本共用同一份配置时，每个副本的定时任务都会在推送时间触发并推送全部群组。
+配置协调后端后，各节点通过共享存储上的 SQLite 租约协调每个推送时段（如 '2025-01-01 08:00'）：
+- 第一个到达的节点成为该时段的 leader，按在线节点数把目标群组分成若干分片
+- 各节点领取分片并行推送，每推送一个群组续租一次并记录已送达的群组
+- 节点推送完自己的分片后立即返回，不等待其他节点；节点失联（租约过期）后，
+  其他节点的心跳任务接管其未完成的分片，跳过已送达的群组
+  （节点恰好在发送成功、记录送达之前崩溃时，该群组会被接管节点再推送一次）
+数据库文件需放在各节点都能访问、且文件锁可靠的存储上；节点之间的时钟应保持同步
+
+直接运行本文件可在单机上用多个进程演示协调过程（含节点中途崩溃后的接管）：
+    python coordination.py --nodes 3 --groups 90 --crash-after 5
+"""
+import os
+import json
+import time
+import socket
+import asyncio
+import sqlite3
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+DEFAULT_LEASE = 60.0  # 分片租约（秒）：推送中的节点失联超过该时长后，分片可被其他节点接管
+TAKEOVER_WINDOW = 6 * 3600  # 推送时段开始后，心跳任务为其接管失联节点分片的最长时间（秒）
+SLOT_RETENTION_DAYS = 7  # 推送时段记录的保留天数
+NODE_TTL_LEASES = 3  # 节点心跳有效期为租约的倍数，超过后不再计入在线节点
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (node_id TEXT PRIMARY KEY, expires_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS slots (slot TEXT PRIMARY KEY, leader TEXT NOT NULL, created_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS shards (
+    slot TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    groups TEXT NOT NULL,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (slot, shard)
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    slot TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    node_id TEXT NOT NULL,
+    delivered_at REAL NOT NULL,
+    PRIMARY KEY (slot, group_id)
+);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    """一个推送时段中由某个节点负责的一组群组"""
+
+    slot: str
+    index: int
+    groups: Tuple[str, ...]
+    delivered: FrozenSet[str] = frozenset()  # 此前的负责节点已送达的群组
+
+    @property
+    def remaining(self) -> List[str]:
+        return [group_id for group_id in self.groups if group_id not in self.delivered]
+
+
+class Coordinator:
+    """
+    协调后端接口，方法均为同步调用（插件在线程中调用）
+    未配置协调时插件不使用协调器，每个节点推送全部群组
+    """
+
+    kind = ""
+    node_id: str
+    lease: float
+
+    def heartbeat(self) -> None:
+        """登记本节点在线，用于 leader 按在线节点数划分分片"""
+        raise NotImplementedError
+
+    def leave(self) -> None:
+        """插件停用时注销本节点"""
+        raise NotImplementedError
+
+    def open_slot(self, slot: str, groups: Sequence[str]) -> bool:
+        """创建推送时段并划分分片；时段已由其他节点创建时返回 False"""
+        raise NotImplementedError
+
+    def claim_shard(self, slot: str) -> Optional[Shard]:
+        """领取一个无人负责或租约已过期的未完成分片，没有可领取的分片时返回 None"""
+        raise NotImplementedError
+
+    def record(self, shard: Shard, group_id: str, delivered: bool) -> bool:
+        """记录一个群组的推送结果并续租；分片已被其他节点接管时返回 False"""
+        raise NotImplementedError
+
+    def finish_shard(self, shard: Shard) -> None:
+        raise NotImplementedError
+
+    def pending_shards(self, slot: str) -> int:
+        """时段内尚未完成的分片数"""
+        raise NotImplementedError
+
+    def live_nodes(self) -> int:
+        raise NotImplementedError
+
+
+class SqliteCoordinator(Coordinator):
+    """基于共享 SQLite 文件的协调后端，每次操作在一个 BEGIN IMMEDIATE 事务中完成"""
+
+    kind = "sqlite"
+
+    def __init__(self, path: str, node_id: str, lease: float = DEFAULT_LEASE, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.node_id = node_id
+        self.lease = float(lease)
+        self._clock = clock  # 跨机器比较租约，必须使用墙上时钟
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def heartbeat(self) -> None:
+        expires_at = self._clock() + self.lease * NODE_TTL_LEASES
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO nodes (node_id, expires_at) VALUES (?, ?)", (self.node_id, expires_at))
+
+    def leave(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM nodes WHERE node_id = ?", (self.node_id,))
+
+    def live_nodes(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM nodes WHERE expires_at > ?", (self._clock(),)).fetchone()[0]
+
+    def open_slot(self, slot: str, groups: Sequence[str]) -> bool:
+        now = self._clock()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM slots WHERE slot = ?", (slot,)).fetchone():
+                return False
+            live = conn.execute("SELECT COUNT(*) FROM nodes WHERE expires_at > ?", (now,)).fetchone()[0]
+            # 分片数取在线节点数（至少 1 个），按配置顺序轮流分配，使各分片的群组数相差不超过 1
+            count = max(1, min(live, len(groups)))
+            buckets: List[List[str]] = [[] for _ in range(count)]
+            for i, group_id in enumerate(groups):
+                buckets[i % count].append(group_id)
+            conn.execute("INSERT INTO slots (slot, leader, created_at) VALUES (?, ?, ?)", (slot, self.node_id, now))
+            conn.executemany(
+                "INSERT INTO shards (slot, shard, groups) VALUES (?, ?, ?)",
+                [(slot, i, json.dumps(bucket, ensure_ascii=False)) for i, bucket in enumerate(buckets)],
+            )
+            # 顺带清理过期的时段与节点记录
+            cutoff = now - SLOT_RETENTION_DAYS * 86400
+            conn.execute("DELETE FROM slots WHERE created_at < ?", (cutoff,))
+            conn.execute("DELETE FROM shards WHERE slot NOT IN (SELECT slot FROM slots)")
+            conn.execute("DELETE FROM deliveries WHERE slot NOT IN (SELECT slot FROM slots)")
+            conn.execute("DELETE FROM nodes WHERE expires_at < ?", (cutoff,))
+            return True
+
+    def claim_shard(self, slot: str) -> Optional[Shard]:
+        now = self._clock()
+        with self._transaction() as conn:
+            # 优先领取无人负责的分片，其次接管租约已过期的分片
+            row = conn.execute(
+                "SELECT shard, groups FROM shards WHERE slot = ? AND done = 0 AND (owner IS NULL OR lease_until < ?) "
+                "ORDER BY owner IS NOT NULL, shard LIMIT 1",
+                (slot, now),
+            ).fetchone()
+            if row is None:
+                return None
+            index, groups = row[0], tuple(json.loads(row[1]))
+            conn.execute(
+                "UPDATE shards SET owner = ?, lease_until = ? WHERE slot = ? AND shard = ?",
+                (self.node_id, now + self.lease, slot, index),
+            )
+            delivered = {r[0] for r in conn.execute("SELECT group_id FROM deliveries WHERE slot = ?", (slot,))}
+        return Shard(slot, index, groups, frozenset(delivered.intersection(groups)))
+
+    def record(self, shard: Shard, group_id: str, delivered: bool) -> bool:
+        now = self._clock()
+        with self._transaction() as conn:
+            if delivered:
+                conn.execute(
+                    "INSERT OR IGNORE INTO deliveries (slot, group_id, node_id, delivered_at) VALUES (?, ?, ?, ?)",
+                    (shard.slot, group_id, self.node_id, now),
+                )
+            cursor = conn.execute(
+                "UPDATE shards SET lease_until = ? WHERE slot = ? AND shard = ? AND owner = ? AND done = 0",
+                (now + self.lease, shard.slot, shard.index, self.node_id),
+            )
+            return cursor.rowcount > 0
+
+    def finish_shard(self, shard: Shard) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shards SET done = 1 WHERE slot = ? AND shard = ? AND owner = ?",
+                (shard.slot, shard.index, self.node_id),
+            )
+
+    def pending_shards(self, slot: str) -> int:
+        with self._transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM shards WHERE slot = ? AND done = 0", (slot,)).fetchone()[0]
+
+
+COORDINATOR_TYPES: Dict[str, type] = {"sqlite": SqliteCoordinator}
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def build_coordinator(spec: str) -> Coordinator:
+    """
+    解析协调配置: '类型:目标|lease=60|node=节点名'，如 'sqlite:/mnt/shared/morning_news.db|lease=60'
+    node 省略时使用 '主机名-进程号'
+    """
+    head, *options = spec.split("|")
+    kind, sep, target = head.strip().partition(":")
+    if not sep or not target.strip():
+        raise ValueError(f"协调配置格式错误: {spec} (应为 '类型:目标')")
+    coordinator_cls = COORDINATOR_TYPES.get(kind.strip())
+    if coordinator_cls is None:
+        raise ValueError(f"未知的协调后端: {kind}，可选: {', '.join(COORDINATOR_TYPES)}")
+    values = {}
+    for option in options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"协调参数格式错误: {option} (应为 key=value)")
+        values[key.strip()] = value.strip()
+    unknown = set(values) - {"lease", "node"}
+    if unknown:
+        raise ValueError(f"未知的协调参数: {', '.join(sorted(unknown))}")
+    lease = float(values.get("lease", DEFAULT_LEASE))
+    if lease <= 0:
+        raise ValueError(f"lease 应大于 0: {lease}")
+    return coordinator_cls(target.strip(), values.get("node") or default_node_id(), lease=lease)
+
+
+# push(groups, after_group)：推送给定群组，每个群组完成后调用 after_group(群组ID, 是否送达)，返回 False 时应停止推送
+PushFunc = Callable[[List[str], Callable[[str, bool], Awaitable[bool]]], Awaitable[None]]
+
+
+async def takeover_shards(coordinator: Coordinator, slot: str, push: PushFunc, logger) -> int:
+    """
+    领取并推送时段内所有可领取的分片（无人负责或租约已过期），没有可领取的分片时立即返回
+    返回本节点送达的群组数
+    """
+    delivered_count = 0
+    while True:
+        shard = await asyncio.to_thread(coordinator.claim_shard, slot)
+        if shard is None:
+            return delivered_count
+        remaining = shard.remaining
+        logger.info(
+            f"[每日早报] 节点 {coordinator.node_id} 领取推送时段 {slot} 的分片 {shard.index}，"
+            f"待推送 {len(remaining)}/{len(shard.groups)} 个群组"
+        )
+        lease_lost = False
+
+        async def after_group(group_id: str, delivered: bool) -> bool:
+            nonlocal delivered_count, lease_lost
+            delivered_count += delivered
+            if not await asyncio.to_thread(coordinator.record, shard, group_id, delivered):
+                lease_lost = True
+            return not lease_lost
+
+        if remaining:
+            await push(remaining, after_group)
+        if lease_lost:
+            logger.warning(f"[每日早报] 分片 {shard.index} 的租约已被其他节点接管，停止推送该分片")
+        else:
+            await asyncio.to_thread(coordinator.finish_shard, shard)
+
+
+async def run_slot(
+    coordinator: Coordinator, slot: str, groups: Sequence[str], push: PushFunc, logger, takeover_wait: float = 0
+) -> int:
+    """
+    参与一个推送时段：创建（或加入）时段，领取分片推送，直到没有可领取的分片，返回本节点送达的群组数
+    其他节点仍持有租约未过期的分片时不等待它们完成：takeover_wait 为 0 时立即返回，
+    由调用方定期调用 takeover_shards 接管失联节点的分片（插件在心跳任务中进行）；
+    大于 0 时最多再等待该时长，期间租约过期的分片直接接管（演示与测试中使用，约为租约的 2 倍）
+    """
+    if await asyncio.to_thread(coordinator.open_slot, slot, list(groups)):
+        logger.info(f"[每日早报] 节点 {coordinator.node_id} 创建推送时段 {slot} 并划分分片")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + takeover_wait
+    delivered_count = await takeover_shards(coordinator, slot, push, logger)
+    while loop.time() < deadline and await asyncio.to_thread(coordinator.pending_shards, slot):
+        await asyncio.sleep(min(coordinator.lease / 2, max(0.0, deadline - loop.time())))
+        delivered_count += await takeover_shards(coordinator, slot, push, logger)
+    return delivered_count
+
+
+# --- 单机多进程演示 ---
+
+
+def _demo_node(path: str, node_id: str, groups: List[str], start_at: float, lease: float, crash_after: int, sent_log: str):
+    coordinator = SqliteCoordinator(path, node_id, lease=lease)
+    coordinator.heartbeat()
+    time.sleep(max(0.0, start_at - time.time()))
+    logger = logging.getLogger(node_id)
+
+    async def push(targets: List[str], after_group) -> None:
+        for count, group_id in enumerate(targets, 1):
+            await asyncio.sleep(0.05)  # 模拟发送耗时
+            with open(sent_log, "a", encoding="utf-8") as f:
+                f.write(f"{node_id} {group_id}\n")
+            if not await after_group(group_id, True):
+                return
+            if crash_after and count >= crash_after:
+                os._exit(1)  # 模拟节点在推送中途崩溃，不再续租也不标记分片完成
+
+    delivered = asyncio.run(run_slot(coordinator, "demo", groups, push, logger, takeover_wait=2 * lease))
+    logger.info(f"[每日早报] 节点 {node_id} 送达 {delivered} 个群组")
+
+
+def _run_demo() -> None:
+    import argparse
+    import tempfile
+    import multiprocessing
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description="单机多进程演示多实例协调")
+    parser.add_argument("--nodes", type=int, default=3, help="节点（进程）数")
+    parser.add_argument("--groups", type=int, default=90, help="目标群组数")
+    parser.add_argument("--lease", type=float, default=2.0, help="分片租约（秒）")
+    parser.add_argument("--crash-after", type=int, default=5, help="第一个节点推送多少个群组后崩溃，0 为不崩溃")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(name)s %(message)s")
+
+    workdir = tempfile.mkdtemp(prefix="morning_news_coord_")
+    path = os.path.join(workdir, "coordination.db")
+    sent_log = os.path.join(workdir, "sent.log")
+    groups = [f"aiocqhttp:GroupMessage:{100000 + i}" for i in range(args.groups)]
+    start_at = time.time() + 2
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(
+            target=_demo_node,
+            args=(path, f"node{i}", groups, start_at, args.lease, args.crash_after if i == 0 else 0, sent_log),
+        )
+        for i in range(args.nodes)
+    ]
+    started = time.time()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(sent_log, encoding="utf-8") as f:
+        sends = [line.split() for line in f if line.strip()]
+    per_group = Counter(group_id for _, group_id in sends)
+    per_node = Counter(node_id for node_id, _ in sends)
+    missing = [group_id for group_id in groups if group_id not in per_group]
+    duplicated = {group_id: n for group_id, n in per_group.items() if n > 1}
+    print(f"耗时 {time.time() - started:.1f}s，各节点发送数: {dict(sorted(per_node.items()))}")
+    print(f"未送达 {len(missing)} 个，重复发送 {len(duplicated)} 个 {duplicated or ''}")
+    print(f"协调数据库: {path}")
+
+
+if __name__ == "__main__":
+    _run_demo()
@@ -0,0 +1,355 @@
+import os
+import zlib
+import struct
+import hashlib
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import ImageDraw, ImageFont
+
+# --- 覆盖索引常量 ---
+COVERAGE_VERSION = "1"  # 索引格式变化时递增，使旧缓存失效
+BITMAP_SIZE = 0x110000 // 8  # 覆盖全部 Unicode 码位的位图大小（139KB）
+
+# 常见系统字体，作为内置字体之后的兜底（不存在的路径会被忽略）
+SYSTEM_FALLBACK_FONTS = [
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/seguiemj.ttf",
+    "C:/Windows/Fonts/seguisym.ttf",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/Apple Symbols.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansSymbols2-Regular.ttf",
+]
+
+
+def _iter_cmap_ranges(data: bytes, font_index: int = 0):
+    """
+    解析字体 cmap 表，逐段产出 (起始码位, 结束码位) 闭区间
+    支持 TTF/OTF/TTC 及 format 4 / 12 / 13 子表，映射到 .notdef 的码位不计入
+    """
+    offset = 0
+    if data[:4] == b"ttcf":
+        offset = struct.unpack_from(">I", data, 12 + 4 * font_index)[0]
+    num_tables = struct.unpack_from(">H", data, offset + 4)[0]
+    cmap_offset = None
+    for i in range(num_tables):
+        record = offset + 12 + 16 * i
+        if data[record:record + 4] == b"cmap":
+            cmap_offset = struct.unpack_from(">I", data, record + 8)[0]
+            break
+    if cmap_offset is None:
+        return
+
+    num_subtables = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+    for i in range(num_subtables):
+        platform_id, encoding_id, sub_offset = struct.unpack_from(">HHI", data, cmap_offset + 4 + 8 * i)
+        # 只处理 Unicode 子表：平台 0，或 Windows 平台的 BMP(1) / 全码位(10)
+        if not (platform_id == 0 or (platform_id == 3 and encoding_id in (1, 10))):
+            continue
+        table = cmap_offset + sub_offset
+        fmt = struct.unpack_from(">H", data, table)[0]
+
+        if fmt == 4:
+            seg_count = struct.unpack_from(">H", data, table + 6)[0] // 2
+            end_codes = table + 14
+            start_codes = end_codes + 2 * seg_count + 2
+            id_deltas = start_codes + 2 * seg_count
+            id_range_offsets = id_deltas + 2 * seg_count
+            for seg in range(seg_count):
+                end = struct.unpack_from(">H", data, end_codes + 2 * seg)[0]
+                start = struct.unpack_from(">H", data, start_codes + 2 * seg)[0]
+                delta = struct.unpack_from(">h", data, id_deltas + 2 * seg)[0]
+                range_offset_pos = id_range_offsets + 2 * seg
+                range_offset = struct.unpack_from(">H", data, range_offset_pos)[0]
+                if start == 0xFFFF:
+                    continue
+                if range_offset == 0:
+                    # 整段按 delta 映射，仅排除恰好映射到 glyph 0 的码位
+                    zero_code = (-delta) & 0xFFFF
+                    if start <= zero_code <= end:
+                        if start < zero_code:
+                            yield start, zero_code - 1
+                        if zero_code < end:
+                            yield zero_code + 1, end
+                    else:
+                        yield start, end
+                    continue
+                run_start = None
+                for code in range(start, end + 1):
+                    glyph_pos = range_offset_pos + range_offset + 2 * (code - start)
+                    glyph = struct.unpack_from(">H", data, glyph_pos)[0] if glyph_pos + 2 <= len(data) else 0
+                    if glyph and (glyph + delta) & 0xFFFF:
+                        if run_start is None:
+                            run_start = code
+                    elif run_start is not None:
+                        yield run_start, code - 1
+                        run_start = None
+                if run_start is not None:
+                    yield run_start, end
+
+        elif fmt in (12, 13):
+            num_groups = struct.unpack_from(">I", data, table + 12)[0]
+            for group in range(num_groups):
+                start, end, glyph = struct.unpack_from(">III", data, table + 16 + 12 * group)
+                if glyph == 0:
+                    if fmt == 13:
+                        continue
+                    start += 1
+                if start <= end:
+                    yield start, min(end, 0x10FFFF)
+
+
+class FontCoverage:
+    """字体的码位覆盖位图，判断某个字符能否由该字体绘制为 O(1)"""
+
+    __slots__ = ("path", "bitmap")
+
+    def __init__(self, path: str, bitmap: bytearray):
+        self.path = path
+        self.bitmap = bitmap
+
+    def covers(self, ch: str) -> bool:
+        code = ord(ch)
+        return bool(self.bitmap[code >> 3] & (1 << (code & 7)))
+
+    @classmethod
+    def from_font_file(cls, path: str) -> "FontCoverage":
+        with open(path, "rb") as f:
+            data = f.read()
+        bitmap = bytearray(BITMAP_SIZE)
+        for start, end in _iter_cmap_ranges(data):
+            for code in range(start, end + 1):
+                bitmap[code >> 3] |= 1 << (code & 7)
+        return cls(path, bitmap)
+
+
+class CoverageIndex:
+    """
+    各字体覆盖位图的磁盘缓存
+    按（路径、大小、修改时间、版本）计算键，只在字体第一次出现或更新时解析 cmap
+    """
+
+    def __init__(self, cache_dir: str, logger=None):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self._loaded: Dict[str, FontCoverage] = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, path: str) -> str:
+        stat = os.stat(path)
+        key = hashlib.sha1(
+            f"{COVERAGE_VERSION}|{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}".encode("utf-8")
+        ).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{stem}.{key}.cmap")
+
+    def get(self, path: str) -> Optional[FontCoverage]:
+        """返回字体覆盖位图；字体无法解析时返回 None"""
+        coverage = self._loaded.get(path)
+        if coverage is not None:
+            return coverage
+        with self._lock:
+            coverage = self._loaded.get(path)
+            if coverage is None:
+                coverage = self._load(path)
+                if coverage is not None:
+                    self._loaded[path] = coverage
+        return coverage
+
+    def _load(self, path: str) -> Optional[FontCoverage]:
+        try:
+            cache_path = self._cache_path(path)
+        except OSError:
+            return None
+        try:
+            with open(cache_path, "rb") as f:
+                bitmap = bytearray(zlib.decompress(f.read()))
+            if len(bitmap) == BITMAP_SIZE:
+                return FontCoverage(path, bitmap)
+        except (OSError, zlib.error):
+            pass
+
+        try:
+            coverage = FontCoverage.from_font_file(path)
+        except Exception as e:
+            if self.logger is not None:
+                self.logger.warning(f"[新闻图片生成] 解析字体字符表失败，已跳过: {path} ({e})")
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(bytes(coverage.bitmap)))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+        return coverage
+
+
+class FontChain:
+    """
+    按顺序排列的字体回退链
+    每个字符使用链中第一个覆盖它的字体绘制；都不覆盖时使用首个字体（显示为缺字方框）
+    """
+
+    def __init__(self, paths: Sequence[str], index: CoverageIndex):
+        self.coverages: List[FontCoverage] = []
+        seen = set()
+        for path in paths:
+            if not path or path in seen or not os.path.isfile(path):
+                continue
+            seen.add(path)
+            coverage = index.get(path)
+            if coverage is not None:
+                self.coverages.append(coverage)
+        self.paths = [c.path for c in self.coverages]
+        self._char_font: Dict[str, int] = {}
+        self._sized: Dict[int, "SizedFontChain"] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.coverages)
+
+    def font_index(self, ch: str) -> int:
+        index = self._char_font.get(ch)
+        if index is None:
+            index = 0
+            for i, coverage in enumerate(self.coverages):
+                if coverage.covers(ch):
+                    index = i
+                    break
+            self._char_font[ch] = index
+        return index
+
+    def split_runs(self, text: str) -> List[Tuple[int, str]]:
+        """把单行文本切分为 (字体序号, 文本) 片段，相邻同字体字符合并"""
+        runs: List[Tuple[int, str]] = []
+        start = 0
+        current = None
+        for pos, ch in enumerate(text):
+            index = self.font_index(ch)
+            if index != current:
+                if current is not None:
+                    runs.append((current, text[start:pos]))
+                current = index
+                start = pos
+        if current is not None:
+            runs.append((current, text[start:]))
+        return runs
+
+    def sized(self, size: int) -> "SizedFontChain":
+        chain = self._sized.get(size)
+        if chain is None:
+            chain = self._sized[size] = SizedFontChain(self, size)
+        return chain
+
+
+class SizedFontChain:
+    """
+    指定字号的字体回退链，提供与 Pillow 一致的测量与绘制接口
+    整行都由首个字体覆盖时直接交给 Pillow 绘制，与单字体绘制结果完全相同
+    """
+
+    def __init__(self, chain: FontChain, size: int):
+        self.chain = chain
+        self.size = size
+        self._fonts: List[Optional[ImageFont.FreeTypeFont]] = [None] * len(chain.paths)
+        self.primary = self.font(0)
+        self.ascent = self.primary.getmetrics()[0]
+
+    def font(self, index: int) -> ImageFont.FreeTypeFont:
+        font = self._fonts[index]
+        if font is None:
+            try:
+                font = load_font(self.chain.paths[index], self.size)
+            except OSError:
+                # 个别字体（如位图 emoji 字体）不支持任意字号，退回首个字体
+                font = self._fonts[0] if index else load_font(self.chain.paths[0], self.size)
+            self._fonts[index] = font
+        return font
+
+    def getlength(self, text: str) -> float:
+        runs = self.chain.split_runs(text)
+        if len(runs) == 1 and runs[0][0] == 0:
+            return self.primary.getlength(text)
+        return sum(self.font(index).getlength(run) for index, run in runs)
+
+    def line_height(self, spacing: int) -> int:
+        """多行文本的行距，与 Pillow multiline_text 的计算方式一致"""
+        return self.primary.getbbox("A")[3] + spacing
+
+    @staticmethod
+    def _font_bbox(font, x: float, y: float, text: str, anchor: Optional[str] = None):
+        """直接由字体计算包围盒，与 RGB 画布上 draw.textbbox 的结果一致，测量时无需创建画布"""
+        left, top, right, bottom = font.getbbox(text, mode="L", anchor=anchor)
+        return left + x, top + y, right + x, bottom + y
+
+    def _line_bbox(self, x: float, y: float, line: str):
+        runs = self.chain.split_runs(line)
+        if not runs or (len(runs) == 1 and runs[0][0] == 0):
+            return self._font_bbox(self.primary, x, y, line)
+        left = top = right = bottom = None
+        baseline = y + self.ascent
+        for index, run in runs:
+            font = self.font(index)
+            bbox = self._font_bbox(font, x, baseline, run, "ls")
+            left = bbox[0] if left is None else min(left, bbox[0])
+            top = bbox[1] if top is None else min(top, bbox[1])
+            right = bbox[2] if right is None else max(right, bbox[2])
+            bottom = bbox[3] if bottom is None else max(bottom, bbox[3])
+            x += font.getlength(run)
+        return left, top, right, bottom
+
+    def text_bbox(self, xy: Tuple[float, float], text: str, spacing: int = 4):
+        """单行/多行文本的包围盒，等价于 textbbox / multiline_textbbox"""
+        x, y = xy
+        if "\n" not in text:
+            return self._line_bbox(x, y, text)
+        line_height = self.line_height(spacing)
+        boxes = [self._line_bbox(x, y + i * line_height, line) for i, line in enumerate(text.split("\n"))]
+        return (
+            min(b[0] for b in boxes),
+            min(b[1] for b in boxes),
+            max(b[2] for b in boxes),
+            max(b[3] for b in boxes),
+        )
+
+    def _draw_line(self, draw: ImageDraw.ImageDraw, x: float, y: float, line: str, fill) -> None:
+        runs = self.chain.split_runs(line)
+        if not runs or (len(runs) == 1 and runs[0][0] == 0):
+            draw.text((x, y), line, fill=fill, font=self.primary)
+            return
+        baseline = y + self.ascent
+        for index, run in runs:
+            font = self.font(index)
+            draw.text((x, baseline), run, fill=fill, font=font, anchor="ls", embedded_color=index != 0)
+            x += font.getlength(run)
+
+    def draw_text(self, draw: ImageDraw.ImageDraw, xy: Tuple[float, float], text: str, fill, spacing: int = 4) -> None:
+        """绘制单行/多行文本，等价于 draw.text / draw.multiline_text（左对齐）"""
+        x, y = xy
+        if "\n" not in text:
+            self._draw_line(draw, x, y, text, fill)
+            return
+        line_height = self.line_height(spacing)
+        for i, line in enumerate(text.split("\n")):
+            self._draw_line(draw, x, y + i * line_height, line, fill)
+
+
+_font_cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+_font_cache_lock = threading.Lock()
+
+
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """加载字体并在进程内复用，避免每次绘制都重新交给 FreeType 解析"""
+    key = (path, size)
+    font = _font_cache.get(key)
+    if font is None:
+        with _font_cache_lock:
+            font = _font_cache.get(key)
+            if font is None:
+                font = _font_cache[key] = ImageFont.truetype(path, size)
+    return font
@@ -0,0 +1,147 @@
+import os
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional
+
+# --- 子集字形集合 ---
+SUBSET_VERSION = "1"  # 子集参数变化时递增，使旧缓存失效
+
+# 顶部区域固定会用到的字符：中英文星期、标题、公历/农历日期
+# 一言内容每天不同，不在此列，由同一字体的常用字子集覆盖
+HEADER_GLYPHS = (
+    "星期一二三四五六日"
+    "MONDAYTUESWHRFIG"
+    "每日60秒读懂世界"
+    "0123456789年月日"
+    "甲乙丙丁戊己庚辛壬癸子丑寅卯辰巳午未申酉戌亥"
+    "正七八九十冬腊闰初廿三"
+    " "
+)
+
+
+@lru_cache(maxsize=1)
+def common_glyphs() -> FrozenSet[str]:
+    """
+    正文常用字符：ASCII、常用中文标点、GB2312 一级汉字（3755 个常用汉字）
+    覆盖绝大多数新闻正文，遇到集合外的字符时回退完整字体
+    """
+    chars = {chr(c) for c in range(0x20, 0x7F)}
+    chars.update("，。、；：？！“”‘’（）《》〈〉【】『』「」—…·～％＋－／＜＞＝　")
+    for high in range(0xB0, 0xD8):
+        for low in range(0xA1, 0xFF):
+            try:
+                chars.add(bytes((high, low)).decode("gb2312"))
+            except UnicodeDecodeError:
+                continue
+    return frozenset(chars)
+
+
+@lru_cache(maxsize=1)
+def header_glyphs() -> FrozenSet[str]:
+    return frozenset(HEADER_GLYPHS)
+
+
+class FontSubsetCache:
+    """
+    生成并缓存字体子集文件
+    子集按（源字体大小、修改时间、字形集合、版本）计算键，源字体更新后自动重新生成；
+    未安装 fontTools 或生成失败时，直接返回完整字体路径
+    """
+
+    def __init__(self, cache_dir: str, logger=None):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    def _log(self, level: str, message: str) -> None:
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
+
+    def _cache_path(self, source_path: str, tag: str, glyphs: Iterable[str]) -> str:
+        stat = os.stat(source_path)
+        digest = hashlib.sha1()
+        digest.update(f"{SUBSET_VERSION}|{stat.st_size}|{int(stat.st_mtime)}|".encode("utf-8"))
+        digest.update("".join(sorted(glyphs)).encode("utf-8"))
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}.{tag}.{digest.hexdigest()[:12]}.ttf")
+
+    def get(self, source_path: str, tag: str, glyphs: FrozenSet[str]) -> str:
+        """返回子集字体路径；无法生成子集时返回源字体路径"""
+        if not os.path.exists(source_path):
+            return source_path
+        try:
+            target_path = self._cache_path(source_path, tag, glyphs)
+        except OSError:
+            return source_path
+        if os.path.exists(target_path):
+            return target_path
+
+        with self._lock:
+            if os.path.exists(target_path):
+                return target_path
+            built = self._build(source_path, target_path, glyphs)
+        return target_path if built else source_path
+
+    def _build(self, source_path: str, target_path: str, glyphs: FrozenSet[str]) -> bool:
+        try:
+            from fontTools import subset
+        except ImportError:
+            self._log("debug", "[新闻图片生成] 未安装 fontTools，跳过字体子集化")
+            return False
+        # fontTools 会以 INFO 级别逐表输出子集化过程，避免刷屏
+        logging.getLogger("fontTools").setLevel(logging.WARNING)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            options = subset.Options()
+            options.layout_features = ["*"]  # 保留排版特性，保证与完整字体渲染一致
+            options.name_IDs = ["*"]
+            options.notdef_outline = True
+            options.hinting = True
+            font = subset.load_font(source_path, options)
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(text="".join(sorted(glyphs)))
+            subsetter.subset(font)
+
+            tmp_path = f"{target_path}.tmp"
+            subset.save_font(font, tmp_path, options)
+            os.replace(tmp_path, target_path)
+            self._remove_stale(source_path, target_path)
+            self._log(
+                "info",
+                f"[新闻图片生成] 已生成字体子集 {os.path.basename(target_path)} "
+                f"({os.path.getsize(source_path) // 1024}KB -> {os.path.getsize(target_path) // 1024}KB)",
+            )
+            return True
+        except Exception as e:
+            self._log("warning", f"[新闻图片生成] 生成字体子集失败，使用完整字体: {e}")
+            return False
+
+    def _remove_stale(self, source_path: str, target_path: str) -> None:
+        """删除同一字体、同一用途的旧版本子集"""
+        prefix = os.path.basename(target_path).rsplit(".", 2)[0] + "."
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and name.endswith(".ttf") and path != target_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+_default_cache: Optional[FontSubsetCache] = None
+
+
+def get_subset_cache(logger=None) -> FontSubsetCache:
+    global _default_cache
+    if _default_cache is None:
+        try:
+            from .config import get_plugin_data_dir
+        except ImportError:
+            from config import get_plugin_data_dir
+        _default_cache = FontSubsetCache(os.path.join(get_plugin_data_dir(), "font_cache"), logger)
+    elif logger is not None and _default_cache.logger is None:
+        _default_cache.logger = logger
+    return _default_cache
@@ -0,0 +1,116 @@
+"""
+农历换算
+基于 1900~2100 年的农历压缩表离线换算公历日期，不依赖第三方库与网络
+接口未返回 lunar_date 时用于图片日期栏，输出格式与接口一致，如 "乙巳年十一月廿七"
+"""
+import bisect
+import datetime
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# 每年一项：低 4 位为闰月月份（0 表示无闰月），第 4~15 位依次为十二月~正月是否大月（30 天），
+# 第 16 位为闰月是否大月
+_LUNAR_INFO = (
+    0x04bd8, 0x04ae0, 0x0a570, 0x054d5, 0x0d260, 0x0d950, 0x16554, 0x056a0, 0x09ad0, 0x055d2,  # 1900-1909
+    0x04ae0, 0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255, 0x0b540, 0x0d6a0, 0x0ada2, 0x095b0, 0x14977,  # 1910-1919
+    0x04970, 0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40, 0x1ab54, 0x02b60, 0x09570, 0x052f2, 0x04970,  # 1920-1929
+    0x06566, 0x0d4a0, 0x0ea50, 0x16a95, 0x05ad0, 0x02b60, 0x186e3, 0x092e0, 0x1c8d7, 0x0c950,  # 1930-1939
+    0x0d4a0, 0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4, 0x025d0, 0x092d0, 0x0d2b2, 0x0a950, 0x0b557,  # 1940-1949
+    0x06ca0, 0x0b550, 0x15355, 0x04da0, 0x0a5b0, 0x14573, 0x052b0, 0x0a9a8, 0x0e950, 0x06aa0,  # 1950-1959
+    0x0aea6, 0x0ab50, 0x04b60, 0x0aae4, 0x0a570, 0x05260, 0x0f263, 0x0d950, 0x05b57, 0x056a0,  # 1960-1969
+    0x096d0, 0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4, 0x0d250, 0x0d558, 0x0b540, 0x0b6a0, 0x195a6,  # 1970-1979
+    0x095b0, 0x049b0, 0x0a974, 0x0a4b0, 0x0b27a, 0x06a50, 0x06d40, 0x0af46, 0x0ab60, 0x09570,  # 1980-1989
+    0x04af5, 0x04970, 0x064b0, 0x074a3, 0x0ea50, 0x06b58, 0x05ac0, 0x0ab60, 0x096d5, 0x092e0,  # 1990-1999
+    0x0c960, 0x0d954, 0x0d4a0, 0x0da50, 0x07552, 0x056a0, 0x0abb7, 0x025d0, 0x092d0, 0x0cab5,  # 2000-2009
+    0x0a950, 0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9, 0x04ba0, 0x0a5b0, 0x15176, 0x052b0, 0x0a930,  # 2010-2019
+    0x07954, 0x06aa0, 0x0ad50, 0x05b52, 0x04b60, 0x0a6e6, 0x0a4e0, 0x0d260, 0x0ea65, 0x0d530,  # 2020-2029
+    0x05aa0, 0x076a3, 0x096d0, 0x04afb, 0x04ad0, 0x0a4d0, 0x1d0b6, 0x0d250, 0x0d520, 0x0dd45,  # 2030-2039
+    0x0b5a0, 0x056d0, 0x055b2, 0x049b0, 0x0a577, 0x0a4b0, 0x0aa50, 0x1b255, 0x06d20, 0x0ada0,  # 2040-2049
+    0x14b63, 0x09370, 0x049f8, 0x04970, 0x064b0, 0x168a6, 0x0ea50, 0x06aa0, 0x1a6c4, 0x0aae0,  # 2050-2059
+    0x092e0, 0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0, 0x0da50, 0x05d55, 0x056a0, 0x0a6d0, 0x055d4,  # 2060-2069
+    0x052d0, 0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6, 0x0ad50, 0x055a0, 0x0aba4, 0x0a5b0, 0x052b0,  # 2070-2079
+    0x0b273, 0x06930, 0x07337, 0x06aa0, 0x0ad50, 0x14b55, 0x04b60, 0x0a570, 0x054e4, 0x0d160,  # 2080-2089
+    0x0e968, 0x0d520, 0x0daa0, 0x16aa6, 0x056d0, 0x04ae0, 0x0a9d4, 0x0a2d0, 0x0d150, 0x0f252,  # 2090-2099
+    0x0d520,  # 2100-2100
+)
+
+MIN_YEAR = 1900
+MAX_YEAR = MIN_YEAR + len(_LUNAR_INFO) - 1
+_BASE_DATE = datetime.date(1900, 1, 31)  # 农历 1900 年正月初一
+
+HEAVENLY_STEMS = "甲乙丙丁戊己庚辛壬癸"
+EARTHLY_BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+ZODIAC = "鼠牛虎兔龙蛇马羊猴鸡狗猪"
+MONTH_NAMES = ("正月", "二月", "三月", "四月", "五月", "六月",
+               "七月", "八月", "九月", "十月", "十一月", "十二月")
+DAY_NAMES = ("初一", "初二", "初三", "初四", "初五", "初六", "初七", "初八", "初九", "初十",
+             "十一", "十二", "十三", "十四", "十五", "十六", "十七", "十八", "十九", "二十",
+             "廿一", "廿二", "廿三", "廿四", "廿五", "廿六", "廿七", "廿八", "廿九", "三十")
+
+
+def _month_lengths(info: int) -> Tuple[Tuple[int, bool, int], ...]:
+    """按顺序返回一年中各月的 (月份, 是否闰月, 天数)，闰月紧跟在同名月之后"""
+    leap = info & 0xF
+    months = []
+    for month in range(1, 13):
+        months.append((month, False, 30 if info & (0x10000 >> month) else 29))
+        if month == leap:
+            months.append((month, True, 30 if info & 0x10000 else 29))
+    return tuple(months)
+
+
+# 导入时展开压缩表：各年的月份长度与正月初一距基准日的天数，查询时只需一次二分加不超过 13 次累加
+_YEAR_MONTHS = tuple(_month_lengths(info) for info in _LUNAR_INFO)
+_YEAR_OFFSETS = []
+_offset = 0
+for _months in _YEAR_MONTHS:
+    _YEAR_OFFSETS.append(_offset)
+    _offset += sum(days for _, _, days in _months)
+_END_OFFSET = _offset  # 农历 2100 年除夕的次日
+del _offset, _months
+
+
+@dataclass(frozen=True, slots=True)
+class LunarDate:
+    """农历日期，year 为农历年（以正月初一为界）"""
+
+    year: int
+    month: int
+    day: int
+    is_leap: bool = False
+
+    @property
+    def ganzhi_year(self) -> str:
+        """干支纪年，如 '乙巳'"""
+        return HEAVENLY_STEMS[(self.year - 4) % 10] + EARTHLY_BRANCHES[(self.year - 4) % 12]
+
+    @property
+    def zodiac(self) -> str:
+        return ZODIAC[(self.year - 4) % 12]
+
+    def __str__(self) -> str:
+        leap = "闰" if self.is_leap else ""
+        return f"{self.ganzhi_year}年{leap}{MONTH_NAMES[self.month - 1]}{DAY_NAMES[self.day - 1]}"
+
+
+def to_lunar(date: datetime.date) -> Optional[LunarDate]:
+    """公历转农历，支持公历 1900-01-31 ~ 2100-12-31，超出范围返回 None"""
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    offset = (date - _BASE_DATE).days
+    # 压缩表覆盖到农历 2100 年末（公历 2101 年 1 月），对外只承诺公历年份在 1900~2100 之内
+    if not 0 <= offset < _END_OFFSET or date.year > MAX_YEAR:
+        return None
+    index = bisect.bisect_right(_YEAR_OFFSETS, offset) - 1
+    offset -= _YEAR_OFFSETS[index]
+    for month, is_leap, days in _YEAR_MONTHS[index]:
+        if offset < days:
+            return LunarDate(MIN_YEAR + index, month, offset + 1, is_leap)
+        offset -= days
+    raise AssertionError("农历压缩表数据不一致")  # 年长度由月份长度累加而来，不会走到这里
+
+
+def format_lunar_date(date: datetime.date) -> str:
+    """返回接口格式的农历日期，如 '乙巳年十一月廿七'；超出换算范围时返回空字符串"""
+    lunar = to_lunar(date)
+    return str(lunar) if lunar else ""
@@ -1,13 +1,36 @@
+import os
+import time
 import asyncio
 import aiohttp
 import datetime
 import base64
+import copy
+from collections import OrderedDict
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.api.message_components import Plain, Image
-from .news_image_generator import create_news_image_from_data
+from .news_archive import NewsArchive, parse_archive_date
+from .news_payload import NewsPayload, diff_payloads
+from .mirror_health import MirrorPool, DEFAULT_MIRROR_URLS
+from .providers import build_provider, fetch_from_providers
+from .providers.sixty_seconds import SixtySecondsProvider
+from .render_profile import DEFAULT_PROFILE, DEFAULT_PROFILE_PREFIX, RenderProfile, parse_render_profile, select_profile
+from .news_template import BUILTIN_TEMPLATE_DIR, DEFAULT_TEMPLATE_NAME, get_template_registry
+from .news_text import DEFAULT_TEXT_TEMPLATE, TEXT_TEMPLATES, NewsTextFormatter
+from .admission import AdmissionController
+from .coordination import TAKEOVER_WINDOW, build_coordinator, run_slot, takeover_shards
+from .memory_budget import MB, MemoryBudget
+from .config import ConfigWatcher, get_plugin_data_dir, int_setting, invalid_settings
+
+# 所有接口失败后，后台重试的初始间隔与最大间隔（秒），按指数退避增长
+STALE_RETRY_INITIAL_DELAY = 60
+STALE_RETRY_MAX_DELAY = 600
+# 推送后检查当期早报是否修订的间隔（秒）
+UPDATE_CHECK_INTERVAL = 900
+# 内存中缓存的图片组数（每期早报 × 每种输出档位一组）
+IMAGE_CACHE_SIZE = 8
 
 
 @register(
@@ -27,18 +50,142 @@ class DailyNewsPlugin(Star):
         # 定时任务在 __init__ 启动可能遇到“无运行中的事件循环”风险，因此延迟启动
         self._daily_task = None
         self._task_start_requested = False
-        
-        # 清理和验证群组ID
-        raw_groups = config.get("target_groups", [])
-        self.target_groups = []
-        for group_id in raw_groups:
+        # 定时任务正在推送时，推送时间的变更在推送结束后生效，不打断推送
+        self._daily_pushing = False
+
+        # 接口全部失败时先推送缓存早报，或推送后检查当期早报修订，由后台任务补发
+        self._watch_task = None
+        # 后台镜像健康检查任务，与定时任务一同启动
+        self._health_check_task = None
+        # 多实例协调的心跳任务，配置了协调后端时与定时任务一同启动
+        self._heartbeat_task = None
+        # 本节点参与过、可能仍有失联节点未完成分片的推送时段: 时段 -> (开始时间, 推送函数)，由心跳任务接管
+        self._open_slots = {}
+        self._takeover_task = None
+        # 配置文件监视任务，配置变化时不重启插件直接生效
+        self._config_watch_task = None
+
+        # 本地绘制模块依赖 Pillow，首次绘制（或启动后预热字体）时才导入，见 _load_renderer
+        self._renderer = None
+        # 图片模板：启动时加载并编译内置模板与用户模板，可按群组ID或平台前缀指定
+        self.templates = get_template_registry(logger)
+        self._builtin_default_source = os.path.join(BUILTIN_TEMPLATE_DIR, f"{DEFAULT_TEMPLATE_NAME}.json")
+        # 文本模板：同一期早报的每种文本模板只拼接一次
+        self.text_formatter = NewsTextFormatter()
+        # (内容指纹, 图片来源) -> 每页图片，同一期早报的每种档位只生成一次
+        self._image_cache: OrderedDict = OrderedDict()
+
+        # 读取各项设置（配置热更新时同样经过这里）
+        self._load_settings(config)
+
+        # 按日期存档早报，支持查询历史早报，并复用同一内容已生成的图片
+        self.archive = NewsArchive(
+            os.path.join(get_plugin_data_dir(), "archive"),
+            logger,
+            max_days=int_setting(config, "archive_max_days", minimum=1),
+            image_keep=7 if config.get("archive_images", True) else 0,
+        )
+
+        # 早报镜像列表及每个镜像的熔断状态
+        self.mirror_pool = MirrorPool(self._clean_mirror_urls(config.get("news_api_urls", DEFAULT_MIRROR_URLS)))
+        # 数据源：内置 60s 镜像优先级最高，其余按配置顺序
+        self.providers = self._build_providers(config.get("news_providers", []))
+
+        # 画布与图片缓存的内存预算（MB，0 为不限制），以及每次推送的内存峰值报告
+        self.memory_budget = MemoryBudget(
+            budget_mb=int_setting(config, "memory_budget_mb"),
+            report=config.get("memory_report", False),
+        )
+
+        # 手动获取早报的准入控制：用户/会话冷却、并发上限、相同工作合并
+        self.admission = AdmissionController(
+            user_cooldown=int_setting(config, "manual_user_cooldown"),
+            group_cooldown=int_setting(config, "manual_group_cooldown"),
+            max_concurrent=int_setting(config, "manual_max_concurrent"),
+        )
+        # 最近一次成功获取的早报，manual_cache_ttl 秒内的手动请求直接使用，不再访问网络
+        self._last_fetched = None  # (获取时间, 早报数据)
+
+        # 多实例协调：多个副本共用配置时，每个推送时段只由一组节点分片推送一次
+        self.coordinator = self._build_coordinator(config.get("coordination", ""))
+
+        # 配置热更新：监视 AstrBot 保存的插件配置文件，变化时只更新受影响的部分
+        self._applied_config = copy.deepcopy(dict(config))
+        self.config_watch_interval = int_setting(config, "config_watch_interval")
+        config_path = getattr(config, "config_path", None)
+        self.config_watcher = ConfigWatcher(config_path, self._applied_config) if config_path else None
+
+        # 记录配置信息
+        logger.info(f"[每日早报] 插件初始化完成")
+        logger.info(f"[每日早报] 原始目标群组: {config.get('target_groups', [])}")
+        logger.info(f"[每日早报] 清理后目标群组: {self.target_groups}")
+        logger.info(f"[每日早报] 推送时间: {self.push_time}")
+        logger.info(f"[每日早报] 显示文本早报: {self.show_text_news}")
+        logger.info(f"[每日早报] 使用本地图片绘制: {self.use_local_image_draw}")
+        logger.info(f"[每日早报] 早报镜像: {list(self.mirror_pool.mirrors)}")
+        logger.info(f"[每日早报] 数据源: {[p.name for p in self.providers]}")
+        logger.info(f"[每日早报] 图片模板: {self.image_template}，可用模板: {self.templates.names()}")
+        if self.render_profiles:
+            logger.info(f"[每日早报] 输出档位: { {prefix: p.key for prefix, p in self.render_profiles.items()} }")
+
+        # 启动定时任务（如果当前没有运行中的事件循环，则延迟到首次命令触发）
+        self._start_daily_task_if_possible()
+
+    def _load_settings(self, config: dict) -> None:
+        """读取不持有运行状态的设置；插件初始化与配置热更新共用"""
+        self.target_groups = self._clean_target_groups(config.get("target_groups", []))
+        self.push_time = self._normalize_push_time(config.get("push_time", "08:00"))
+        self.push_hour, self.push_minute = self._parse_push_time_to_hm(self.push_time)
+        self.show_text_news = config.get("show_text_news", False)
+        self.use_local_image_draw = config.get("use_local_image_draw", True)
+        self.fallback_fonts = config.get("fallback_fonts", []) or []
+
+        self.stale_fallback = config.get("stale_fallback", True)
+        self.stale_refresh_window = int_setting(config, "stale_refresh_window")
+        self.push_on_update = config.get("push_on_update", False)
+        self.update_check_window = int_setting(config, "update_check_window")
+        self.health_check_interval = int_setting(config, "health_check_interval")
+        self.merge_provider_news = config.get("merge_provider_news", False)
+
+        # 长早报分页：每页最大高度（像素）与每页最大体积（KB），0 表示不限制
+        self.image_page_height = int_setting(config, "image_page_height")
+        self.image_page_max_kb = int_setting(config, "image_page_max_kb")
+
+        # 本地绘制的输出档位：按群组ID的平台前缀选择宽度、缩放与编码格式
+        self.render_profiles: dict[str, RenderProfile] = {}
+        for spec in config.get("render_profiles", []) or []:
+            try:
+                prefix, profile = parse_render_profile(str(spec))
+                self.render_profiles[prefix] = profile
+            except ValueError as e:
+                logger.warning(f"[每日早报] 输出档位配置无效，已跳过: {spec}，原因: {e}")
+        self._default_profile = select_profile(self.render_profiles, DEFAULT_PROFILE_PREFIX)
+
+        self.image_template = self._clean_template_name(config.get("image_template", DEFAULT_TEMPLATE_NAME))
+        self.group_templates = self._parse_target_templates(
+            config.get("group_templates", []), lambda name: self.templates.get(name) is not None, "群组模板"
+        )
+        self.text_template = str(config.get("text_template", DEFAULT_TEXT_TEMPLATE) or "").strip()
+        if self.text_template not in TEXT_TEMPLATES:
+            logger.warning(f"[每日早报] 文本模板 {self.text_template} 不存在，使用默认模板，可选: {list(TEXT_TEMPLATES)}")
+            self.text_template = DEFAULT_TEXT_TEMPLATE
+        self.text_templates = self._parse_target_templates(
+            config.get("text_templates", []), TEXT_TEMPLATES.__contains__, "文本模板"
+        )
+        # 手动获取复用最近获取的早报的时长（秒）
+        self.manual_cache_ttl = int_setting(config, "manual_cache_ttl")
+
+    def _clean_target_groups(self, raw_groups) -> list[str]:
+        """清理和验证群组ID，格式错误的项跳过"""
+        target_groups = []
+        for group_id in raw_groups or []:
             if isinstance(group_id, str):
                 cleaned_id = group_id.strip()
                 if cleaned_id:
                     # 验证格式
                     parts = cleaned_id.split(":")
                     if len(parts) == 3:
-                        self.target_groups.append(cleaned_id)
+                        target_groups.append(cleaned_id)
                         logger.info(f"[每日早报] 有效的群组ID: {cleaned_id}")
                     else:
                         logger.warning(f"[每日早报] 群组ID格式错误，已跳过: {group_id} (应为 '前缀:中缀:后缀')")
@@ -46,22 +193,140 @@ class DailyNewsPlugin(Star):
                     logger.warning(f"[每日早报] 群组ID为空，已跳过")
             else:
                 logger.warning(f"[每日早报] 群组ID类型错误，已跳过: {group_id} (类型: {type(group_id).__name__})")
-        
-        self.push_time = self._normalize_push_time(config.get("push_time", "08:00"))
-        self.push_hour, self.push_minute = self._parse_push_time_to_hm(self.push_time)
-        self.show_text_news = config.get("show_text_news", False)
-        self.use_local_image_draw = config.get("use_local_image_draw", True)
+        return target_groups
 
-        # 记录配置信息
-        logger.info(f"[每日早报] 插件初始化完成")
-        logger.info(f"[每日早报] 原始目标群组: {raw_groups}")
-        logger.info(f"[每日早报] 清理后目标群组: {self.target_groups}")
-        logger.info(f"[每日早报] 推送时间: {self.push_time}")
-        logger.info(f"[每日早报] 显示文本早报: {self.show_text_news}")
-        logger.info(f"[每日早报] 使用本地图片绘制: {self.use_local_image_draw}")
+    def _build_providers(self, raw_specs) -> list:
+        """数据源：内置 60s 镜像优先级最高，其余按配置顺序"""
+        providers = [
+            SixtySecondsProvider(",".join(self.mirror_pool.mirrors), logger, priority=0, pool=self.mirror_pool)
+        ]
+        for index, spec in enumerate(raw_specs or [], 1):
+            try:
+                providers.append(build_provider(str(spec), logger, default_priority=index))
+            except Exception as e:
+                logger.warning(f"[每日早报] 数据源配置无效，已跳过: {spec}，原因: {e}")
+        return providers
 
-        # 启动定时任务（如果当前没有运行中的事件循环，则延迟到首次命令触发）
-        self._start_daily_task_if_possible()
+    def _build_coordinator(self, raw_spec):
+        """多实例协调：多个副本共用配置时，每个推送时段只由一组节点分片推送一次；未配置或配置无效时返回 None"""
+        coordination_spec = str(raw_spec or "").strip()
+        if not coordination_spec:
+            return None
+        try:
+            coordinator = build_coordinator(coordination_spec)
+            logger.info(f"[每日早报] 已启用多实例协调，本节点: {coordinator.node_id}")
+            return coordinator
+        except Exception as e:
+            logger.warning(f"[每日早报] 协调配置无效，按单实例推送: {coordination_spec}，原因: {e}")
+            return None
+
+    async def apply_config(self, new_config: dict) -> list[str]:
+        """
+        把新的配置应用到运行中的插件，返回发生变化的配置项
+        只更新受影响的部分：推送时间变化才重新计时；镜像熔断状态、手动请求的冷却与统计、存档都会保留；
+        图片缓存只淘汰不再被目标群组使用的档位/模板，回退字体变化时才丢弃本地绘制的图片与画布
+        """
+        old_config = self._applied_config
+        invalid = invalid_settings(new_config)
+        if invalid:
+            # 先校验再应用：无效的配置项保持原值，同一次保存中的其他配置照常生效
+            logger.warning(f"[每日早报] 配置项无效，保持原值: {invalid}")
+            new_config = dict(new_config)
+            for key in invalid:
+                if key in old_config:
+                    new_config[key] = old_config[key]
+                else:
+                    new_config.pop(key)
+        changed = sorted(key for key in set(old_config) | set(new_config) if old_config.get(key) != new_config.get(key))
+        if not changed:
+            return []
+        config = new_config
+        old_groups = self.target_groups
+        old_push_time = self.push_time
+        old_fonts = self.fallback_fonts
+        variants_before = self._image_variants()
+        self._load_settings(config)
+
+        if self.target_groups != old_groups:
+            added = [group_id for group_id in self.target_groups if group_id not in old_groups]
+            removed = [group_id for group_id in old_groups if group_id not in self.target_groups]
+            logger.info(f"[每日早报] 目标群组: 新增 {added}，移除 {removed}")
+        # 定时任务在目标群组为空时每 5 分钟才检查一次，从无到有时也立即重新计时
+        if self.push_time != old_push_time or (self.target_groups and not old_groups):
+            self._reschedule_daily_task()
+
+        # 图片缓存：档位、模板与分页参数都已体现在图片来源标识中，只淘汰不再使用的来源
+        stale_variants = variants_before - self._image_variants()
+        if self.fallback_fonts != old_fonts and self._renderer is not None:
+            # 字体变化不体现在来源标识中，本地绘制的图片与画布全部失效
+            self._renderer.configure_fallback_fonts(self.fallback_fonts)
+            self._renderer.release_canvases()
+            stale_variants.update(variant for _, variant in self._image_cache if variant.startswith("local"))
+        stale_keys = [key for key in self._image_cache if key[1] in stale_variants]
+        for key in stale_keys:
+            del self._image_cache[key]
+        if stale_keys:
+            logger.info(f"[每日早报] 已淘汰 {len(stale_keys)} 组受配置影响的图片缓存")
+        if self.use_local_image_draw and self._renderer is None and self._daily_task is not None:
+            asyncio.get_running_loop().run_in_executor(None, self._prepare_renderer)
+
+        if {"archive_max_days", "archive_images"} & set(changed):
+            self.archive.max_days = int_setting(config, "archive_max_days", minimum=1)
+            self.archive.image_keep = 7 if config.get("archive_images", True) else 0
+        if "news_api_urls" in changed:
+            self.mirror_pool.update_urls(self._clean_mirror_urls(config.get("news_api_urls", DEFAULT_MIRROR_URLS)))
+        if {"news_api_urls", "news_providers"} & set(changed):
+            self.providers = self._build_providers(config.get("news_providers", []))
+        if "health_check_interval" in changed and self._health_check_task is not None:
+            self._health_check_task.cancel()
+            self._health_check_task = None
+
+        self.memory_budget.budget = int_setting(config, "memory_budget_mb") * MB
+        self.memory_budget.report = bool(config.get("memory_report", False))
+        self.memory_budget.trim(self._image_cache, self._renderer)
+        self.admission.user_cooldown = int_setting(config, "manual_user_cooldown")
+        self.admission.group_cooldown = int_setting(config, "manual_group_cooldown")
+        self.admission.max_concurrent = int_setting(config, "manual_max_concurrent")
+
+        if "coordination" in changed:
+            for task in (self._heartbeat_task, self._takeover_task):
+                if task is not None:
+                    task.cancel()
+            self._heartbeat_task = self._takeover_task = None
+            self._open_slots.clear()
+            if self.coordinator is not None:
+                try:
+                    await asyncio.to_thread(self.coordinator.leave)
+                except Exception as e:
+                    logger.warning(f"[每日早报] 注销协调节点失败: {e}")
+            self.coordinator = self._build_coordinator(config.get("coordination", ""))
+        if "config_watch_interval" in changed:
+            self.config_watch_interval = int_setting(config, "config_watch_interval")
+            if self.config_watch_interval <= 0:
+                logger.info("[每日早报] 配置热更新已关闭")
+
+        # 按新配置补齐需要的后台任务（健康检查、协调心跳）
+        if self._daily_task is not None:
+            self._start_background_tasks()
+
+        # 全部应用完成后才记录为已应用的配置：中途出错时下次检查会重新比较并再次应用
+        self._applied_config = copy.deepcopy(dict(config))
+        if config is not self.config:
+            self.config.update(config)
+        logger.info(f"[每日早报] 配置已更新: {changed}")
+        return changed
+
+    def _image_variants(self) -> set[str]:
+        """当前配置下目标群组（及默认来源）使用的图片来源标识"""
+        return {self._image_variant(self._render_target(group_id)) for group_id in [None, *self.target_groups]}
+
+    def _reschedule_daily_task(self) -> None:
+        """推送时间变化后重新计时；定时推送进行中时不打断，推送结束后会按新的推送时间计算"""
+        if self._daily_task is None or self._daily_task.done() or self._daily_pushing:
+            return
+        self._daily_task.cancel()
+        self._daily_task = asyncio.get_running_loop().create_task(self.daily_task())
+        logger.info(f"[每日早报] 定时任务已按推送时间 {self.push_time} 重新计时")
 
     def _normalize_push_time(self, raw_value) -> str:
         """把 push_time 规范化成 'HH:MM'，非法配置回退默认值并避免 ValueError"""
@@ -82,6 +347,61 @@ class DailyNewsPlugin(Star):
             logger.warning(f"[每日早报] push_time 配置非法: {raw_value}，已回退默认值 {default}，原因: {e}")
             return default
 
+    def _load_renderer(self):
+        """
+        导入本地绘制模块（Pillow、字体回退链、农历换算等）
+        AstrBot 启动时会加载所有插件，绘制模块推迟到第一次需要时才导入；使用接口图片时不会导入
+        """
+        if self._renderer is None:
+            from . import news_image_generator
+
+            news_image_generator.configure_fallback_fonts(self.fallback_fonts)
+            self._renderer = news_image_generator
+        return self._renderer
+
+    def _prepare_renderer(self) -> None:
+        """在线程池中预先导入绘制模块并生成字体子集，使首次推送不必等待"""
+        try:
+            self._load_renderer().prepare_font_subsets(logger)
+        except Exception:
+            logger.exception("[每日早报] 预先加载本地绘制模块失败")
+
+    def _clean_template_name(self, raw_value) -> str:
+        """默认模板名不存在时回退内置默认模板"""
+        name = str(raw_value or "").strip() or DEFAULT_TEMPLATE_NAME
+        if self.templates.get(name) is None:
+            logger.warning(f"[每日早报] 图片模板 {name} 不存在，使用默认模板，可用模板: {self.templates.names()}")
+            return DEFAULT_TEMPLATE_NAME
+        return name
+
+    def _parse_target_templates(self, raw_specs, exists, label: str) -> dict[str, str]:
+        """解析 '群组ID或平台前缀=模板名' 列表，格式错误或模板不存在的项跳过"""
+        templates: dict[str, str] = {}
+        for spec in raw_specs or []:
+            target, sep, name = str(spec).rpartition("=")
+            if not sep or not target.strip():
+                logger.warning(f"[每日早报] {label}配置格式错误，应为 '群组ID或平台前缀=模板名'，已跳过: {spec}")
+                continue
+            if not exists(name.strip()):
+                logger.warning(f"[每日早报] {label}配置中的模板不存在，已跳过: {spec}")
+                continue
+            templates[target.strip()] = name.strip()
+        return templates
+
+    def _clean_mirror_urls(self, raw_urls) -> list[str]:
+        """清理镜像列表配置，未配置有效地址时回退内置镜像"""
+        urls = []
+        if isinstance(raw_urls, (list, tuple)):
+            for url in raw_urls:
+                if isinstance(url, str) and url.strip().startswith(("http://", "https://")):
+                    urls.append(url.strip())
+                else:
+                    logger.warning(f"[每日早报] 早报镜像地址非法，已跳过: {url}")
+        if not urls:
+            logger.warning("[每日早报] 未配置有效的早报镜像，使用内置镜像列表")
+            urls = list(DEFAULT_MIRROR_URLS)
+        return urls
+
     def _parse_push_time_to_hm(self, normalized_push_time: str) -> tuple[int, int]:
         """输入保证为 'HH:MM' 格式，因此该函数不再做额外容错"""
         hour_str, minute_str = normalized_push_time.split(":")
@@ -94,19 +414,40 @@ class DailyNewsPlugin(Star):
             loop = asyncio.get_running_loop()
             self._daily_task = loop.create_task(self.daily_task())
             logger.info("[每日早报] 定时任务已创建")
+            self._start_background_tasks()
+            if self.use_local_image_draw:
+                # 导入绘制模块与字体子集化较耗时，放到线程池中预先完成并缓存到磁盘
+                loop.run_in_executor(None, self._prepare_renderer)
         except RuntimeError:
             # 未进入运行中的事件循环，延迟到后续命令触发时再启动
             self._task_start_requested = True
             logger.warning("[每日早报] 当前未发现运行中的事件循环，定时任务将延迟启动")
 
+    def _start_background_tasks(self) -> None:
+        """启动配置需要、但尚未运行的后台任务：镜像健康检查、协调心跳、配置热更新"""
+        loop = asyncio.get_running_loop()
+        if self.health_check_interval > 0 and (self._health_check_task is None or self._health_check_task.done()):
+            self._health_check_task = loop.create_task(self.mirror_health_task())
+        if self.coordinator is not None and (self._heartbeat_task is None or self._heartbeat_task.done()):
+            self._heartbeat_task = loop.create_task(self.coordination_heartbeat_task())
+        if (
+            self.config_watcher is not None
+            and self.config_watch_interval > 0
+            and (self._config_watch_task is None or self._config_watch_task.done())
+        ):
+            self._config_watch_task = loop.create_task(self.config_watch_task())
+
     def _ensure_daily_task_started(self) -> None:
         if self._task_start_requested:
             self._start_daily_task_if_possible()
             self._task_start_requested = False
 
-    def _build_image_chain(self, image_data: str) -> MessageChain:
+    def _build_image_chain(self, images: list[str], notice: str = None) -> MessageChain:
+        """分页绘制的多张图片放在同一条消息中发送"""
         image_message_chain = MessageChain()
-        image_message_chain.chain = [Image.fromBase64(image_data)]
+        image_message_chain.chain = [Image.fromBase64(image_data) for image_data in images]
+        if notice:
+            image_message_chain.chain.insert(0, Plain(f"{notice}\n"))
         return image_message_chain
 
     def _build_text_chain(self, text: str) -> MessageChain:
@@ -119,95 +460,95 @@ class DailyNewsPlugin(Star):
         async with self._send_lock:
             return await self.context.send_message(origin, message_chain)
 
-    def _extract_news_payload(self, raw_json):
-        """
-        把不同 API 可能返回的结构归一化为：{date: str, news: List[str], tip: str}
-        返回 None 表示无法解析
-        """
-        try:
-            if not isinstance(raw_json, dict):
-                return None
-
-            candidate = raw_json.get("data", raw_json)
-            if not isinstance(candidate, dict):
-                return None
-
-            date_str = candidate.get("date") or ""
-            news_items = candidate.get("news", [])
-            tip = candidate.get("tip") or ""
-            image_url = candidate.get("image")  # 仅当配置 use_local_image_draw=false 时需要
-
-            # 可选字段：用于提升图片绘制的准确性
-            weekday_cn = candidate.get("day_of_week")
-            lunar_date = candidate.get("lunar_date")
-
-            if isinstance(news_items, str):
-                news_items = [x for x in news_items.splitlines() if x.strip()]
-            if not isinstance(news_items, (list, tuple)):
-                news_items = []
-
-            normalized_news = []
-            for item in news_items:
-                if item is None:
-                    continue
-                s = str(item).strip()
-                if s:
-                    normalized_news.append(s)
-
-            # date 与 news 都是必要字段；tip 允许为空
-            if not date_str or not normalized_news:
-                return None
-
-            payload = {"date": str(date_str), "news": normalized_news, "tip": str(tip)}
-            if image_url:
-                payload["image"] = str(image_url)
-            if weekday_cn:
-                payload["day_of_week"] = str(weekday_cn)
-            if lunar_date:
-                payload["lunar_date"] = str(lunar_date)
-            return payload
-        except Exception as e:
-            logger.warning(f"[每日早报] 解析早报数据结构失败: {e}")
-            return None
-
     # 获取60s早报数据
     async def fetch_news_data(self):
-        """获取每日60s早报数据
+        """获取每日60s早报数据，并发请求所有数据源，按优先级取结果（可选合并多个数据源）
 
-        :return: 早报数据
-        :rtype: dict
+        :return: 早报数据，全部失败时返回 None
+        :rtype: NewsPayload
         """
-        urls = [
-            "https://60s.viki.moe/v2/60s",
-            "https://60s.b23.run/v2/60s",
-            "https://60s-api-cf.viki.moe/v2/60s",
-            "https://60s-api.114128.xyz/v2/60s",
-            "https://60s-api-cf.114128.xyz/v2/60s"
-        ]
-
         timeout = aiohttp.ClientTimeout(total=12, connect=5, sock_read=10)
         async with aiohttp.ClientSession(timeout=timeout) as session:
-            for url in urls:
+            payload = await fetch_from_providers(self.providers, session, merge=self.merge_provider_news)
+        if payload:
+            self.archive.save(payload)
+            self._last_fetched = (time.monotonic(), payload)
+            return payload
+
+        # 所有数据源都失败时返回None
+        logger.error("[每日早报] 所有早报API都失败，无法获取数据")
+        return None
+
+    async def mirror_health_task(self):
+        """后台健康检查：定期对冷却结束的熔断镜像做半开探测，使其在下次推送前恢复"""
+        logger.info(f"[每日早报] 镜像健康检查已启动，间隔 {self.health_check_interval} 秒")
+        timeout = aiohttp.ClientTimeout(total=8, connect=3, sock_read=6)
+        while True:
+            try:
+                await asyncio.sleep(self.health_check_interval)
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    await asyncio.gather(*(p.health_check(session) for p in self.providers))
+            except asyncio.CancelledError:
+                logger.info("[每日早报] 镜像健康检查已停止")
+                raise
+            except Exception:
+                logger.exception("[每日早报] 镜像健康检查异常")
+
+    async def coordination_heartbeat_task(self):
+        """定期登记本节点在线，leader 按在线节点数划分推送分片；同时接管失联节点在已开始时段中的分片"""
+        interval = self.coordinator.lease / 3
+        try:
+            while True:
                 try:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            raw_json = await response.json(content_type=None)
-                            payload = self._extract_news_payload(raw_json)
-                            if payload:
-                                return payload
-                            logger.warning(f"[每日早报] API返回结构异常，已跳过: {url}")
-                        else:
-                            logger.warning(f"API返回错误代码: {response.status}")
+                    await asyncio.to_thread(self.coordinator.heartbeat)
                 except Exception as e:
-                    logger.warning(f"[每日早报] 从 {url} 获取数据时出错: {e}")
+                    logger.warning(f"[每日早报] 协调心跳失败: {e}")
+                # 接管时的推送可能持续较久，放到单独的任务中，不耽误心跳
+                if self._open_slots and (self._takeover_task is None or self._takeover_task.done()):
+                    self._takeover_task = asyncio.create_task(self._takeover_open_slots())
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            logger.info("[每日早报] 协调心跳已停止")
+            raise
+
+    async def _takeover_open_slots(self):
+        """领取已开始时段中无人负责或租约过期的分片；时段全部完成或超过接管时长后不再检查"""
+        coordinator = self.coordinator
+        for slot, (started, push) in list(self._open_slots.items()):
+            try:
+                if time.monotonic() - started > TAKEOVER_WINDOW:
+                    logger.warning(f"[每日早报] 推送时段 {slot} 超过接管时长仍有分片未完成，不再接管")
+                elif await asyncio.to_thread(coordinator.pending_shards, slot):
+                    delivered = await takeover_shards(coordinator, slot, push, logger)
+                    if delivered:
+                        logger.info(f"[每日早报] 接管推送时段 {slot} 的分片，本节点送达 {delivered} 个群组")
                     continue
-        
-        # 所有URL都失败时返回None
-        logger.error("[每日早报] 所有早报API都失败，无法获取数据")
-        return None
+                self._open_slots.pop(slot, None)
+            except Exception as e:
+                logger.warning(f"[每日早报] 接管推送时段 {slot} 失败，稍后重试: {e}")
+
+    async def config_watch_task(self):
+        """定期检查插件配置文件，配置变化时直接生效，不重启插件"""
+        logger.info(f"[每日早报] 配置热更新已启动，每 {self.config_watch_interval} 秒检查一次配置文件")
+        while self.config_watch_interval > 0:
+            try:
+                await asyncio.sleep(self.config_watch_interval)
+                try:
+                    new_config = await asyncio.to_thread(self.config_watcher.poll)
+                except ValueError as e:
+                    logger.warning(f"[每日早报] 配置文件读取失败，下次检查时重试: {e}")
+                    continue
+                if new_config is not None:
+                    await self.apply_config(new_config)
+                    self.config_watcher.commit(new_config)
+            except asyncio.CancelledError:
+                logger.info("[每日早报] 配置热更新已停止")
+                raise
+            except Exception:
+                logger.exception("[每日早报] 配置热更新异常")
 
     # 下载60s早报图片
-    async def download_image(self, news_data):
+    async def download_image(self, news_data: NewsPayload):
         """下载每日60s图片
 
         :param news_data: 早报数据
@@ -215,9 +556,9 @@ class DailyNewsPlugin(Star):
         :rtype: str
         """
         try:
-            image_url = news_data.get("image")
+            image_url = news_data.image
             if not image_url:
-                raise ValueError("news_data 缺少 image 字段")
+                raise ValueError("早报数据缺少 image 字段")
             logger.info(f"[每日早报] 从URL下载图片: {image_url}")
 
             async with aiohttp.ClientSession() as session:
@@ -234,32 +575,197 @@ class DailyNewsPlugin(Star):
             logger.exception("[每日早报] 下载图片时异常")
             raise
 
+    # 获取早报图片
+    def _render_target(self, origin: str = None):
+        """
+        本地绘制时按消息来源选择 (输出档位, 模板)：档位按平台前缀，模板按群组ID或平台前缀
+        使用接口图片时不区分，返回 None
+        """
+        if not self.use_local_image_draw:
+            return None
+        if not origin:
+            return self._default_profile, self.image_template
+        prefix = origin.split(":", 1)[0]
+        template = self.group_templates.get(origin) or self.group_templates.get(prefix) or self.image_template
+        return select_profile(self.render_profiles, origin), template
+
+    def _image_variant(self, target) -> str:
+        """图片来源标识：档位、模板或分页参数不同的图片不能互相复用"""
+        if target is None:
+            return "api"
+        profile, template = target
+        variant = "local"
+        if profile != DEFAULT_PROFILE:
+            variant = f"local@{profile.key}"
+        news_template = self.templates.get(template)
+        if news_template is not None and news_template.source != self._builtin_default_source:
+            # 模板文件修改后内容摘要随之变化，旧图片不再复用
+            variant = f"{variant}#{news_template.digest[:10]}"
+        if self.image_page_height > 0:
+            variant = f"{variant}+p{self.image_page_height}x{self.image_page_max_kb}"
+        return variant
+
+    async def get_news_images(self, news_data: NewsPayload, allow_network: bool = True, origin: str = None):
+        """获取早报图片：优先复用缓存/存档中由相同内容生成的图片，否则本地绘制或下载并写回存档
+
+        :param news_data: 早报数据
+        :param allow_network: 为 False 时不会下载接口图片（用于从存档读取历史早报）
+        :param origin: 消息来源（群组ID），用于选择输出档位与模板，为空时使用默认档位与模板
+        :return: 每页图片的base64编码（未分页时只有一张），失败返回 None
+        :rtype: list[str]
+        """
+        target = self._render_target(origin)
+        variant = self._image_variant(target)
+        cache_key = (news_data.fingerprint, variant)
+        images = self._image_cache.get(cache_key)
+        if images:
+            self._image_cache.move_to_end(cache_key)
+            return images
+
+        # 存档每天只保存一份图片，只存默认档位与模板，避免多个档位来回覆盖
+        use_archive = target is None or target == self._render_target()
+        if use_archive:
+            images = self.archive.get_images(news_data.date, news_data, variant if allow_network else None)
+            if images:
+                logger.info(f"[每日早报] 复用存档中 {news_data.date} 的早报图片")
+                self._remember_images(cache_key, images)
+                return images
+
+        if target is not None:
+            # 绘制与编码耗时较长，放到线程中执行，避免阻塞事件循环
+            profile, template = target
+            renderer = self._renderer or await asyncio.to_thread(self._load_renderer)
+            images = await asyncio.to_thread(
+                renderer.create_news_pages_from_data,
+                news_data,
+                logger,
+                self.image_page_height,
+                self.image_page_max_kb * 1024,
+                profile,
+                template,
+            )
+        elif allow_network:
+            image_data = await self.download_image(news_data)
+            images = [image_data] if image_data else None
+        else:
+            logger.warning("[每日早报] 存档中没有对应图片，且未开启本地绘制，无法生成图片")
+            return None
+
+        if images:
+            self._remember_images(cache_key, images)
+            if use_archive:
+                self.archive.save_images(news_data, images, variant)
+        return images
+
+    def _remember_images(self, cache_key: tuple, images: list[str]) -> None:
+        self._image_cache[cache_key] = images
+        self._image_cache.move_to_end(cache_key)
+        while len(self._image_cache) > IMAGE_CACHE_SIZE:
+            self._image_cache.popitem(last=False)
+        freed = self.memory_budget.trim(self._image_cache, self._renderer)
+        if freed:
+            logger.info(f"[每日早报] 超出内存预算，已释放 {freed // 1024}KB 的画布与图片缓存")
+
     # 生成早报文本
-    def generate_news_text(self, news_data):
+    def generate_news_text(self, news_data: NewsPayload, origin: str = None):
         """生成早报文本
 
         :param news_data: 早报数据
+        :param origin: 消息来源（群组ID），用于按群组ID或平台前缀选择文本模板
         :return: 早报文本
         :rtype: str
         """
-        date = str(news_data.get("date", "") or "")
-        news_items = news_data.get("news", []) or []
-        tip = str(news_data.get("tip", "") or "")
+        template = self.text_template
+        if origin:
+            prefix = origin.split(":", 1)[0]
+            template = self.text_templates.get(origin) or self.text_templates.get(prefix) or template
+        return self.text_formatter.format(news_data, template)
+
+    async def _fetch_manual_news(self):
+        """手动请求获取当期早报：最近获取过的直接复用，否则与进行中的其他手动请求合并为一次获取"""
+        if self._last_fetched and self.manual_cache_ttl:
+            fetched_at, news_data = self._last_fetched
+            if time.monotonic() - fetched_at < self.manual_cache_ttl:
+                self.admission.stats.cached += 1
+                return news_data
+        return await self.admission.collapse("fetch", self.fetch_news_data)
+
+    def _get_stale_news(self):
+        """所有接口都失败时，取存档中最近一期早报作为缓存早报；未开启兜底或无存档时返回 None"""
+        if not self.stale_fallback:
+            return None
+        news_data = self.archive.latest()
+        if news_data:
+            logger.warning(f"[每日早报] 早报接口不可用，使用存档中 {news_data.date} 的缓存早报")
+        return news_data
+
+    def _stale_notice(self, news_data: NewsPayload) -> str:
+        return f"⚠️ 早报接口暂时不可用，以下为 {news_data.date} 的缓存早报"
+
+    def _start_edition_watch(self, base_data: NewsPayload, stale: bool) -> None:
+        """启动后台任务，持续关注 base_data 之后的新内容（同一时间只保留一个，新的替换旧的）"""
+        window = self.stale_refresh_window if stale else self.update_check_window
+        if window <= 0:
+            return
+        if self._watch_task is not None and not self._watch_task.done():
+            self._watch_task.cancel()
+        self._watch_task = asyncio.get_running_loop().create_task(
+            self._watch_edition(base_data, window, stale)
+        )
 
-        if not isinstance(news_items, (list, tuple)):
-            news_items = [str(news_items)]
+    async def _watch_edition(self, base_data: NewsPayload, window: int, stale: bool):
+        """在 window 分钟内定期重新获取早报，内容与已推送的 base_data 不同时补发
 
-        text = f"【每日60秒早报】{date}\n\n"
-        for i, item in enumerate(news_items, 1):
-            s = str(item).strip()
-            if not s:
-                continue
-            text += f"{i}. {s}\n"
+        - stale=True: base_data 是接口失败时推送的缓存早报，按指数退避重试，获取到新早报补发后结束
+        - stale=False: base_data 是已推送的早报，按固定间隔检查接口是否修订了当期内容，每次修订都补发
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + window * 60
+        if stale:
+            delay, max_delay = STALE_RETRY_INITIAL_DELAY, STALE_RETRY_MAX_DELAY
+            logger.info(f"[每日早报] 后台重试已启动，将在 {window} 分钟内尝试补发最新早报")
+        else:
+            delay = max_delay = UPDATE_CHECK_INTERVAL
+            logger.info(f"[每日早报] 早报更新检查已启动，将在 {window} 分钟内检查 {base_data.date} 的早报是否有修订")
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    if stale:
+                        logger.warning("[每日早报] 补发窗口已结束，仍未获取到新早报")
+                    return
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, max_delay)
 
-        text += f"\n【今日提示】{tip}\n"
-        text += f"数据来源: 每日60秒早报"
+                try:
+                    news_data = await self.fetch_news_data()
+                except Exception:
+                    logger.exception("[每日早报] 后台获取早报异常")
+                    continue
+                if not news_data:
+                    logger.info(f"[每日早报] 后台获取早报仍失败，{delay} 秒后再次尝试")
+                    continue
+                if news_data.fingerprint == base_data.fingerprint:
+                    # 接口已恢复但内容一致（新一期尚未发布/未修订），继续等待
+                    logger.debug("[每日早报] 早报内容未变化，继续等待")
+                    continue
 
-        return text
+                notice = None
+                if news_data.date == base_data.date:
+                    changes = diff_payloads(base_data, news_data)
+                    logger.info(f"[每日早报] {news_data.date} 的早报有修订: {'、'.join(changes)}")
+                    notice = f"📝 今日早报有更新（{'、'.join(changes)}）"
+                else:
+                    logger.info(f"[每日早报] 获取到新早报 {news_data.date}，开始补发")
+                await self._coordinated_push(f"edition {news_data.fingerprint}", news_data, None if stale else notice)
+                if stale:
+                    return
+                base_data = news_data
+        except asyncio.CancelledError:
+            logger.info("[每日早报] 后台早报检查任务已取消")
+            raise
+        except Exception:
+            logger.exception("[每日早报] 后台早报检查任务异常")
 
     # 向指定群组推送60s早报
     async def send_daily_news(self):
@@ -267,103 +773,160 @@ class DailyNewsPlugin(Star):
         try:
             logger.info("[每日早报] 开始获取早报数据...")
             news_data = await self.fetch_news_data()
+            stale = False
             if not news_data:
-                logger.error("[每日早报] 获取早报数据失败，返回数据为空")
-                return
+                news_data = self._get_stale_news()
+                if not news_data:
+                    logger.error("[每日早报] 获取早报数据失败，返回数据为空")
+                    return
+                stale = True
             logger.debug(f"[每日早报] 获取到的早报数据: {news_data}")
-            
-            logger.info(f"[每日早报] 开始生成图片，使用本地绘制: {self.use_local_image_draw}")
-            image_data = None
-            if self.use_local_image_draw:
-                image_data = create_news_image_from_data(news_data, logger)
-                if not image_data:
-                    logger.error("[每日早报] 图片生成失败，可能是字体文件缺失，请检查 assets 目录中的字体文件")
-            else:
-                image_data = await self.download_image(news_data)
-            if image_data:
+            slot = f"{datetime.date.today().isoformat()} {self.push_time}"
+            await self._coordinated_push(slot, news_data, self._stale_notice(news_data) if stale else None)
+            if stale or self.push_on_update:
+                self._start_edition_watch(news_data, stale)
+        except Exception as e:
+            logger.error(f"[每日早报] 推送每日早报时出错: {e}")
+            logger.error(f"[每日早报] 错误类型: {type(e).__name__}")
+            logger.exception("[每日早报] 推送每日早报时异常")
+
+    async def _coordinated_push(self, slot: str, news_data: NewsPayload, notice: str = None):
+        """
+        推送一个时段的早报：未配置协调时直接推送全部群组；
+        配置了协调时与其他节点分片推送，slot 相同的推送在所有节点中只进行一次
+        """
+        with self.memory_budget.track(f"推送 {slot}", logger, lambda: self._renderer):
+            await self._push_slot(slot, news_data, notice)
+
+    async def _push_slot(self, slot: str, news_data: NewsPayload, notice: str = None):
+        if self.coordinator is None:
+            await self._push_news(news_data, notice)
+            return
+
+        async def push(groups, after_group):
+            await self._push_news(news_data, notice, groups=groups, after_group=after_group)
+
+        try:
+            delivered = await run_slot(self.coordinator, slot, self.target_groups, push, logger)
+            logger.info(f"[每日早报] 推送时段 {slot} 中本节点的分片已完成，本节点送达 {delivered} 个群组")
+            # 其他节点的分片不在这里等待，由心跳任务在其租约过期后接管
+            self._open_slots[slot] = (time.monotonic(), push)
+        except Exception:
+            # 协调存储不可用时宁可重复推送，也不漏推
+            logger.exception("[每日早报] 多实例协调失败，本节点推送全部群组")
+            await self._push_news(news_data, notice)
+
+    async def _push_news(self, news_data: NewsPayload, notice: str = None, groups: list[str] = None, after_group=None):
+        """把一期早报推送到目标群组；notice 为附带在早报前的提示（缓存早报/内容更新）
+
+        :param groups: 要推送的群组，默认全部目标群组
+        :param after_group: 每个群组推送完成后调用 after_group(群组ID, 是否送达)，返回 False 时停止推送（分片已被其他节点接管）
+        """
+        groups = self.target_groups if groups is None else groups
+        logger.info(f"[每日早报] 开始生成图片，使用本地绘制: {self.use_local_image_draw}")
+        # 目标群组用到的每种（输出档位, 模板）只生成一次
+        images_by_target = {}
+        for group_id in groups or [None]:
+            target = self._render_target(group_id)
+            if target in images_by_target:
+                continue
+            images = await self.get_news_images(news_data, origin=group_id)
+            images_by_target[target] = images
+            if not images and self.use_local_image_draw:
+                logger.error("[每日早报] 图片生成失败，可能是字体文件缺失，请检查 assets 目录中的字体文件")
+            if images:
                 logger.debug(
-                    f"[图片生成] 生成的图片 Base64 数据前 100 字符: {image_data[:100]}"
+                    f"[图片生成] 生成的图片 Base64 数据前 100 字符: {images[0][:100]}"
                 )
 
-            if image_data:
-                logger.info("[每日早报] 图片生成成功")
+            if images:
+                detail = f" (档位 {target[0].key}，模板 {target[1]})" if target else ""
+                logger.info(f"[每日早报] 图片生成成功，共 {len(images)} 张{detail}")
 
-            if not self.target_groups:
-                logger.warning("[每日早报] 未配置目标群组，无法推送")
-                return
+        if not groups:
+            logger.warning("[每日早报] 未配置目标群组，无法推送")
+            return
 
-            logger.info(
-                f"[每日早报] 准备向 {len(self.target_groups)} 个群组推送每日早报: {self.target_groups}"
-            )
+        logger.info(
+            f"[每日早报] 准备向 {len(groups)} 个群组推送每日早报: {groups}"
+        )
 
-            success_count = 0
-            for group_id in self.target_groups:
-                try:
-                    # 群组ID已在初始化时清理和验证，这里直接使用
-                    logger.info(f"[每日早报] 处理群组: {group_id}")
-                    
-                    # 再次验证（双重保险）
-                    if not group_id or not isinstance(group_id, str):
-                        logger.error(f"[每日早报] 群组ID无效: {group_id}")
-                        continue
-                    
-                    # 检查群组ID格式
-                    parts = group_id.split(":")
-                    if len(parts) != 3:
-                        logger.error(f"[每日早报] 群组ID格式错误，应为 '前缀:中缀:后缀'，实际: {group_id}")
-                        continue
-                    
-                    logger.info(f"[每日早报] 群组ID解析: 前缀={parts[0]}, 中缀={parts[1]}, 后缀={parts[2]}")
-                    
-                    send_any = False
-
-                    # 先发送图片（如果生成成功）
-                    if image_data:
-                        logger.debug(f"[每日早报] 图片Base64长度: {len(image_data)} 字符")
-                        logger.debug(f"[每日早报] 图片Base64前50字符: {image_data[:50]}")
-                        image_message_chain = self._build_image_chain(image_data)
-                        logger.info(f"[每日早报] 正在向群组 {group_id} 发送图片...")
-                        try:
-                            result = await self._send_message_safely(group_id, image_message_chain)
-                            logger.info(f"[每日早报] send_message 返回结果: {result} (类型: {type(result).__name__})")
-                            if result is not False and result is not None:
-                                send_any = True
-                                logger.info(f"[每日早报] 图片已成功发送到群组 {group_id}")
-                            else:
-                                logger.error(f"[每日早报] 图片发送失败，返回值为: {result}")
-                        except Exception:
-                            logger.exception(f"[每日早报] 图片发送失败，群组: {group_id}")
-
-                    # 再发送文本（按配置）
-                    if self.show_text_news:
-                        text_news = self.generate_news_text(news_data)
-                        text_message_chain = self._build_text_chain(text_news)
-                        logger.info(f"[每日早报] 正在向群组 {group_id} 发送文本...")
-                        try:
-                            result = await self._send_message_safely(group_id, text_message_chain)
-                            logger.info(f"[每日早报] 文本send_message 返回结果: {result}")
-                            if result is not False and result is not None:
-                                send_any = True
-                                logger.info(f"[每日早报] 文本已成功发送到群组 {group_id}")
-                            else:
-                                logger.warning(f"[每日早报] 文本发送失败，返回值为: {result}")
-                        except Exception:
-                            logger.exception(f"[每日早报] 文本发送失败，群组: {group_id}")
-
-                    if send_any:
-                        logger.info(f"[每日早报] 已成功向群 {group_id} 推送每日早报")
-                        success_count += 1
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logger.error(f"[每日早报] 向群组 {group_id} 推送消息时出错: {e}")
-                    logger.error(f"[每日早报] 错误类型: {type(e).__name__}")
-                    logger.exception(f"[每日早报] 群组推送异常，群组: {group_id}")
-            
-            logger.info(f"[每日早报] 推送完成，成功: {success_count}/{len(self.target_groups)}")
-        except Exception as e:
-            logger.error(f"[每日早报] 推送每日早报时出错: {e}")
-            logger.error(f"[每日早报] 错误类型: {type(e).__name__}")
-            logger.exception("[每日早报] 推送每日早报时异常")
+        success_count = 0
+        for group_id in groups:
+            send_any = False
+            try:
+                send_any = await self._push_to_group(group_id, images_by_target, news_data, notice)
+                if send_any:
+                    logger.info(f"[每日早报] 已成功向群 {group_id} 推送每日早报")
+                    success_count += 1
+            except Exception as e:
+                logger.error(f"[每日早报] 向群组 {group_id} 推送消息时出错: {e}")
+                logger.error(f"[每日早报] 错误类型: {type(e).__name__}")
+                logger.exception(f"[每日早报] 群组推送异常，群组: {group_id}")
+            # 无论成功、失败还是群组无效都记录一次，协调推送时借此续租并标记该群组已处理
+            if after_group is not None and not await after_group(group_id, send_any):
+                break
+            await asyncio.sleep(1)
+        
+        logger.info(f"[每日早报] 推送完成，成功: {success_count}/{len(groups)}")
+
+    async def _push_to_group(self, group_id: str, images_by_target: dict, news_data: NewsPayload, notice: str = None) -> bool:
+        """向一个群组发送早报图片（按群组的输出档位与模板取用）和（按配置）文本，返回是否有消息送达"""
+        send_any = False
+        # 群组ID已在初始化时清理和验证，这里直接使用
+        logger.info(f"[每日早报] 处理群组: {group_id}")
+
+        # 再次验证（双重保险）
+        if not group_id or not isinstance(group_id, str):
+            logger.error(f"[每日早报] 群组ID无效: {group_id}")
+            return False
+
+        # 检查群组ID格式
+        parts = group_id.split(":")
+        if len(parts) != 3:
+            logger.error(f"[每日早报] 群组ID格式错误，应为 '前缀:中缀:后缀'，实际: {group_id}")
+            return False
+
+        logger.info(f"[每日早报] 群组ID解析: 前缀={parts[0]}, 中缀={parts[1]}, 后缀={parts[2]}")
+
+        images = images_by_target.get(self._render_target(group_id))
+
+        # 先发送图片（如果生成成功）
+        if images:
+            logger.debug(f"[每日早报] 图片Base64长度: {sum(map(len, images))} 字符")
+            logger.debug(f"[每日早报] 图片Base64前50字符: {images[0][:50]}")
+            image_message_chain = self._build_image_chain(images, notice)
+            logger.info(f"[每日早报] 正在向群组 {group_id} 发送图片...")
+            try:
+                result = await self._send_message_safely(group_id, image_message_chain)
+                logger.info(f"[每日早报] send_message 返回结果: {result} (类型: {type(result).__name__})")
+                if result is not False and result is not None:
+                    send_any = True
+                    logger.info(f"[每日早报] 图片已成功发送到群组 {group_id}")
+                else:
+                    logger.error(f"[每日早报] 图片发送失败，返回值为: {result}")
+            except Exception:
+                logger.exception(f"[每日早报] 图片发送失败，群组: {group_id}")
+
+        # 再发送文本（按配置）
+        if self.show_text_news:
+            text_news = self.generate_news_text(news_data, group_id)
+            if notice and not images:
+                text_news = f"{notice}\n\n{text_news}"
+            text_message_chain = self._build_text_chain(text_news)
+            logger.info(f"[每日早报] 正在向群组 {group_id} 发送文本...")
+            try:
+                result = await self._send_message_safely(group_id, text_message_chain)
+                logger.info(f"[每日早报] 文本send_message 返回结果: {result}")
+                if result is not False and result is not None:
+                    send_any = True
+                    logger.info(f"[每日早报] 文本已成功发送到群组 {group_id}")
+                else:
+                    logger.warning(f"[每日早报] 文本发送失败，返回值为: {result}")
+            except Exception:
+                logger.exception(f"[每日早报] 文本发送失败，群组: {group_id}")
+
+        return send_any
 
     # 计算到明天指定时间的秒数
     def calculate_sleep_time(self):
@@ -443,6 +1006,7 @@ class DailyNewsPlugin(Star):
                 # 推送早报
                 logger.info(f"[每日早报] 定时推送触发，开始推送早报...")
                 try:
+                    self._daily_pushing = True
                     await self.send_daily_news()
                     logger.info(f"[每日早报] 定时推送完成")
                 except Exception as send_error:
@@ -450,6 +1014,8 @@ class DailyNewsPlugin(Star):
                     logger.error(f"[每日早报] 推送错误类型: {type(send_error).__name__}")
                     logger.exception("[每日早报] 推送过程中异常")
                     # 推送失败不影响下次定时，继续循环
+                finally:
+                    self._daily_pushing = False
 
                 # 推送完成后，立即重新计算下次推送时间（不等待60秒）
                 logger.info("[每日早报] 推送完成，立即重新计算下次推送时间...")
@@ -495,7 +1061,16 @@ class DailyNewsPlugin(Star):
             f"定时任务已取消: {'是' if task_cancelled else '否'}\n"
             f"当前时间: {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
             f"距离下次推送: {hours}小时{minutes}分钟\n"
+            f"━━━━━━━━━━━━━━━━━━━━\n"
+            f"早报镜像:\n"
         )
+        status_msg += "\n".join(self.mirror_pool.summary_lines()) + "\n"
+        status_msg += f"手动请求: {self.admission.stats.summary()}\n"
+        status_msg += f"内存: {self.memory_budget.summary(self._image_cache, self._renderer)}\n"
+        if self.config_watcher is not None and self.config_watch_interval > 0:
+            status_msg += f"配置热更新: 每 {self.config_watch_interval} 秒检查配置文件\n"
+        if self.coordinator is not None:
+            status_msg += f"多实例协调: 本节点 {self.coordinator.node_id}\n"
         
         if not self.target_groups:
             status_msg += "\n⚠️ 警告: 未配置目标群组，定时推送无法工作！"
@@ -559,12 +1134,9 @@ class DailyNewsPlugin(Star):
             
             # 生成或下载图片
             logger.info("[测试] 开始生成/下载早报图片...")
-            if not self.use_local_image_draw:
-                image_data = await self.download_image(news_data)
-            else:
-                image_data = create_news_image_from_data(news_data, logger)
+            images = await self.get_news_images(news_data)
             
-            if not image_data:
+            if not images:
                 yield event.plain_result("❌ 图片生成/下载失败")
                 return
             
@@ -594,9 +1166,9 @@ class DailyNewsPlugin(Star):
                     
                     # 发送今日早报图片
                     logger.info(f"[测试] 正在向群组 {group_id} 发送今日早报图片...")
-                    image_message_chain = MessageChain()
-                    image_message = [Image.fromBase64(image_data)]
-                    image_message_chain.chain = image_message
+                    # 按该群组平台的输出档位发送，生成失败时退回默认档位的图片
+                    group_images = await self.get_news_images(news_data, origin=group_id) or images
+                    image_message_chain = self._build_image_chain(group_images)
                     
                     result = await self.context.send_message(group_id, image_message_chain)
                     logger.info(f"[测试] send_message 返回结果: {result} (类型: {type(result).__name__})")
@@ -634,53 +1206,81 @@ class DailyNewsPlugin(Star):
 
 
     @filter.command("get_news", alias={'早报', 'news', '获取早报', '今日早报', '60秒早报','60s'})
-    async def manual_get_news(self, event: AstrMessageEvent, mode: str = "all"):
+    async def manual_get_news(self, event: AstrMessageEvent, mode: str = "all", date: str = ""):
         """手动获取今日早报
 
         Args:
             mode: 获取模式，可选值: image(仅图片)/text(仅文本)/all(图片+文本)
+            date: 可选，获取存档中指定日期的早报，如 2025-01-01 / 昨天
         """
         try:
             self._ensure_daily_task_started()
 
             mode = (mode or "all").strip().lower()
+            # 允许省略模式直接写日期: /get_news 2025-01-01
+            if mode not in {"image", "text", "all"} and not date and parse_archive_date(mode):
+                mode, date = "all", mode
             if mode not in {"image", "text", "all"}:
                 yield event.plain_result("❌ 模式参数非法，可选: image/text/all")
                 return
 
+            archive_date = None
+            if date:
+                archive_date = parse_archive_date(str(date))
+                if not archive_date:
+                    yield event.plain_result("❌ 日期格式非法，示例: 2025-01-01 / 20250101 / 昨天")
+                    return
+
             send_image = mode in {"image", "all"}
             send_text = mode in {"text", "all"}
 
-            logger.info(f"[每日早报] 手动获取早报，模式: {mode}")
+            rejection = self.admission.try_acquire(str(event.get_sender_id() or ""), event.unified_msg_origin)
+            if rejection:
+                logger.info(f"[每日早报] 手动获取早报被拒绝（{rejection.reason}），来源: {event.unified_msg_origin}")
+                if rejection.notify:
+                    yield event.plain_result(rejection.message)
+                return
 
             logger.info(f"[每日早报] 手动获取早报，模式: {mode}")
             try:
-                news_data = await self.fetch_news_data()
+                if archive_date:
+                    # 历史早报只从本地存档读取，不访问网络
+                    news_data = self.archive.get(archive_date)
+                    if not news_data:
+                        yield event.plain_result(f"❌ 存档中没有 {archive_date} 的早报，可使用 /news_history 查看已存档日期")
+                        return
+                else:
+                    news_data = await self._fetch_manual_news()
+                    if not news_data:
+                        news_data = self._get_stale_news()
+                        if news_data:
+                            yield event.plain_result(self._stale_notice(news_data))
                 logger.debug(f"[每日早报] 获取到的早报数据: {news_data}")
                 if not news_data:
                     yield event.plain_result("❌ 获取早报数据失败")
                     return
 
                 origin = event.unified_msg_origin
-                image_data = None
+                images = None
 
                 if send_image:
-                    # 生成/下载图片（失败不影响文本发送）
-                    if not self.use_local_image_draw:
-                        image_data = await self.download_image(news_data)
-                    else:
-                        image_data = create_news_image_from_data(news_data, logger)
-
-                    if not image_data:
+                    # 生成/下载图片（失败不影响文本发送）；同一期同一档位的图片进行中时等待同一结果
+                    allow_network = not archive_date
+                    images = await self.admission.collapse(
+                        ("images", news_data.fingerprint, self._image_variant(self._render_target(origin)), allow_network),
+                        lambda: self.get_news_images(news_data, allow_network=allow_network, origin=origin),
+                    )
+
+                    if not images:
                         logger.error("[每日早报] 图片生成失败")
                         yield event.plain_result("⚠️ 图片生成失败，请检查字体文件是否存在于 assets 目录中")
 
-                    if image_data:
-                        logger.debug(f"[图片生成] 生成的图片 Base64 数据前 100 字符: {image_data[:100]}")
+                    if images:
+                        logger.debug(f"[图片生成] 生成的图片 Base64 数据前 100 字符: {images[0][:100]}")
 
                 # 发送图片
-                if send_image and image_data:
-                    image_message_chain = self._build_image_chain(image_data)
+                if send_image and images:
+                    image_message_chain = self._build_image_chain(images)
                     logger.info(f"[每日早报] 向 {origin} 发送图片")
                     try:
                         await self._send_message_safely(origin, image_message_chain)
@@ -689,7 +1289,7 @@ class DailyNewsPlugin(Star):
 
                 # 发送文本
                 if send_text:
-                    text_news = self.generate_news_text(news_data)
+                    text_news = self.generate_news_text(news_data, origin)
                     text_message_chain = self._build_text_chain(text_news)
                     logger.info(f"[每日早报] 向 {origin} 发送文本")
                     try:
@@ -702,6 +1302,8 @@ class DailyNewsPlugin(Star):
             except Exception as e:
                 logger.error(f"[每日早报] 发送每日早报时出错: {e}")
                 logger.exception("[每日早报] 发送每日早报异常")
+            finally:
+                self.admission.release()
 
         except Exception as e:
             logger.error(f"[每日早报] 手动获取早报时出错: {e}")
@@ -710,8 +1312,48 @@ class DailyNewsPlugin(Star):
         finally:
             event.stop_event()
 
+    @filter.command("news_history", alias={'早报历史', 'history', '历史早报'})
+    async def news_history(self, event: AstrMessageEvent):
+        """查看已存档的早报日期"""
+        try:
+            self._ensure_daily_task_started()
+            dates = self.archive.dates()
+            if not dates:
+                yield event.plain_result("暂无已存档的早报")
+                return
+            shown = dates[:15]
+            history_msg = (
+                f"已存档早报 ({len(dates)} 天)\n"
+                f"━━━━━━━━━━━━━━━━━━━━\n"
+                + "\n".join(shown)
+                + ("\n..." if len(dates) > len(shown) else "")
+                + "\n━━━━━━━━━━━━━━━━━━━━\n"
+                f"使用 /get_news <日期> 获取指定日期的早报，如 /get_news {shown[0]}"
+            )
+            yield event.plain_result(history_msg)
+        except Exception as e:
+            logger.error(f"[每日早报] 查询早报存档时出错: {e}")
+            logger.exception("[每日早报] 查询早报存档异常")
+            yield event.plain_result(f"查询失败: {str(e)}")
+        finally:
+            event.stop_event()
+
     async def terminate(self):
         """可选择实现异步的插件销毁方法，当插件被卸载/停用时会调用。"""
+        for task in (
+            self._watch_task,
+            self._health_check_task,
+            self._heartbeat_task,
+            self._takeover_task,
+            self._config_watch_task,
+        ):
+            if task is not None:
+                task.cancel()
+        if self.coordinator is not None:
+            try:
+                await asyncio.to_thread(self.coordinator.leave)
+            except Exception as e:
+                logger.warning(f"[每日早报] 注销协调节点失败: {e}")
         if self._daily_task is None:
             return
         self._daily_task.cancel()
@@ -0,0 +1,98 @@
+"""
+推送的内存预算
+推送之间常驻内存的主要是两类数据：
+- 每种绘制计划最近一次的画布，只用于同一期早报更新时的增量绘制，释放后下次完整重绘即可
+- 图片缓存中最近几期、各种档位的 Base64 图片
+超出预算时先释放画布，仍超出时按最近最少使用淘汰图片缓存（最近使用的一份始终保留）
+推送期间可用 tracemalloc 记录 Python 堆的峰值；Pillow 画布不经过 Python 的内存分配器，按像素尺寸单独统计
+"""
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+MB = 1024 * 1024
+
+# tracemalloc 按进程统计，同时进行的多次记录（如定时推送与修订补发）共用一次统计：
+# 只有第一个开始的记录重置峰值，最后一个结束的记录才关闭由这里开启的 tracemalloc
+_active_tracks = 0
+_track_entries = 0
+_started_tracing = False
+
+
+def images_bytes(images: Optional[List[str]]) -> int:
+    """Base64 图片（ASCII 字符串，每个字符占一个字节）占用的内存"""
+    return sum(len(data) for data in images or ())
+
+
+def _canvas_bytes(renderer) -> int:
+    # 绘制模块按需加载，尚未加载时没有画布
+    return renderer.retained_canvas_bytes() if renderer is not None else 0
+
+
+class MemoryBudget:
+    """画布与图片缓存的内存预算，以及推送期间的内存峰值报告"""
+
+    def __init__(self, budget_mb: float = 0, report: bool = False):
+        self.budget = max(0, int(float(budget_mb) * MB))  # 0 表示不限制
+        self.report = bool(report)
+        self.last_report = ""  # 最近一次推送的内存报告，供 /get_status 展示
+
+    def trim(self, image_cache: OrderedDict, renderer=None) -> int:
+        """把保留的画布与图片缓存控制在预算内，返回释放的字节数"""
+        if not self.budget:
+            return 0
+        cached = sum(images_bytes(images) for images in image_cache.values())
+        freed = 0
+        if renderer is not None and cached + _canvas_bytes(renderer) > self.budget:
+            freed += renderer.release_canvases(max(0, self.budget - cached))
+        while cached > self.budget and len(image_cache) > 1:
+            _, images = image_cache.popitem(last=False)
+            cached -= images_bytes(images)
+            freed += images_bytes(images)
+        return freed
+
+    def summary(self, image_cache: OrderedDict, renderer=None) -> str:
+        retained = sum(images_bytes(images) for images in image_cache.values()) + _canvas_bytes(renderer)
+        budget = f"{self.budget / MB:.0f}MB" if self.budget else "不限"
+        text = f"常驻 {retained / MB:.1f}MB / 预算 {budget}"
+        return f"{text}，{self.last_report}" if self.last_report else text
+
+    @contextmanager
+    def track(self, label: str, logger, renderer_getter: Callable[[], object]) -> Iterator[None]:
+        """
+        记录一次推送期间 Python 堆的峰值（相对推送开始时），未开启报告时不做任何事
+        tracemalloc 按进程统计，同时运行的其他插件的分配也会计入；
+        与其他记录重叠时峰值在重叠期间共同统计，报告中会注明
+        """
+        global _active_tracks, _track_entries, _started_tracing
+        if not self.report:
+            yield
+            return
+        if _active_tracks == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            tracemalloc.reset_peak()
+        overlapped = _active_tracks > 0
+        _active_tracks += 1
+        _track_entries += 1
+        entries = _track_entries
+        base, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            overlapped = overlapped or _track_entries != entries
+            _active_tracks -= 1
+            if _active_tracks == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+            canvases = _canvas_bytes(renderer_getter())
+            self.last_report = (
+                f"{label}: Python 堆峰值 +{max(0, peak - base) / MB:.1f}MB，结束时 +{(current - base) / MB:.1f}MB，"
+                f"画布 {canvases / MB:.1f}MB{'（与其他推送同时进行）' if overlapped else ''}"
+            )
+            logger.info(f"[每日早报] 内存 {self.last_report}")
+            if self.budget and peak - base + canvases > self.budget:
+                logger.warning(f"[每日早报] 推送期间内存峰值超出预算 {self.budget / MB:.0f}MB")
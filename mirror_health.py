@@ -0,0 +1,176 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# --- 熔断器默认参数 ---
+DEFAULT_MIRROR_URLS = [
+    "https://60s.viki.moe/v2/60s",
+    "https://60s.b23.run/v2/60s",
+    "https://60s-api-cf.viki.moe/v2/60s",
+    "https://60s-api.114128.xyz/v2/60s",
+    "https://60s-api-cf.114128.xyz/v2/60s",
+]
+FAILURE_THRESHOLD = 3  # 连续失败多少次后熔断
+OPEN_COOLDOWN = 300  # 熔断后多少秒允许半开探测
+MAX_OPEN_COOLDOWN = 3600  # 探测反复失败时冷却时间的上限（按倍数增长）
+ERROR_RATE_WINDOW = 20  # 统计错误率的最近请求数
+PROBE_TIMEOUT = 60  # 半开探测迟迟没有结果（如请求被取消）时，多少秒后允许再次探测
+
+STATE_CLOSED = "closed"  # 正常
+STATE_OPEN = "open"  # 熔断中，跳过
+STATE_HALF_OPEN = "half_open"  # 冷却结束，允许一次探测
+
+STATE_NAMES = {STATE_CLOSED: "正常", STATE_OPEN: "熔断", STATE_HALF_OPEN: "探测中"}
+
+
+class MirrorHealth:
+    """单个早报镜像的健康状态"""
+
+    __slots__ = (
+        "url", "state", "consecutive_failures", "recent_results",
+        "last_latency", "last_error", "opened_at", "cooldown", "probe_started",
+    )
+
+    def __init__(self, url: str):
+        self.url = url
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.recent_results: Deque[bool] = deque(maxlen=ERROR_RATE_WINDOW)
+        self.last_latency: Optional[float] = None
+        self.last_error: str = ""
+        self.opened_at = 0.0
+        self.cooldown = OPEN_COOLDOWN
+        self.probe_started = 0.0  # 进行中的半开探测的开始时间，0 表示没有
+
+    @property
+    def error_rate(self) -> float:
+        if not self.recent_results:
+            return 0.0
+        return self.recent_results.count(False) / len(self.recent_results)
+
+    def cooldown_elapsed(self, now: float) -> bool:
+        return now - self.opened_at >= self.cooldown
+
+
+class MirrorPool:
+    """
+    带熔断器的镜像列表
+    - 连续失败达到阈值后熔断，熔断期间 select() 不再返回该镜像，不再为它付出连接/读取超时
+    - 冷却结束后进入半开状态，仅放行一次探测：成功则恢复，失败则以更长的冷却时间重新熔断
+    """
+
+    def __init__(self, urls: List[str], failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = OPEN_COOLDOWN):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_cooldown = cooldown
+        self.mirrors: Dict[str, MirrorHealth] = {}
+        for url in urls:
+            if url not in self.mirrors:
+                self.mirrors[url] = MirrorHealth(url)
+                self.mirrors[url].cooldown = cooldown
+
+    def update_urls(self, urls: List[str]) -> None:
+        """按新的镜像列表更新（配置热更新），仍在列表中的镜像保留原有的熔断状态与统计"""
+        mirrors: Dict[str, MirrorHealth] = {}
+        for url in urls:
+            if url in mirrors:
+                continue
+            mirror = self.mirrors.get(url)
+            if mirror is None:
+                mirror = MirrorHealth(url)
+                mirror.cooldown = self.base_cooldown
+            mirrors[url] = mirror
+        self.mirrors = mirrors
+
+    def _refresh_state(self, mirror: MirrorHealth, now: float) -> None:
+        if mirror.state == STATE_OPEN and mirror.cooldown_elapsed(now):
+            mirror.state = STATE_HALF_OPEN
+
+    def begin_request(self, url: str) -> bool:
+        """
+        请求镜像前调用：半开状态的镜像同一时间只放行一次探测，已有探测进行中时返回 False，调用方跳过该镜像
+        探测结果由 record_success/record_failure 记录
+        """
+        mirror = self.mirrors.get(url)
+        if mirror is None:
+            return True
+        now = time.monotonic()
+        self._refresh_state(mirror, now)
+        if mirror.state != STATE_HALF_OPEN:
+            return True
+        if mirror.probe_started and now - mirror.probe_started < PROBE_TIMEOUT:
+            return False
+        mirror.probe_started = now
+        return True
+
+    def select(self) -> List[MirrorHealth]:
+        """
+        按配置顺序返回本次可以请求的镜像（跳过熔断中的镜像）
+        若所有镜像都处于熔断，则放行最早熔断的一个作为探测，避免完全不发请求
+        半开的镜像同一时间只由一个请求探测，请求前须调用 begin_request
+        """
+        now = time.monotonic()
+        available = []
+        for mirror in self.mirrors.values():
+            self._refresh_state(mirror, now)
+            if mirror.state != STATE_OPEN:
+                available.append(mirror)
+        if not available and self.mirrors:
+            available.append(min(self.mirrors.values(), key=lambda m: m.opened_at))
+        return available
+
+    def due_for_probe(self) -> List[MirrorHealth]:
+        """冷却已结束、等待探测的镜像（供后台健康检查使用）"""
+        now = time.monotonic()
+        due = []
+        for mirror in self.mirrors.values():
+            self._refresh_state(mirror, now)
+            if mirror.state == STATE_HALF_OPEN:
+                due.append(mirror)
+        return due
+
+    def record_success(self, url: str, latency: float) -> None:
+        mirror = self.mirrors.get(url)
+        if mirror is None:
+            return
+        mirror.recent_results.append(True)
+        mirror.consecutive_failures = 0
+        mirror.last_latency = latency
+        mirror.last_error = ""
+        mirror.state = STATE_CLOSED
+        mirror.cooldown = self.base_cooldown
+        mirror.probe_started = 0.0
+
+    def record_failure(self, url: str, error: str, latency: Optional[float] = None) -> bool:
+        """记录一次失败，返回 True 表示本次失败导致镜像进入熔断"""
+        mirror = self.mirrors.get(url)
+        if mirror is None:
+            return False
+        mirror.recent_results.append(False)
+        mirror.consecutive_failures += 1
+        mirror.probe_started = 0.0
+        mirror.last_error = error
+        if latency is not None:
+            mirror.last_latency = latency
+
+        if mirror.state == STATE_OPEN:
+            # 全部熔断时放行的强制探测失败，重新开始计时
+            mirror.opened_at = time.monotonic()
+            return False
+        if mirror.state == STATE_HALF_OPEN:
+            # 探测失败：重新熔断，冷却时间翻倍
+            mirror.cooldown = min(mirror.cooldown * 2, MAX_OPEN_COOLDOWN)
+        elif mirror.consecutive_failures < self.failure_threshold:
+            return False
+        mirror.state = STATE_OPEN
+        mirror.opened_at = time.monotonic()
+        return True
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for mirror in self.mirrors.values():
+            latency = f"{mirror.last_latency * 1000:.0f}ms" if mirror.last_latency is not None else "-"
+            lines.append(
+                f"{mirror.url} [{STATE_NAMES[mirror.state]}] "
+                f"错误率 {mirror.error_rate:.0%} 连续失败 {mirror.consecutive_failures} 延迟 {latency}"
+            )
+        return lines
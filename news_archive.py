@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import base64
+import datetime
+from typing import Optional, Dict, Any, List
+
+try:
+    from .news_payload import NewsPayload, normalize_date
+except ImportError:
+    from news_payload import NewsPayload, normalize_date
+
+# --- 存档常量 ---
+INDEX_FILE_NAME = "index.json"
+DEFAULT_MAX_DAYS = 30  # 默认保留的早报天数
+DEFAULT_IMAGE_KEEP = 7  # 默认仅保留最近几天的图片（图片体积远大于 JSON）
+
+
+def parse_archive_date(value: str) -> Optional[str]:
+    """
+    把用户输入的日期解析为存档键 'YYYY-MM-DD'
+    支持: 2025-01-01 / 2025/01/01 / 2025年1月1日 / 20250101 / 今天 / 昨天 / 前天 / today / yesterday
+    无法解析时返回 None
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lower()
+    if not value:
+        return None
+
+    relative_days = {"今天": 0, "today": 0, "昨天": 1, "yesterday": 1, "前天": 2}
+    if value in relative_days:
+        day = datetime.date.today() - datetime.timedelta(days=relative_days[value])
+        return day.isoformat()
+
+    return normalize_date(value)
+
+
+class NewsArchive:
+    """
+    按日期存储早报的本地存档
+    目录结构：
+        <root>/index.json        日期 -> 条目信息 的索引，加载一次后常驻内存
+        <root>/YYYY-MM-DD.json   归一化后的早报数据
+        <root>/YYYY-MM-DD.img    对应的图片（可选），分页图片的后续页为 YYYY-MM-DD.<页码>.img
+    """
+
+    def __init__(self, root_dir: str, logger, max_days: int = DEFAULT_MAX_DAYS, image_keep: int = DEFAULT_IMAGE_KEEP):
+        self.root_dir = root_dir
+        self.logger = logger
+        self.max_days = max(1, int(max_days))
+        self.image_keep = max(0, int(image_keep))
+        self._index_path = os.path.join(root_dir, INDEX_FILE_NAME)
+        os.makedirs(root_dir, exist_ok=True)
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    # ---------- 索引读写 ----------
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"[早报存档] 索引文件损坏，将重建: {e}")
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> Dict[str, Dict[str, Any]]:
+        """索引缺失或损坏时，根据目录中已有的文件重建"""
+        index = {}
+        for name in os.listdir(self.root_dir):
+            stem, ext = os.path.splitext(name)
+            if ext == ".img":
+                # 无法确认旧图片由哪种方式生成，重建时不再信任图片
+                self._remove_file(os.path.join(self.root_dir, name))
+                continue
+            if ext != ".json" or name == INDEX_FILE_NAME or not parse_archive_date(stem):
+                continue
+            path = os.path.join(self.root_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    payload = NewsPayload.from_raw(json.load(f))
+            except Exception:
+                continue
+            if payload is None:
+                continue
+            index[stem] = {"fingerprint": payload.fingerprint, "saved_at": os.path.getmtime(path)}
+        return index
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """先写临时文件再替换，避免进程中断留下半个文件"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _flush_index(self) -> None:
+        raw = json.dumps(self._index, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        self._write_atomic(self._index_path, raw)
+
+    def _payload_path(self, date_str: str) -> str:
+        return os.path.join(self.root_dir, f"{date_str}.json")
+
+    def _image_path(self, date_str: str, page: int = 0) -> str:
+        if page:
+            return os.path.join(self.root_dir, f"{date_str}.{page}.img")
+        return os.path.join(self.root_dir, f"{date_str}.img")
+
+    def _remove_images(self, date_str: str, entry: Dict[str, Any], keep: int = 0) -> None:
+        """删除条目的图片文件（保留前 keep 页）"""
+        for page in range(keep, entry.get("pages", 1)):
+            self._remove_file(self._image_path(date_str, page))
+
+    # ---------- 写入 ----------
+    def save(self, payload: NewsPayload) -> bool:
+        """
+        存档一份早报数据；同一天的内容未变化时不重复写盘
+        返回 True 表示内容有更新（新日期或同日期内容变化）
+        """
+        date_str = payload.date
+        if not payload.has_standard_date:
+            self.logger.warning(f"[早报存档] 早报日期无法识别，不存档: {date_str}")
+            return False
+        fingerprint = payload.fingerprint
+        entry = self._index.get(date_str, {})
+        if entry.get("fingerprint") == fingerprint:
+            return False
+
+        try:
+            raw = json.dumps(payload.to_dict(), ensure_ascii=False).encode("utf-8")
+            self._write_atomic(self._payload_path(date_str), raw)
+            # 内容变化后旧图片已不再对应，交由 save_images 重新写入
+            if entry.get("image"):
+                self._remove_images(date_str, entry)
+            self._index[date_str] = {"fingerprint": fingerprint, "saved_at": time.time()}
+            self.compact()
+            self._flush_index()
+            self.logger.info(f"[早报存档] 已存档 {date_str} 的早报")
+            return True
+        except Exception as e:
+            self.logger.warning(f"[早报存档] 存档 {date_str} 失败: {e}")
+            return False
+
+    def save_images(self, payload: NewsPayload, images: List[str], variant: str = "local") -> None:
+        """
+        存档早报图片（base64，分页绘制时为多页），仅当图片与当前存档的数据内容一致时写入
+        variant 区分图片来源（本地绘制/接口下载/分页参数），切换配置后不会复用另一种来源的图片
+        """
+        date_str = payload.date
+        entry = self._index.get(date_str)
+        if not entry or not images or self.image_keep <= 0:
+            return
+        fingerprint = payload.fingerprint
+        image_tag = f"{variant}:{fingerprint}"
+        if entry.get("fingerprint") != fingerprint or entry.get("image") == image_tag:
+            return
+        try:
+            for page, image_data in enumerate(images):
+                self._write_atomic(self._image_path(date_str, page), base64.b64decode(image_data))
+            if entry.get("image"):
+                self._remove_images(date_str, entry, keep=len(images))
+            entry["image"] = image_tag
+            if len(images) > 1:
+                entry["pages"] = len(images)
+            else:
+                entry.pop("pages", None)
+            self.compact()
+            self._flush_index()
+        except Exception as e:
+            self.logger.warning(f"[早报存档] 存档 {date_str} 的图片失败: {e}")
+
+    # ---------- 读取 ----------
+    def dates(self) -> List[str]:
+        """已存档的日期，按时间倒序"""
+        return sorted(self._index.keys(), reverse=True)
+
+    def get(self, date_str: str) -> Optional[NewsPayload]:
+        if date_str not in self._index:
+            return None
+        try:
+            with open(self._payload_path(date_str), "rb") as f:
+                return NewsPayload.from_raw(json.load(f))
+        except Exception as e:
+            self.logger.warning(f"[早报存档] 读取 {date_str} 的早报失败: {e}")
+            return None
+
+    def get_images(self, date_str: str, payload: Optional[NewsPayload] = None, variant: Optional[str] = None) -> Optional[List[str]]:
+        """
+        读取存档图片（base64，按页排列）
+        传入 payload / variant 时会校验图片是否由该内容、该来源生成，不一致则视为没有图片
+        """
+        entry = self._index.get(date_str)
+        if not entry or not entry.get("image"):
+            return None
+        image_variant, _, image_fingerprint = entry["image"].partition(":")
+        if payload is not None and image_fingerprint != payload.fingerprint:
+            return None
+        if variant is not None and image_variant != variant:
+            return None
+        try:
+            images = []
+            for page in range(entry.get("pages", 1)):
+                with open(self._image_path(date_str, page), "rb") as f:
+                    images.append(base64.b64encode(f.read()).decode("utf-8"))
+            return images
+        except Exception as e:
+            self.logger.warning(f"[早报存档] 读取 {date_str} 的图片失败: {e}")
+            return None
+
+    def latest(self) -> Optional[NewsPayload]:
+        for date_str in self.dates():
+            payload = self.get(date_str)
+            if payload:
+                return payload
+        return None
+
+    # ---------- 压缩 ----------
+    def _remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def compact(self) -> None:
+        """删除超出保留天数的早报，以及超出保留数量的旧图片（只改内存索引，由调用方落盘）"""
+        dates = self.dates()
+        for date_str in dates[self.max_days:]:
+            self._remove_file(self._payload_path(date_str))
+            self._remove_images(date_str, self._index.pop(date_str))
+        for date_str in dates[self.image_keep:self.max_days]:
+            entry = self._index.get(date_str)
+            if entry and entry.get("image"):
+                self._remove_images(date_str, entry)
+                entry.pop("image", None)
+                entry.pop("pages", None)
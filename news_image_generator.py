@@ -1,36 +1,40 @@
 import os
 import datetime
 import base64
+import time
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Optional, Dict, Any, Tuple
-from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, List, Optional, Sequence, Tuple
+from PIL import Image, ImageDraw
 # 支持直接运行和作为模块导入
 try:
     from .config import CURRENT_DIR
+    from .news_payload import NewsPayload
+    from .font_subset import get_subset_cache, header_glyphs, common_glyphs
+    from .font_manager import CoverageIndex, FontChain, SizedFontChain, SYSTEM_FALLBACK_FONTS
+    from .render_profile import DEFAULT_PROFILE, SUPPORTED_FORMATS, RenderProfile, parse_render_profile
+    from .news_template import DEFAULT_TEMPLATE_NAME, DrawPlan, LineStep, RectStep, TextStep, get_template_registry
+    from .lunar_calendar import format_lunar_date
 except ImportError:
     CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+    from news_payload import NewsPayload
+    from font_subset import get_subset_cache, header_glyphs, common_glyphs
+    from font_manager import CoverageIndex, FontChain, SizedFontChain, SYSTEM_FALLBACK_FONTS
+    from render_profile import DEFAULT_PROFILE, SUPPORTED_FORMATS, RenderProfile, parse_render_profile
+    from news_template import DEFAULT_TEMPLATE_NAME, DrawPlan, LineStep, RectStep, TextStep, get_template_registry
+    from lunar_calendar import format_lunar_date
 
 # --- 配置常量 ---
 BASE_IMAGE_DIR = os.path.join(CURRENT_DIR, "assets")
 FONT_PATH = os.path.join(BASE_IMAGE_DIR, "汉仪帅线体.ttf")  # 顶部区域字体
 FONT_MSYH_PATH = os.path.join(BASE_IMAGE_DIR, "微软雅黑.ttf")  # 微软雅黑（新闻内容）
-TEXT_COLOR = (0, 0, 0)  # 文本颜色 (黑色)
-
-# --- 布局常量 ---
-OUTER_MARGIN = 50  # 图片内容外边距
-MARGIN_X = 50  # 内容左右边距
-TOP_BAR_HEIGHT = 300  # 顶部区域高度（调大）
-DATE_AREA_HEIGHT = 80  # 日期/主标题区域高度
-NEWS_LINE_SPACING = 8  # 行间距
-NEWS_ITEM_SPACING = 25  # 不同新闻条目之间的垂直间距
-NEWS_TOP_MARGIN = 20  # 新闻列表上边距
-NEWS_BOTTOM_MARGIN = 0  # 新闻列表下边距
-BOTTOM_MARGIN = 50  # 底部边距
-WEEKDAY_SPACING = 25  # 中英文星期之间的边距
-
-# --- 图片尺寸常量 ---
-IMAGE_WIDTH = 1000  # 图片宽度（高度动态计算）
+# 布局、颜色与字号由模板决定，见 templates/default.json
+
+# --- 分页常量 ---
+PAGE_MIN_HEIGHT = 800  # 分页高度下限（1 倍缩放时），避免顶部区域之后只能放下一两条新闻
+PAGE_ENCODE_WORKERS = 4  # 并行编码的线程数
+PAGE_MAX_COUNT = 9  # 按体积上限拆分后的最大页数，避免一条新闻一张图
 
 # --- 星期几映射 ---
 WEEKDAY_EN = {
@@ -53,23 +57,10 @@ WEEKDAY_CN = {
     "Sun": "星期日"
 }
 
-# --- 一周七天对应的颜色（RGB）---
-WEEKDAY_COLORS = {
-    "Mon": (43,128,235),    # 钢蓝色 - 星期一
-    "Tue": (34, 139, 34),     # 绿色 - 星期二
-    "Wed": (255, 140, 0),     # 橙色 - 星期三
-    "Thu": (0,191,233),     # 绿色 - 星期四
-    "Fri": (220, 20, 60),     # 红色 - 星期五
-    "Sat": (255, 165, 0),     # 金色 - 星期六
-    "Sun": (255, 69, 0),      # 橙红色 - 星期日
-    "default": (70, 130, 180)  # 默认蓝色
-}
-
 
 def wrap_text_pixel(
-    draw: ImageDraw.ImageDraw,
     text: str,
-    font: ImageFont.FreeTypeFont,
+    font: SizedFontChain,
     max_width: int,
     line_spacing: int,
 ) -> Tuple[str, int]:
@@ -130,11 +121,7 @@ def wrap_text_pixel(
             else ""
         )
         test_line = current_line + separator + word
-        try:
-            text_width = font.getlength(test_line)
-        except AttributeError:
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            text_width = bbox[2] - bbox[0]
+        text_width = font.getlength(test_line)
 
         if text_width <= max_width:
             current_line = test_line
@@ -142,19 +129,11 @@ def wrap_text_pixel(
             if current_line:
                 lines.append(current_line)
             current_line = word
-            try:
-                text_width = font.getlength(current_line)
-            except AttributeError:
-                bbox = draw.textbbox((0, 0), current_line, font=font)
-                text_width = bbox[2] - bbox[0]
+            text_width = font.getlength(current_line)
 
             while text_width > max_width and len(current_line) > 1:
                 current_line = current_line[:-1]
-                try:
-                    text_width = font.getlength(current_line)
-                except AttributeError:
-                    bbox = draw.textbbox((0, 0), current_line, font=font)
-                    text_width = bbox[2] - bbox[0]
+                text_width = font.getlength(current_line)
 
     if current_line:
         lines.append(current_line)
@@ -163,53 +142,192 @@ def wrap_text_pixel(
     if not final_text:
         return "", 0
 
-    bbox_multi = draw.multiline_textbbox(
-        (0, 0), final_text, font=font, spacing=line_spacing
-    )
+    bbox_multi = font.text_bbox((0, 0), final_text, spacing=line_spacing)
     actual_height = bbox_multi[3] - bbox_multi[1]
 
     return final_text, actual_height
 
 
-def get_lunar_date(date: datetime.datetime) -> str:
+_fallback_fonts: List[str] = []
+_font_chains: Dict[str, FontChain] = {}
+_coverage_index: Optional[CoverageIndex] = None
+
+
+def configure_fallback_fonts(paths: Sequence[str]) -> None:
+    """设置额外的回退字体（插件配置 fallback_fonts），排在内置字体之后、系统字体之前"""
+    global _fallback_fonts
+    paths = [str(p).strip() for p in paths if str(p).strip()]
+    if paths == _fallback_fonts:
+        return
+    _fallback_fonts = paths
+    _font_chains.clear()
+
+
+def get_font_chain(kind: str, logger=None) -> FontChain:
     """
-    获取农历日期（简化版本）
-    实际应用中可以使用 zhdate 等库进行准确的农历转换
+    获取字体回退链（进程内只构建一次）
+    - header: 顶部区域，汉仪帅线体顶部子集 -> 汉仪帅线体常用字子集 -> 汉仪帅线体 -> 微软雅黑 -> 回退字体
+    - news: 新闻正文，微软雅黑常用字子集 -> 微软雅黑 -> 汉仪帅线体常用字子集 -> 汉仪帅线体 -> 回退字体
+    子集只覆盖常用字符，子集外的字符会自动落到后面的完整字体上；
+    一言等每天变化的顶部文字由常用字子集覆盖，未附带微软雅黑时正文同样使用汉仪帅线体的常用字子集
     """
-    lunar_months = ["正月", "二月", "三月", "四月", "五月", "六月", 
-                    "七月", "八月", "九月", "十月", "冬月", "腊月"]
-    lunar_days = ["初一", "初二", "初三", "初四", "初五", "初六", "初七", "初八", "初九", "初十",
-                  "十一", "十二", "十三", "十四", "十五", "十六", "十七", "十八", "十九", "二十",
-                  "廿一", "廿二", "廿三", "廿四", "廿五", "廿六", "廿七", "廿八", "廿九", "三十"]
-    
-    month_idx = (date.month - 1) % 12
-    day_idx = (date.day - 1) % 30
-    return f"{lunar_months[month_idx]}{lunar_days[day_idx]}"
-
-
-def calculate_news_height(draw: ImageDraw.ImageDraw, news_list: list, font: ImageFont.FreeTypeFont, max_width: int) -> int:
+    global _coverage_index
+    chain = _font_chains.get(kind)
+    if chain is not None:
+        return chain
+
+    subset_cache = get_subset_cache(logger)
+    if _coverage_index is None:
+        _coverage_index = CoverageIndex(subset_cache.cache_dir, logger)
+    common_subset = subset_cache.get(FONT_PATH, "common", common_glyphs())
+    if kind == "header":
+        paths = [subset_cache.get(FONT_PATH, "header", header_glyphs()), common_subset, FONT_PATH, FONT_MSYH_PATH]
+    else:
+        paths = [subset_cache.get(FONT_MSYH_PATH, "common", common_glyphs()), FONT_MSYH_PATH, common_subset, FONT_PATH]
+    chain = FontChain(paths + _fallback_fonts + SYSTEM_FALLBACK_FONTS, _coverage_index)
+    _font_chains[kind] = chain
+    return chain
+
+
+def prepare_font_subsets(logger=None) -> None:
+    """预先生成字体子集与字符覆盖索引（插件启动时在后台线程调用），使首次绘制不必等待"""
+    get_font_chain("header", logger)
+    get_font_chain("news", logger)
+
+
+def get_lunar_date(date: datetime.datetime) -> str:
     """
-    预计算新闻列表的总高度
+    获取农历日期，格式与接口一致（如 "乙巳年十一月廿七"）
+    离线查表换算，支持 1900~2100 年，超出范围时返回空字符串
     """
-    total_height = 0
-    for i, item in enumerate(news_list):
-        item_str = "" if item is None else str(item).strip()
-        if not item_str:
-            continue
-        numbered_item = f"{i + 1}. {item_str}"
-        _, item_height = wrap_text_pixel(draw, numbered_item, font, max_width, NEWS_LINE_SPACING)
-        total_height += item_height + NEWS_ITEM_SPACING
-    return total_height
+    return format_lunar_date(date)
+
+
+def _pick_color(color: Dict[str, tuple], day_of_week: str) -> tuple:
+    return color.get(day_of_week) or color["default"]
+
+
+def _draw_header(
+    draw: ImageDraw.ImageDraw,
+    plan: DrawPlan,
+    values: Dict[str, str],
+    day_of_week: str,
+    chains: Dict[str, FontChain],
+) -> None:
+    """按绘制计划绘制新闻列表之上的全部内容（顶部区域、日期/主标题区域与分隔线）"""
+    previous = None  # 同一区块中上一行文字的 (y, 高度)
+    for step in plan.header_steps:
+        if isinstance(step, TextStep):
+            text = step.text.format_map(values) if step.dynamic else step.text
+            font = chains[step.font].sized(step.size)
+            if step.wrap_width:
+                text, _ = wrap_text_pixel(text, font, step.wrap_width, step.line_spacing)
+            bbox = font.text_bbox((0, 0), text, spacing=step.line_spacing)
+            width = bbox[2] - bbox[0]
+            height = bbox[3] - bbox[1]
+            x, y = step.place(width, height, previous)
+            font.draw_text(draw, (x, y), text, fill=_pick_color(step.color, day_of_week), spacing=step.line_spacing)
+            previous = (y, height)
+        elif isinstance(step, RectStep):
+            draw.rectangle(
+                [(step.box[0], step.box[1]), (step.box[2], step.box[3])],
+                fill=_pick_color(step.color, day_of_week),
+                outline=None
+            )
+        elif isinstance(step, LineStep):
+            draw.line(
+                [(step.points[0], step.points[1]), (step.points[2], step.points[3])],
+                fill=_pick_color(step.color, day_of_week),
+                width=step.width
+            )
+        else:
+            # 区块分界
+            previous = None
+
+
+class _NewsBand:
+    """一条新闻在图片中占据的水平条带：[top, top + height + 条目间距)"""
+
+    __slots__ = ("text", "wrapped", "height", "top", "source")
+
+    def __init__(self, text: str, wrapped: str, height: int, source: Optional["_NewsBand"] = None):
+        self.text = text
+        self.wrapped = wrapped
+        self.height = height
+        self.top = 0
+        self.source = source  # 上次绘制中内容相同的条带，可直接复制像素
+
+
+class _RenderedEdition:
+    """最近一次绘制的布局与画布，同一期早报内容更新时用于增量绘制"""
 
+    __slots__ = ("date", "header_key", "plan", "image", "bands")
 
-def create_news_image_from_data(news_api_data: Dict[str, Any], logger) -> Optional[str]:
+    def __init__(self, date: str, header_key: tuple, plan: DrawPlan, image: Image.Image, bands: List[_NewsBand]):
+        self.date = date
+        self.header_key = header_key
+        self.plan = plan
+        self.image = image
+        self.bands = bands
+
+
+# 每种绘制计划（模板、宽度、缩放）最近一次的绘制结果
+_last_rendered: Dict[tuple, _RenderedEdition] = {}
+
+
+def _canvas_bytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+def retained_canvas_bytes() -> int:
+    """增量绘制保留的画布占用的内存（字节）；Pillow 画布不经过 Python 的内存分配器，tracemalloc 统计不到"""
+    return sum(_canvas_bytes(rendered.image) for rendered in list(_last_rendered.values()))
+
+
+def release_canvases(limit: int = 0) -> int:
     """
-    根据新闻数据生成图片，高度自适应
+    从最久未用的开始释放增量绘制保留的画布，直到占用不超过 limit 字节，返回释放的字节数
+    释放后对应档位的下一次绘制会完整重绘，结果不变
+    """
+    freed = 0
+    total = retained_canvas_bytes()
+    for key in list(_last_rendered):
+        if total <= limit:
+            break
+        rendered = _last_rendered.pop(key, None)
+        if rendered is not None:
+            size = _canvas_bytes(rendered.image)
+            total -= size
+            freed += size
+    return freed
+
+
+def get_draw_plan(template: str, profile: RenderProfile, logger=None) -> DrawPlan:
+    """获取模板在输出档位下的绘制计划，模板不存在时使用默认模板"""
+    registry = get_template_registry(logger)
+    news_template = registry.get(template)
+    if news_template is None:
+        if logger is not None:
+            logger.warning(f"[新闻图片生成] 模板 {template} 不存在，使用默认模板")
+        news_template = registry.get(DEFAULT_TEMPLATE_NAME)
+    return news_template.plan(profile.width, profile.scale)
+
+
+def _render_edition(
+    news_payload: NewsPayload,
+    logger,
+    profile: RenderProfile = DEFAULT_PROFILE,
+    template: str = DEFAULT_TEMPLATE_NAME,
+) -> Optional[_RenderedEdition]:
+    """
+    根据新闻数据按模板与输出档位绘制整期早报的画布，高度自适应
+    同一期早报内容更新（一言或个别新闻变化）时，复用上次绘制的顶部区域和内容未变的新闻条带，只绘制变化的部分
     """
     try:
-        date_str = news_api_data.get("date")
-        news_list = news_api_data.get("news", [])
-        tip = news_api_data.get("tip", "")
+        plan = get_draw_plan(template, profile, logger)
+        date_str = news_payload.date
+        news_list = news_payload.news
+        tip = news_payload.tip
 
         if not date_str or not news_list:
             logger.error("[新闻图片生成] 缺少必要的新闻数据或日期")
@@ -226,7 +344,7 @@ def create_news_image_from_data(news_api_data: Dict[str, Any], logger) -> Option
             return None
         
         # 从接口获取星期（优先使用接口数据）
-        weekday_cn_from_api = news_api_data.get("day_of_week", "")
+        weekday_cn_from_api = news_payload.day_of_week
         if weekday_cn_from_api:
             # 接口返回中文星期，需要转换为英文缩写用于颜色映射
             cn_to_abbr = {v: k for k, v in WEEKDAY_CN.items()}
@@ -235,188 +353,415 @@ def create_news_image_from_data(news_api_data: Dict[str, Any], logger) -> Option
             day_of_week = news_date.strftime("%a")
         
         # 从接口获取农历日期
-        lunar_date_str = news_api_data.get("lunar_date", "")
+        lunar_date_str = news_payload.lunar_date
         if not lunar_date_str:
             lunar_date_str = get_lunar_date(news_date)
 
-        # 检查字体文件
-        if not os.path.exists(FONT_PATH):
-            logger.error(f"[新闻图片生成] 字体文件缺失: {FONT_PATH}")
+        # 加载字体回退链（优先使用缓存的字体子集，缺字时自动回退到后续字体）
+        header_chain = get_font_chain("header", logger)
+        news_chain = get_font_chain("news", logger)
+        if not header_chain or not news_chain:
+            logger.error(f"[新闻图片生成] 字体文件缺失: {FONT_PATH} / {FONT_MSYH_PATH}，且未找到可用的回退字体")
             return None
-
-        # 加载字体
+        chains = {"header": header_chain, "news": news_chain}
         try:
-            # 顶部区域使用汉仪帅线体
-            font_weekday_cn = ImageFont.truetype(FONT_PATH, 160)  # 中文星期（调大）
-            font_weekday_en = ImageFont.truetype(FONT_PATH, 48)  # 英文星期（调大）
-            font_tip = ImageFont.truetype(FONT_PATH, 24)
-            font_title = ImageFont.truetype(FONT_PATH, 42)
-            font_lunar = ImageFont.truetype(FONT_PATH, 24)  # 日期字体调大
-            # 新闻内容使用微软雅黑
-            font_news = ImageFont.truetype(FONT_MSYH_PATH, 27)
+            # 新闻内容默认使用微软雅黑
+            font_news = chains[plan.news.font].sized(plan.news.size)
         except IOError as e:
             logger.error(f"[新闻图片生成] 加载字体文件失败: {e}")
             return None
 
-        # 创建临时图片用于计算高度
-        temp_image = Image.new("RGB", (IMAGE_WIDTH, 100), color=(255, 255, 255))
-        temp_draw = ImageDraw.Draw(temp_image)
-        
-        # 计算新闻内容高度
-        max_news_width = IMAGE_WIDTH - 2 * MARGIN_X
-        news_height = calculate_news_height(temp_draw, news_list, font_news, max_news_width)
+        # 同一期早报的上次绘制结果，用于复用
+        previous = _last_rendered.get(plan.key)
+        if previous is not None and previous.date != date_str:
+            previous = None
+        previous_bands = {band.text: band for band in previous.bands} if previous else {}
+
+        # 逐条测量新闻高度（内容未变的新闻直接复用上次的换行结果）
+        width = plan.width
+        item_spacing = plan.news.item_spacing
+        max_news_width = width - 2 * plan.padding_x
+        bands = []
+        for i, item_str in enumerate(news_list):
+            numbered_item = plan.news.format.format(index=i + 1, text=item_str)
+            source = previous_bands.get(numbered_item)
+            if source is not None:
+                bands.append(_NewsBand(numbered_item, source.wrapped, source.height, source))
+                continue
+            wrapped_item, item_height = wrap_text_pixel(
+                numbered_item, font_news, max_news_width, plan.news.line_spacing
+            )
+            if wrapped_item:
+                bands.append(_NewsBand(numbered_item, wrapped_item, item_height))
+        news_height = sum(band.height + item_spacing for band in bands)
         
-        # 计算总高度：外边距 + 顶部区域 + 分隔线 + 日期区域 + 分隔线 + 新闻区域（含上下边距） + 底部边距
-        total_height = (OUTER_MARGIN + TOP_BAR_HEIGHT + 20 + DATE_AREA_HEIGHT + NEWS_TOP_MARGIN + news_height + NEWS_BOTTOM_MARGIN + BOTTOM_MARGIN)
+        # 计算总高度：新闻列表之上的区块（含列表上边距） + 新闻区域 + 底部边距
+        total_height = plan.news_top + news_height + plan.bottom
         
         logger.info(f"[新闻图片生成] 动态计算图片高度: {total_height}px")
 
         # 创建实际图片
-        image = Image.new("RGB", (IMAGE_WIDTH, total_height), color=(255, 255, 255))
+        image = Image.new("RGB", (width, total_height), color=plan.background)
         draw = ImageDraw.Draw(image)
-        width = IMAGE_WIDTH
-
-        # ========== 绘制顶部区域（纯色背景）==========
-        top_color = WEEKDAY_COLORS.get(day_of_week, WEEKDAY_COLORS["default"])
-        draw.rectangle(
-            [(OUTER_MARGIN, OUTER_MARGIN), (width - OUTER_MARGIN, OUTER_MARGIN + TOP_BAR_HEIGHT)],
-            fill=top_color,
-            outline=None
-        )
-        
-        # 获取星期几的中英文
-        weekday_en = WEEKDAY_EN.get(day_of_week, "MONDAY")
-        weekday_cn = WEEKDAY_CN.get(day_of_week, "星期一")
-        tip_text = tip.strip() if tip else "今日无一言"
-        
-        content_x = OUTER_MARGIN
-        content_width = width - 2 * OUTER_MARGIN
-        
-        # 绘制中文星期（居中）
-        weekday_cn_bbox = draw.textbbox((0, 0), weekday_cn, font=font_weekday_cn)
-        weekday_cn_width = weekday_cn_bbox[2] - weekday_cn_bbox[0]
-        weekday_cn_height = weekday_cn_bbox[3] - weekday_cn_bbox[1]
-        weekday_cn_x = content_x + (content_width - weekday_cn_width) // 2
-        weekday_cn_y = OUTER_MARGIN + 30
-        draw.text((weekday_cn_x, weekday_cn_y), weekday_cn, fill=(255, 255, 255), font=font_weekday_cn)
-        
-        # 绘制英文星期（居中）
-        weekday_en_bbox = draw.textbbox((0, 0), weekday_en, font=font_weekday_en)
-        weekday_en_width = weekday_en_bbox[2] - weekday_en_bbox[0]
-        weekday_en_x = content_x + (content_width - weekday_en_width) // 2
-        weekday_en_y = weekday_cn_y + weekday_cn_height + WEEKDAY_SPACING  # 精确控制边距
-        draw.text((weekday_en_x, weekday_en_y), weekday_en, fill=(255, 255, 255), font=font_weekday_en)
-        
-        # 绘制"一言"（底部居中）
-        max_tip_width = content_width - 40
-        wrapped_tip, _ = wrap_text_pixel(draw, tip_text, font_tip, max_tip_width, 6)
-        tip_bbox = draw.multiline_textbbox((0, 0), wrapped_tip, font=font_tip, spacing=6)
-        tip_height = tip_bbox[3] - tip_bbox[1]
-        tip_width = tip_bbox[2] - tip_bbox[0]
-        tip_x = content_x + (content_width - tip_width) // 2
-        tip_y = OUTER_MARGIN + TOP_BAR_HEIGHT - tip_height - 20
-        draw.text((tip_x, tip_y), wrapped_tip, fill=(255, 255, 255), font=font_tip, spacing=6)
-        
-        # ========== 绘制分隔线 ==========
-        separator_y = OUTER_MARGIN + TOP_BAR_HEIGHT
-        draw.line(
-            [(OUTER_MARGIN, separator_y), (width - OUTER_MARGIN, separator_y)],
-            fill=(0, 0, 0),
-            width=2
-        )
-
-        # ========== 绘制日期/主标题区域（上下居中）==========
-        date_area_start_y = separator_y
-        date_area_end_y = separator_y + DATE_AREA_HEIGHT
-        date_area_center_y = (date_area_start_y + date_area_end_y) // 2
-        
-        # 解析农历日期
-        # 注：之前计算 lunar_date_display 但未使用；当前直接绘制 lunar_date_str
-        
-        # 左侧：农历（上下居中，左对齐）
-        lunar_text = lunar_date_str  # 直接使用完整农历，如"乙巳年十一月廿七"
-        lunar_bbox = draw.textbbox((0, 0), lunar_text, font=font_lunar)
-        lunar_height = lunar_bbox[3] - lunar_bbox[1]
-        lunar_y = date_area_center_y - lunar_height // 2
-        draw.text((MARGIN_X, lunar_y), lunar_text, fill=TEXT_COLOR, font=font_lunar)
-        
-        # 中间：主标题（上下居中）
-        title_text = "每日60秒读懂世界"
-        title_bbox = draw.textbbox((0, 0), title_text, font=font_title)
-        title_width = title_bbox[2] - title_bbox[0]
-        title_height = title_bbox[3] - title_bbox[1]
-        title_x = (width - title_width) // 2
-        title_y = date_area_center_y - title_height // 2
-        draw.text((title_x, title_y), title_text, fill=(220, 20, 60), font=font_title)
-        
-        # 右侧：公历（上下居中，左对齐显示）
-        gregorian_text = f"{year_str}{month_str}{day_str}"
-        gregorian_bbox = draw.textbbox((0, 0), gregorian_text, font=font_lunar)
-        gregorian_width = gregorian_bbox[2] - gregorian_bbox[0]
-        gregorian_height = gregorian_bbox[3] - gregorian_bbox[1]
-        gregorian_x = width - gregorian_width - MARGIN_X
-        gregorian_y = date_area_center_y - gregorian_height // 2
-        draw.text((gregorian_x, gregorian_y), gregorian_text, fill=TEXT_COLOR, font=font_lunar)
-        
-        # ========== 绘制分隔线 ==========
-        separator_y2 = date_area_end_y
-        draw.line(
-            [(OUTER_MARGIN, separator_y2), (width - OUTER_MARGIN, separator_y2)],
-            fill=(0, 0, 0),
-            width=2
-        )
+        news_top = plan.news_top
+
+        # 模板文字中可用的占位符
+        values = {
+            "weekday_cn": WEEKDAY_CN.get(day_of_week, "星期一"),
+            "weekday_en": WEEKDAY_EN.get(day_of_week, "MONDAY"),
+            "tip": tip or "今日无一言",
+            "lunar": lunar_date_str,  # 直接使用完整农历，如"乙巳年十一月廿七"
+            "gregorian": f"{year_str}{month_str}{day_str}",
+            "date": date_str,
+        }
+
+        # 顶部区域只取决于日期、星期、农历与一言，未变化时直接复制上次的像素
+        header_key = (day_of_week, *sorted(values.items()))
+        if previous is not None and previous.header_key == header_key:
+            image.paste(previous.image.crop((0, 0, width, news_top)), (0, 0))
+        else:
+            _draw_header(draw, plan, values, day_of_week, chains)
 
         # ========== 绘制新闻列表 ==========
-        current_y = separator_y2 + NEWS_TOP_MARGIN  # 使用上边距常量
+        current_y = news_top  # 使用上边距常量
+        reused = 0
+        for band in bands:
+            band.top = current_y
+            band_bottom = current_y + band.height + item_spacing
+            if band.source is not None:
+                # 内容未变：按条带复制像素（背景为纯色，条带位置变化不影响内容）
+                source = band.source
+                image.paste(
+                    previous.image.crop((0, source.top, width, source.top + band_bottom - current_y)),
+                    (0, current_y),
+                )
+                band.source = None
+                reused += 1
+            else:
+                font_news.draw_text(
+                    draw,
+                    (plan.padding_x, current_y),
+                    band.wrapped,
+                    fill=_pick_color(plan.news.color, day_of_week),
+                    spacing=plan.news.line_spacing,
+                )
+            current_y = band_bottom
 
-        for i, item in enumerate(news_list):
-            item_str = "" if item is None else str(item).strip()
-            if not item_str:
-                continue
-            numbered_item = f"{i + 1}. {item_str}"
+        if previous is not None:
+            logger.info(f"[新闻图片生成] 增量绘制: 复用 {reused}/{len(bands)} 条新闻")
+        rendered = _RenderedEdition(date_str, header_key, plan, image, bands)
+        # 重新插入，使字典顺序即最近使用顺序，释放画布时从最久未用的开始
+        _last_rendered.pop(plan.key, None)
+        _last_rendered[plan.key] = rendered
+        return rendered
 
-            wrapped_item, _ = wrap_text_pixel(
-                draw, numbered_item, font_news, max_news_width, NEWS_LINE_SPACING
-            )
+    except FileNotFoundError as e:
+        logger.error(f"[新闻图片生成] 文件未找到: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"[新闻图片生成] 未知错误: {e}")
+        logger.exception("[新闻图片生成] 图片生成异常")
+        return None
 
-            if not wrapped_item:
-                continue
 
-            draw.text(
-                (MARGIN_X, current_y),
-                wrapped_item,
-                fill=TEXT_COLOR,
-                font=font_news,
-                spacing=NEWS_LINE_SPACING,
-            )
+def _encode_image(image: Image.Image, profile: RenderProfile) -> Tuple[int, str]:
+    """
+    编码图片并直接转为 Base64，返回 (编码后字节数, Base64)
+    Base64 直接读取编码缓冲区，不再复制出一份编码结果；调用方只需保留 Base64 这一份
+    """
+    buffer = BytesIO()
+    if profile.format == "PNG":
+        image.save(buffer, format="PNG")
+    else:
+        image.save(buffer, format=profile.format, quality=profile.quality)
+    with buffer.getbuffer() as view:
+        return view.nbytes, base64.b64encode(view).decode("ascii")
+
+
+def create_news_image_from_data(
+    news_payload: NewsPayload,
+    logger,
+    profile: RenderProfile = DEFAULT_PROFILE,
+    template: str = DEFAULT_TEMPLATE_NAME,
+) -> Optional[str]:
+    """根据新闻数据按模板与输出档位生成一张完整的早报图片，返回 Base64 编码"""
+    rendered = _render_edition(news_payload, logger, profile, template)
+    if rendered is None:
+        return None
+    try:
+        # 转换为 Base64 编码
+        _, base64_data = _encode_image(rendered.image, profile)
+    except Exception:
+        logger.exception("[新闻图片生成] 图片编码异常")
+        return None
+    logger.info("[新闻图片生成] 新闻图片生成成功")
+    return base64_data
 
-            item_bbox = draw.multiline_textbbox(
-                (MARGIN_X, current_y),
-                wrapped_item,
-                font=font_news,
-                spacing=NEWS_LINE_SPACING,
-            )
-            item_height = item_bbox[3] - item_bbox[1]
-            current_y += item_height + NEWS_ITEM_SPACING
 
-        # 转换为 Base64 编码
-        img_byte_arr = BytesIO()
-        image.save(img_byte_arr, format="PNG", quality=88)
-        img_bytes = img_byte_arr.getvalue()
+class _Page:
+    """分页后的一页：first 为 True 的页包含顶部区域，其余页只包含新闻条带"""
 
-        base64_data = base64.b64encode(img_bytes).decode("utf-8")
-        logger.info("[新闻图片生成] 新闻图片生成成功")
-        return base64_data
+    __slots__ = ("first", "bands")
 
-    except FileNotFoundError as e:
-        logger.error(f"[新闻图片生成] 文件未找到: {e}")
+    def __init__(self, first: bool, bands: List[_NewsBand]):
+        self.first = first
+        self.bands = bands
+
+
+def _split_pages(rendered: _RenderedEdition, tail: int, max_height: int) -> List[_Page]:
+    """
+    在新闻条目边界处把整期早报切分为多页，每页高度不超过 max_height
+    单条新闻本身超过一页高度时独占一页（不在条目中间切断）
+    """
+    plan = rendered.plan
+    pages = []
+    current = _Page(True, [])
+    used = plan.news_top + tail
+    for band in rendered.bands:
+        band_height = band.height + plan.news.item_spacing
+        if current.bands and used + band_height > max_height:
+            pages.append(current)
+            current = _Page(False, [])
+            used = plan.continuation_news_top + tail
+        current.bands.append(band)
+        used += band_height
+    pages.append(current)
+    return pages
+
+
+def _compose_page(rendered: _RenderedEdition, page: _Page, tail: int) -> Image.Image:
+    """从整期画布中裁出一页：首页保留顶部区域，后续页以模板的分隔线开头，底部留白与整图一致"""
+    plan = rendered.plan
+    width = plan.width
+    band_top = page.bands[0].top
+    band_bottom = page.bands[-1].top + page.bands[-1].height + plan.news.item_spacing
+    if page.first:
+        if band_bottom + tail == rendered.image.height:
+            return rendered.image
+        # 整图中 band_bottom 之下是下一条新闻，底部留白需另行补上
+        image = Image.new("RGB", (width, band_bottom + tail), color=plan.background)
+        image.paste(rendered.image.crop((0, 0, width, band_bottom)), (0, 0))
+        return image
+
+    news_top = plan.continuation_news_top
+    image = Image.new("RGB", (width, news_top + band_bottom - band_top + tail), color=plan.background)
+    line = plan.continuation_line
+    if line is not None:
+        ImageDraw.Draw(image).line(
+            [(line.points[0], line.points[1]), (line.points[2], line.points[3])],
+            fill=line.color["default"],
+            width=line.width
+        )
+    image.paste(rendered.image.crop((0, band_top, width, band_bottom)), (0, news_top))
+    return image
+
+
+def create_news_pages_from_data(
+    news_payload: NewsPayload,
+    logger,
+    max_height: int = 0,
+    max_bytes: int = 0,
+    profile: RenderProfile = DEFAULT_PROFILE,
+    template: str = DEFAULT_TEMPLATE_NAME,
+) -> Optional[List[str]]:
+    """
+    根据新闻数据按模板与输出档位生成分页的早报图片，返回每页图片的 Base64 编码
+    - max_height: 每页最大高度（输出像素），0 表示不分页
+    - max_bytes: 每页编码后的最大字节数，0 表示不限制；超出时在条目边界处再对半拆分
+    各页的裁剪与编码在线程池中并行执行
+    """
+    rendered = _render_edition(news_payload, logger, profile, template)
+    if rendered is None:
         return None
-    except Exception as e:
-        logger.error(f"[新闻图片生成] 未知错误: {e}")
-        logger.exception("[新闻图片生成] 图片生成异常")
+    if not rendered.bands:
+        pages = [_Page(True, [])]
+        tail = 0
+    else:
+        last = rendered.bands[-1]
+        tail = rendered.image.height - (last.top + last.height + rendered.plan.news.item_spacing)
+        if max_height > 0:
+            pages = _split_pages(rendered, tail, max(max_height, rendered.plan.px(PAGE_MIN_HEIGHT)))
+        else:
+            pages = [_Page(True, list(rendered.bands))]
+
+    def encode(page: _Page) -> Tuple[int, str]:
+        if not page.bands:
+            return _encode_image(rendered.image, profile)
+        return _encode_image(_compose_page(rendered, page, tail), profile)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(len(pages), PAGE_ENCODE_WORKERS)) as executor:
+            encoded = list(executor.map(encode, pages))
+            while max_bytes > 0 and len(pages) < PAGE_MAX_COUNT:
+                # 超出体积上限且不止一条新闻的页，在条目边界处对半拆分后重新编码；
+                # 总页数达到上限时不再拆分，优先拆分体积最大的页
+                oversized = [
+                    i for i, (page, (size, _)) in enumerate(zip(pages, encoded))
+                    if size > max_bytes and len(page.bands) > 1
+                ]
+                if not oversized:
+                    break
+                oversized = sorted(oversized, key=lambda i: encoded[i][0], reverse=True)[:PAGE_MAX_COUNT - len(pages)]
+                for i in sorted(oversized, reverse=True):
+                    page = pages[i]
+                    middle = len(page.bands) // 2
+                    halves = [_Page(page.first, page.bands[:middle]), _Page(False, page.bands[middle:])]
+                    pages[i:i + 1] = halves
+                    encoded[i:i + 1] = executor.map(encode, halves)
+        elapsed = time.perf_counter() - start
+    except Exception:
+        logger.exception("[新闻图片生成] 分页图片编码异常")
         return None
 
+    if max_bytes > 0:
+        over = [i + 1 for i, (size, _) in enumerate(encoded) if size > max_bytes]
+        if over:
+            logger.warning(
+                f"[新闻图片生成] 第 {over} 页仍超出体积上限 {max_bytes // 1024}KB"
+                f"（只含一条新闻无法再拆分，或已达到 {PAGE_MAX_COUNT} 页上限）"
+            )
+
+    logger.info(
+        f"[新闻图片生成] 新闻图片生成成功: 共 {len(pages)} 页，"
+        f"{sum(size for size, _ in encoded) // 1024}KB，编码耗时 {elapsed * 1000:.0f}ms"
+    )
+    return [data for _, data in encoded]
+
+
+# --- 命令行批量绘制 ---
+# 在插件之外预先生成历史早报图片（补档），或对比绘制改动前后的性能，例如：
+#     python news_image_generator.py data/archive -o rendered --profile "format=jpeg|quality=85" --workers 4
+# 各文件分配到多个进程并行绘制，每个进程启动时加载一次字体
+
+_cli_logger = None
+
+
+def _cli_init_worker(fallback_fonts: Sequence[str], verbose: bool) -> None:
+    """进程池初始化：配置日志与回退字体，并预先生成字体子集与字符覆盖索引"""
+    global _cli_logger
+    import logging
+
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING, format="%(processName)s %(message)s")
+    _cli_logger = logging.getLogger("news_image_generator")
+    configure_fallback_fonts(fallback_fonts)
+    prepare_font_subsets(_cli_logger)
+
+
+def _cli_collect_inputs(inputs: Sequence[str]) -> List[str]:
+    """展开输入：目录按存档结构读取其中的 <日期>.json，文件原样使用"""
+    import re
+
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            names = sorted(n for n in os.listdir(item) if re.fullmatch(r"\d{4}-\d{2}-\d{2}\.json", n))
+            files.extend(os.path.join(item, n) for n in names)
+        else:
+            files.append(item)
+    return files
+
+
+def _cli_render_file(
+    path: str, output_dir: str, profile_spec: str, template: str, max_height: int, max_bytes: int, repeat: int
+) -> Tuple[str, int, float, str]:
+    """绘制一个早报 JSON 文件并写出图片，返回 (文件, 页数, 绘制总耗时秒, 错误信息)"""
+    import json
+
+    try:
+        with open(path, "rb") as f:
+            payload = NewsPayload.from_raw(json.load(f))
+    except (OSError, ValueError) as e:
+        return path, 0, 0.0, f"读取失败: {e}"
+    if payload is None:
+        return path, 0, 0.0, "不是有效的早报数据"
+
+    _, profile = parse_render_profile(profile_spec)
+    elapsed = 0.0
+    pages = None
+    for _ in range(repeat):
+        # 清空增量绘制缓存，每次都完整绘制，使耗时可以对比
+        _last_rendered.clear()
+        start = time.perf_counter()
+        pages = create_news_pages_from_data(payload, _cli_logger, max_height, max_bytes, profile, template)
+        elapsed += time.perf_counter() - start
+        if not pages:
+            return path, 0, elapsed, "绘制失败"
+
+    ext = "jpg" if profile.format == "JPEG" else profile.format.lower()
+    for page, data in enumerate(pages):
+        name = f"{payload.date}.{page}.{ext}" if page else f"{payload.date}.{ext}"
+        with open(os.path.join(output_dir, name), "wb") as f:
+            f.write(base64.b64decode(data))
+    return path, len(pages), elapsed, ""
+
+
+def _cli_main(argv: Optional[Sequence[str]] = None) -> int:
+    import sys
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    parser = argparse.ArgumentParser(description="批量离线绘制早报图片")
+    parser.add_argument("inputs", nargs="+", help="早报 JSON 文件（60s 接口格式），或存档目录")
+    parser.add_argument("-o", "--output", default="rendered", help="输出目录，图片命名为 <日期>.<格式>，分页时为 <日期>.<页>.<格式>")
+    parser.add_argument("--profile", default="", help="输出档位，如 'width=800|scale=1.5|format=jpeg|quality=85'")
+    parser.add_argument("--format", choices=sorted(SUPPORTED_FORMATS), help="输出格式，覆盖 --profile 中的 format")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE_NAME, help="图片模板名")
+    parser.add_argument("--page-height", type=int, default=0, help="分页高度（像素），0 为不分页")
+    parser.add_argument("--page-max-kb", type=int, default=0, help="单页体积上限（KB），0 为不限制")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数，默认为 CPU 核数")
+    parser.add_argument("--repeat", type=int, default=1, help="每个文件重复绘制的次数，用于性能对比")
+    parser.add_argument("--fallback-font", action="append", default=[], help="额外的回退字体，可重复指定")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出绘制日志")
+    args = parser.parse_args(argv)
+
+    profile_spec = "|".join(["*", args.profile] if args.profile else ["*"])
+    if args.format:
+        profile_spec += f"|format={args.format}"
+    try:
+        parse_render_profile(profile_spec)
+    except ValueError as e:
+        parser.error(str(e))
+    if get_template_registry().get(args.template) is None:
+        parser.error(f"图片模板不存在: {args.template}，可用模板: {get_template_registry().names()}")
+    if args.repeat < 1:
+        parser.error("--repeat 至少为 1")
+    files = _cli_collect_inputs(args.inputs)
+    if not files:
+        parser.error("没有找到早报 JSON 文件")
+
+    os.makedirs(args.output, exist_ok=True)
+    workers = max(1, min(args.workers, len(files)))
+    images = failures = 0
+    render_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_cli_init_worker, initargs=(args.fallback_font, args.verbose)
+    ) as pool:
+        futures = [
+            pool.submit(
+                _cli_render_file, path, args.output, profile_spec, args.template,
+                args.page_height, args.page_max_kb * 1024, args.repeat,
+            )
+            for path in files
+        ]
+        for future in as_completed(futures):
+            path, pages, elapsed, error = future.result()
+            if error:
+                failures += 1
+                print(f"✗ {path}: {error}", file=sys.stderr)
+                continue
+            images += pages * args.repeat
+            render_seconds += elapsed
+    wall = time.perf_counter() - start
+
+    print(f"绘制 {len(files) - failures}/{len(files)} 个文件，共 {images} 张图片，{workers} 个进程")
+    print(
+        f"总耗时 {wall:.2f}s（含进程启动与字体加载），吞吐 {images / wall:.1f} 张/秒，"
+        f"单张平均绘制 {render_seconds / max(images, 1) * 1000:.0f}ms"
+    )
+    return 1 if failures else 0
+
 
 if __name__ == "__main__":
-    # 为符合 AstrBot 插件代码规范：避免模块自测代码干扰框架日志/行为。
-    pass
+    raise SystemExit(_cli_main())
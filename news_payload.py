@@ -0,0 +1,160 @@
+import re
+import json
+import hashlib
+import datetime
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# 可选的高性能 JSON 解码器：orjson > msgspec > 标准库
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import msgspec
+
+        _json_loads = msgspec.json.Decoder().decode
+        JSON_BACKEND = "msgspec"
+    except ImportError:
+        _json_loads = json.loads
+        JSON_BACKEND = "json"
+
+
+def decode_json(raw: bytes) -> Any:
+    """解码接口返回的 JSON 字节串，解码失败抛出 ValueError"""
+    try:
+        return _json_loads(raw)
+    except ValueError:
+        raise
+    except Exception as e:
+        # msgspec 的 DecodeError 不是 ValueError 子类，统一异常类型
+        raise ValueError(str(e)) from e
+
+
+# 接口常见的日期写法：2025-01-01、2025/1/1、2025.01.01、2025年1月1日、20250101，可带时间部分
+_DATE_RE = re.compile(r"^(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?(?:[\sT]|$)")
+_COMPACT_DATE_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})(?:[\sT]|$)")
+
+
+def normalize_date(value: str) -> Optional[str]:
+    """把常见写法的日期（可带时间部分）归一化为 'YYYY-MM-DD'，无法识别时返回 None"""
+    match = _DATE_RE.match(value) or _COMPACT_DATE_RE.match(value)
+    if not match:
+        return None
+    try:
+        return datetime.date(*map(int, match.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def _clean_str(value: Any) -> str:
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class NewsPayload:
+    """
+    归一化后的一期早报
+    date 通常为 'YYYY-MM-DD'（常见写法已归一化），无法识别的日期保留接口原文，见 has_standard_date；
+    news 至少包含一条非空新闻；其余字段缺失时为空字符串
+    """
+
+    date: str
+    news: Tuple[str, ...]
+    tip: str = ""
+    image: str = ""  # 接口图片地址，仅当配置 use_local_image_draw=false 时需要
+    day_of_week: str = ""  # 可选字段：用于提升图片绘制的准确性
+    lunar_date: str = ""
+    fingerprint: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # 内容指纹只计算一次，用作存档/缓存的键
+        raw = json.dumps(self.to_dict(), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        object.__setattr__(self, "fingerprint", hashlib.sha1(raw.encode("utf-8")).hexdigest())
+
+    @classmethod
+    def from_raw(cls, raw_json: Any) -> Optional["NewsPayload"]:
+        """
+        把不同 API 可能返回的结构（含 {data: {...}} 包装）校验并归一化为 NewsPayload
+        返回 None 表示无法解析
+        """
+        if not isinstance(raw_json, dict):
+            return None
+        candidate = raw_json.get("data", raw_json)
+        if not isinstance(candidate, dict):
+            return None
+
+        # date 与 news 都是必要字段；tip 允许为空
+        date_str = _clean_str(candidate.get("date"))
+        if not date_str:
+            return None
+        date_str = normalize_date(date_str) or date_str
+
+        news_items = candidate.get("news")
+        if isinstance(news_items, str):
+            news_items = news_items.splitlines()
+        if not isinstance(news_items, (list, tuple)):
+            return None
+        news = tuple(s for s in map(_clean_str, news_items) if s)
+        if not news:
+            return None
+
+        return cls(
+            date=date_str,
+            news=news,
+            tip=_clean_str(candidate.get("tip")),
+            image=_clean_str(candidate.get("image")),
+            day_of_week=_clean_str(candidate.get("day_of_week")),
+            lunar_date=_clean_str(candidate.get("lunar_date")),
+        )
+
+    @property
+    def has_standard_date(self) -> bool:
+        """日期是否为 'YYYY-MM-DD'；不是时无法存档，也无法本地绘制日期区域"""
+        return normalize_date(self.date) == self.date
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可 JSON 序列化的字典（省略为空的可选字段），用于存档"""
+        data: Dict[str, Any] = {"date": self.date, "news": list(self.news), "tip": self.tip}
+        if self.image:
+            data["image"] = self.image
+        if self.day_of_week:
+            data["day_of_week"] = self.day_of_week
+        if self.lunar_date:
+            data["lunar_date"] = self.lunar_date
+        return data
+
+
+def diff_payloads(old: NewsPayload, new: NewsPayload) -> List[str]:
+    """比较同一期早报的两个版本，返回变化说明（如 ['一言', '第3条']），内容相同时返回空列表"""
+    changes = []
+    if old.tip != new.tip:
+        changes.append("一言")
+    if old.lunar_date != new.lunar_date or old.day_of_week != new.day_of_week:
+        changes.append("日期信息")
+    for i in range(max(len(old.news), len(new.news))):
+        old_item = old.news[i] if i < len(old.news) else None
+        new_item = new.news[i] if i < len(new.news) else None
+        if old_item == new_item:
+            continue
+        if new_item is None:
+            changes.append(f"删除第{i + 1}条")
+        elif old_item is None:
+            changes.append(f"新增第{i + 1}条")
+        else:
+            changes.append(f"第{i + 1}条")
+    if not changes and old.image != new.image:
+        changes.append("图片")
+    return changes
+
+
+def parse_news_payload(raw: bytes) -> Optional[NewsPayload]:
+    """从接口返回的原始字节直接解码并校验为 NewsPayload，JSON 非法时返回 None"""
+    try:
+        return NewsPayload.from_raw(decode_json(raw))
+    except ValueError:
+        return None
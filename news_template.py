@@ -0,0 +1,408 @@
+"""
+早报图片模板
+模板用 JSON（安装 PyYAML 后也支持 YAML，读取 YAML 模板时才导入）自上而下声明图片的各个区块，加载时校验并编译；
+每种输出尺寸（宽度、缩放）第一次使用时生成绘制计划并缓存，绘制时只按计划执行，不再解析模板
+"""
+import os
+import json
+import string
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .config import CURRENT_DIR
+except ImportError:
+    CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- 模板常量 ---
+BUILTIN_TEMPLATE_DIR = os.path.join(CURRENT_DIR, "templates")
+DEFAULT_TEMPLATE_NAME = "default"
+TEMPLATE_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# 文本中可用的占位符
+TEXT_FIELDS = frozenset({"weekday_cn", "weekday_en", "tip", "lunar", "gregorian", "date"})
+NEWS_FIELDS = frozenset({"index", "text"})
+FONT_KINDS = frozenset({"header", "news"})
+ALIGNMENTS = frozenset({"left", "center", "right"})
+ANCHORS = ("top", "after", "bottom")  # 未指定时在区块内上下居中
+
+Color = Tuple[int, int, int]
+
+
+def _parse_color(value: Any, where: str) -> Dict[str, Color]:
+    """
+    解析颜色：'#rrggbb'、[r, g, b]，或按星期区分的 {"Mon": ..., "default": ...}
+    统一返回 星期缩写 -> RGB 的映射（必含 default），绘制时按星期取色
+    """
+    if isinstance(value, dict):
+        colors = {key: _parse_color(item, f"{where}.{key}")["default"] for key, item in value.items()}
+        if "default" not in colors:
+            raise ValueError(f"{where} 按星期配置颜色时必须包含 default")
+        return colors
+    if isinstance(value, str) and value.startswith("#") and len(value) == 7:
+        try:
+            return {"default": (int(value[1:3], 16), int(value[3:5], 16), int(value[5:7], 16))}
+        except ValueError:
+            pass
+    if isinstance(value, (list, tuple)) and len(value) == 3 and all(isinstance(c, int) and 0 <= c <= 255 for c in value):
+        return {"default": tuple(value)}
+    raise ValueError(f"{where} 颜色格式错误: {value!r} (应为 '#rrggbb' 或 [r, g, b])")
+
+
+def _int(spec: Dict[str, Any], key: str, where: str, default: Optional[int] = None, minimum: int = 0) -> int:
+    value = spec.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ValueError(f"{where}.{key} 应为不小于 {minimum} 的整数: {value!r}")
+    return value
+
+
+def _check_fields(text: str, allowed: frozenset, where: str) -> bool:
+    """校验文本中的占位符，返回是否包含占位符"""
+    try:
+        names = [name for _, name, _, _ in string.Formatter().parse(text) if name is not None]
+    except ValueError as e:
+        raise ValueError(f"{where} 文本格式错误: {text!r} ({e})")
+    unknown = set(names) - allowed
+    if unknown:
+        raise ValueError(f"{where} 包含未知占位符: {', '.join(sorted(unknown))}，可用: {', '.join(sorted(allowed))}")
+    return bool(names)
+
+
+class TextItem:
+    """区块中的一行（或自动换行的一段）文字，尺寸为 1 倍缩放下的数值"""
+
+    __slots__ = ("text", "dynamic", "size", "color", "font", "align", "anchor", "offset", "wrap", "line_spacing", "padding_x")
+
+    def __init__(self, spec: Dict[str, Any], where: str, default_font: str):
+        if not isinstance(spec, dict) or not isinstance(spec.get("text"), str):
+            raise ValueError(f"{where} 缺少 text")
+        self.text = spec["text"]
+        self.dynamic = _check_fields(self.text, TEXT_FIELDS, where)
+        self.size = _int(spec, "size", where, minimum=1)
+        self.color = _parse_color(spec.get("color", "#000000"), f"{where}.color")
+        self.font = spec.get("font", default_font)
+        if self.font not in FONT_KINDS:
+            raise ValueError(f"{where}.font 应为 header 或 news: {self.font!r}")
+        self.align = spec.get("align", "center")
+        if self.align not in ALIGNMENTS:
+            raise ValueError(f"{where}.align 应为 left / center / right: {self.align!r}")
+        anchors = [key for key in ANCHORS if key in spec]
+        if len(anchors) > 1:
+            raise ValueError(f"{where} 只能指定 top / after / bottom 中的一个")
+        self.anchor = anchors[0] if anchors else "middle"
+        self.offset = _int(spec, self.anchor, where) if anchors else 0
+        self.wrap = bool(spec.get("wrap", False))
+        self.line_spacing = _int(spec, "line_spacing", where, default=4)
+        self.padding_x = _int(spec, "padding_x", where, default=0)
+
+
+class TextStep:
+    """绘制计划中的文字：位置在绘制时由文字尺寸与锚点确定"""
+
+    __slots__ = ("text", "dynamic", "size", "color", "font", "align", "anchor", "base_y", "x_left", "x_right", "wrap_width", "line_spacing")
+
+    def __init__(self, item: TextItem, plan: "DrawPlan", area_top: int, area_bottom: int, area_left: int, area_right: int):
+        px = plan.px
+        self.text = item.text
+        self.dynamic = item.dynamic
+        self.size = px(item.size)
+        self.color = item.color
+        self.font = item.font
+        self.align = item.align
+        self.anchor = item.anchor
+        if item.anchor == "top":
+            self.base_y = area_top + px(item.offset)
+        elif item.anchor == "bottom":
+            self.base_y = area_bottom - px(item.offset)
+        elif item.anchor == "after":
+            self.base_y = px(item.offset)  # 与上一行文字的间距
+        else:
+            self.base_y = (area_top + area_bottom) // 2
+        self.x_left = plan.padding_x
+        self.x_right = plan.width - plan.padding_x
+        self.wrap_width = area_right - area_left - 2 * px(item.padding_x) if item.wrap else 0
+        self.line_spacing = px(item.line_spacing)
+
+    def place(self, width: int, height: int, previous: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        """根据文字尺寸计算绘制坐标；previous 为同一区块上一行文字的 (y, 高度)"""
+        if self.align == "left":
+            x = self.x_left
+        elif self.align == "right":
+            x = self.x_right - width
+        else:
+            x = (self.x_left + self.x_right - width) // 2
+        if self.anchor == "top":
+            y = self.base_y
+        elif self.anchor == "bottom":
+            y = self.base_y - height
+        elif self.anchor == "after":
+            prev_y, prev_height = previous if previous else (0, 0)
+            y = prev_y + prev_height + self.base_y
+        else:
+            y = self.base_y - height // 2
+        return x, y
+
+
+class RectStep:
+    __slots__ = ("box", "color")
+
+    def __init__(self, box: Tuple[int, int, int, int], color: Dict[str, Color]):
+        self.box = box
+        self.color = color
+
+
+class LineStep:
+    __slots__ = ("points", "color", "width")
+
+    def __init__(self, points: Tuple[int, int, int, int], color: Dict[str, Color], width: int):
+        self.points = points
+        self.color = color
+        self.width = width
+
+
+class BlockStart:
+    """区块分界：同一区块内 after 锚点才会接续上一行文字"""
+
+    __slots__ = ()
+
+
+class NewsStyle:
+    __slots__ = ("size", "color", "font", "line_spacing", "item_spacing", "top_margin", "format")
+
+    def __init__(self, size: int, color: Dict[str, Color], font: str, line_spacing: int, item_spacing: int, top_margin: int, fmt: str):
+        self.size = size
+        self.color = color
+        self.font = font
+        self.line_spacing = line_spacing
+        self.item_spacing = item_spacing
+        self.top_margin = top_margin
+        self.format = fmt
+
+
+class DrawPlan:
+    """
+    模板在某个宽度与缩放下的绘制计划：所有尺寸已换算为像素、所有位置已算好，
+    header_steps 按顺序执行即可绘制新闻列表之上的全部内容
+    """
+
+    __slots__ = (
+        "key", "template", "width", "scale", "margin", "padding_x", "bottom", "background",
+        "header_steps", "news_top", "news", "continuation_line", "continuation_news_top",
+    )
+
+    def __init__(self, template: "NewsTemplate", width: int, scale: float):
+        self.key = (template.name, template.digest, width, scale)
+        self.template = template.name
+        self.scale = scale
+        self.width = self.px(width)
+        page = template.page
+        self.margin = self.px(page["margin"])
+        self.padding_x = self.px(page["padding_x"])
+        self.bottom = self.px(page["bottom"])
+        self.background = page["background"]["default"]
+
+        self.header_steps: List[Any] = []
+        self.continuation_line: Optional[LineStep] = None
+        y = self.margin
+        for block in template.blocks:
+            kind = block["type"]
+            if kind == "bar":
+                height = self.px(block["height"])
+                left, right = self.margin, self.width - self.margin
+                self.header_steps.append(BlockStart())
+                self.header_steps.append(RectStep((left, y, right, y + height), block["color"]))
+                for item in block["items"]:
+                    self.header_steps.append(TextStep(item, self, y, y + height, left, right))
+                y += height
+            elif kind == "row":
+                height = self.px(block["height"])
+                self.header_steps.append(BlockStart())
+                for item in block["items"]:
+                    self.header_steps.append(TextStep(item, self, y, y + height, self.padding_x, self.width - self.padding_x))
+                y += height
+            elif kind == "separator":
+                # 分隔线画在当前位置，不占用高度
+                line = LineStep((self.margin, y, self.width - self.margin, y), block["color"], self.px(block["width"]))
+                self.header_steps.append(line)
+                if self.continuation_line is None:
+                    self.continuation_line = LineStep(
+                        (self.margin, self.margin, self.width - self.margin, self.margin), line.color, line.width
+                    )
+            elif kind == "news":
+                self.news = NewsStyle(
+                    self.px(block["size"]), block["color"], block["font"], self.px(block["line_spacing"]),
+                    self.px(block["item_spacing"]), self.px(block["top_margin"]), block["format"],
+                )
+        self.news_top = y + self.news.top_margin
+        self.continuation_news_top = self.margin + self.news.top_margin
+
+    def px(self, value: int) -> int:
+        """把 1 倍缩放下的尺寸换算为像素（非零尺寸至少为 1px）"""
+        return max(1, round(value * self.scale)) if value else 0
+
+
+class NewsTemplate:
+    """校验并编译后的模板"""
+
+    __slots__ = ("name", "digest", "source", "page", "blocks", "_plans", "_lock")
+
+    def __init__(self, spec: Dict[str, Any], source: str = ""):
+        if not isinstance(spec, dict):
+            raise ValueError("模板内容应为对象")
+        name = spec.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("模板缺少 name")
+        self.name = name.strip()
+        self.source = source
+        self.digest = hashlib.sha1(json.dumps(spec, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+        page = spec.get("page", {})
+        if not isinstance(page, dict):
+            raise ValueError("page 应为对象")
+        self.page = {
+            "margin": _int(page, "margin", "page", default=50),
+            "padding_x": _int(page, "padding_x", "page", default=50),
+            "bottom": _int(page, "bottom", "page", default=70),
+            "background": _parse_color(page.get("background", "#ffffff"), "page.background"),
+        }
+
+        blocks = spec.get("blocks")
+        if not isinstance(blocks, list) or not blocks:
+            raise ValueError("模板缺少 blocks")
+        self.blocks = [self._compile_block(block, f"blocks[{i}]") for i, block in enumerate(blocks)]
+        news_indexes = [i for i, block in enumerate(self.blocks) if block["type"] == "news"]
+        if news_indexes != [len(self.blocks) - 1]:
+            raise ValueError("模板必须有且只有一个 news 区块，且位于最后")
+
+        self._plans: Dict[Tuple[int, float], DrawPlan] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compile_block(spec: Any, where: str) -> Dict[str, Any]:
+        if not isinstance(spec, dict):
+            raise ValueError(f"{where} 应为对象")
+        kind = spec.get("type")
+        if kind in ("bar", "row"):
+            items = spec.get("items", [])
+            if not isinstance(items, list):
+                raise ValueError(f"{where}.items 应为列表")
+            block = {
+                "type": kind,
+                "height": _int(spec, "height", where, minimum=1),
+                "items": [TextItem(item, f"{where}.items[{i}]", "header") for i, item in enumerate(items)],
+            }
+            if kind == "bar":
+                block["color"] = _parse_color(spec.get("color", "#4682b4"), f"{where}.color")
+            return block
+        if kind == "separator":
+            return {
+                "type": kind,
+                "width": _int(spec, "width", where, default=2, minimum=1),
+                "color": _parse_color(spec.get("color", "#000000"), f"{where}.color"),
+            }
+        if kind == "news":
+            fmt = spec.get("format", "{index}. {text}")
+            if not isinstance(fmt, str):
+                raise ValueError(f"{where}.format 应为字符串")
+            _check_fields(fmt, NEWS_FIELDS, f"{where}.format")
+            font = spec.get("font", "news")
+            if font not in FONT_KINDS:
+                raise ValueError(f"{where}.font 应为 header 或 news: {font!r}")
+            return {
+                "type": kind,
+                "size": _int(spec, "size", where, default=27, minimum=1),
+                "color": _parse_color(spec.get("color", "#000000"), f"{where}.color"),
+                "font": font,
+                "line_spacing": _int(spec, "line_spacing", where, default=8),
+                "item_spacing": _int(spec, "item_spacing", where, default=25),
+                "top_margin": _int(spec, "top_margin", where, default=20),
+                "format": fmt,
+            }
+        raise ValueError(f"{where} 未知的区块类型: {kind!r}，可选: bar / row / separator / news")
+
+    def plan(self, width: int, scale: float) -> DrawPlan:
+        """获取指定宽度与缩放下的绘制计划（首次使用时生成并缓存）"""
+        key = (width, scale)
+        plan = self._plans.get(key)
+        if plan is None:
+            with self._lock:
+                plan = self._plans.get(key)
+                if plan is None:
+                    plan = self._plans[key] = DrawPlan(self, width, scale)
+        return plan
+
+
+def load_template_file(path: str) -> NewsTemplate:
+    """读取并编译模板文件，格式错误时抛出 ValueError"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext == ".json":
+            spec = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("未安装 PyYAML，无法读取 YAML 模板") from None
+            spec = yaml.safe_load(f)
+    return NewsTemplate(spec, source=path)
+
+
+class TemplateRegistry:
+    """按名称管理已编译的模板：先加载内置模板，再加载用户模板目录（同名时用户模板覆盖内置模板）"""
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.templates: Dict[str, NewsTemplate] = {}
+
+    def _log(self, level: str, message: str) -> None:
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
+
+    def load_dir(self, directory: str) -> int:
+        """加载目录中的所有模板，返回成功加载的数量；单个模板出错只跳过该模板"""
+        if not os.path.isdir(directory):
+            return 0
+        loaded = 0
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(TEMPLATE_EXTENSIONS):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                template = load_template_file(path)
+            except Exception as e:
+                self._log("warning", f"[新闻图片生成] 模板 {name} 无效，已跳过: {e}")
+                continue
+            if template.name in self.templates:
+                self._log("info", f"[新闻图片生成] 模板 {template.name} 已被 {name} 覆盖")
+            self.templates[template.name] = template
+            loaded += 1
+        return loaded
+
+    def get(self, name: str) -> Optional[NewsTemplate]:
+        return self.templates.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self.templates)
+
+
+_default_registry: Optional[TemplateRegistry] = None
+
+
+def get_template_registry(logger=None) -> TemplateRegistry:
+    """进程内唯一的模板表，首次使用时加载内置模板与插件数据目录下 templates/ 中的用户模板"""
+    global _default_registry
+    if _default_registry is None:
+        try:
+            from .config import get_plugin_data_dir
+        except ImportError:
+            from config import get_plugin_data_dir
+        registry = TemplateRegistry(logger)
+        registry.load_dir(BUILTIN_TEMPLATE_DIR)
+        if registry.get(DEFAULT_TEMPLATE_NAME) is None:
+            raise RuntimeError(f"内置模板缺失或无效: {os.path.join(BUILTIN_TEMPLATE_DIR, DEFAULT_TEMPLATE_NAME)}.json")
+        registry.load_dir(os.path.join(get_plugin_data_dir(), "templates"))
+        _default_registry = registry
+    elif logger is not None and _default_registry.logger is None:
+        _default_registry.logger = logger
+    return _default_registry
@@ -0,0 +1,83 @@
+"""
+文本早报
+每种文本模板一次拼接生成整段文字，并按（内容指纹, 模板）缓存，推送给多个群组时只生成一次
+"""
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+try:
+    from .news_payload import NewsPayload
+except ImportError:
+    from news_payload import NewsPayload
+
+DEFAULT_TEXT_TEMPLATE = "full"
+TEXT_CACHE_SIZE = 16  # 缓存的文本份数（每期早报 × 每种模板一份）
+
+# markdown 模板中需要转义的字符，避免新闻内容被误解析为格式
+_MARKDOWN_SPECIAL_RE = re.compile(r"([\\`*_\[\]])")
+
+
+def _render_full(payload: NewsPayload) -> str:
+    """完整版：标题、编号新闻、今日提示与数据来源"""
+    lines = [f"【每日60秒早报】{payload.date}", ""]
+    lines.extend(f"{i}. {item}" for i, item in enumerate(payload.news, 1))
+    lines.append("")
+    lines.append(f"【今日提示】{payload.tip}")
+    lines.append("数据来源: 每日60秒早报")
+    return "\n".join(lines)
+
+
+def _render_compact(payload: NewsPayload) -> str:
+    """精简版：不留空行、不带数据来源，适合对消息长度敏感的平台"""
+    lines = [f"【60秒早报】{payload.date}"]
+    lines.extend(f"{i}.{item}" for i, item in enumerate(payload.news, 1))
+    if payload.tip:
+        lines.append(f"💡{payload.tip}")
+    return "\n".join(lines)
+
+
+def _escape_markdown(text: str) -> str:
+    return _MARKDOWN_SPECIAL_RE.sub(r"\\\1", text)
+
+
+def _render_markdown(payload: NewsPayload) -> str:
+    """Markdown 版：供支持 Markdown 的平台使用，新闻内容中的格式字符会被转义"""
+    lines = [f"**每日60秒早报** {payload.date}", ""]
+    lines.extend(f"{i}. {_escape_markdown(item)}" for i, item in enumerate(payload.news, 1))
+    if payload.tip:
+        lines.append("")
+        lines.append(f"> {_escape_markdown(payload.tip)}")
+    lines.append("")
+    lines.append("_数据来源: 每日60秒早报_")
+    return "\n".join(lines)
+
+
+TEXT_TEMPLATES: Dict[str, Callable[[NewsPayload], str]] = {
+    "full": _render_full,
+    "compact": _render_compact,
+    "markdown": _render_markdown,
+}
+
+
+class NewsTextFormatter:
+    """按模板生成早报文本，并缓存最近生成的结果"""
+
+    def __init__(self, cache_size: int = TEXT_CACHE_SIZE):
+        self.cache_size = max(1, int(cache_size))
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def format(self, payload: NewsPayload, template: str = DEFAULT_TEXT_TEMPLATE) -> str:
+        """生成早报文本；未知模板抛出 ValueError"""
+        render = TEXT_TEMPLATES.get(template)
+        if render is None:
+            raise ValueError(f"未知的文本模板: {template}，可选: {', '.join(TEXT_TEMPLATES)}")
+        key = (payload.fingerprint, template)
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+            return text
+        text = self._cache[key] = render(payload)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
@@ -0,0 +1,158 @@
+"""
+早报数据源
+内置 60s 接口、本地 JSON 文件、RSS 三种数据源；除 60s 外的数据源在配置使用时才会导入
+"""
+import re
+import asyncio
+import importlib
+from typing import Dict, List, Optional, Tuple, Type
+
+import aiohttp
+
+from .base import NewsProvider
+
+try:
+    from ..news_payload import NewsPayload
+except ImportError:
+    from news_payload import NewsPayload
+
+# 类型名 -> "模块:类名"，按需导入
+PROVIDER_TYPES: Dict[str, str] = {
+    "60s": "sixty_seconds:SixtySecondsProvider",
+    "local_json": "local_json:LocalJsonProvider",
+    "rss": "rss:RSSProvider",
+}
+
+_provider_classes: Dict[str, Type[NewsProvider]] = {}
+
+# 去重时忽略的字符：空白、常见中英文标点
+_DEDUP_STRIP_RE = re.compile(r"[\s　-〿＀-￯!-/:-@\[-`{-~]+")
+# 新闻开头的编号，如 "1. " "12、"
+_LEADING_NUMBER_RE = re.compile(r"^\s*\d+\s*[.、．)]\s*")
+
+
+def load_provider_class(kind: str) -> Type[NewsProvider]:
+    """按类型名导入数据源类，未知类型抛出 ValueError"""
+    if kind in _provider_classes:
+        return _provider_classes[kind]
+    spec = PROVIDER_TYPES.get(kind)
+    if not spec:
+        raise ValueError(f"未知的数据源类型: {kind}，可选: {', '.join(PROVIDER_TYPES)}")
+    module_name, class_name = spec.split(":")
+    module = importlib.import_module(f".{module_name}", __name__)
+    _provider_classes[kind] = getattr(module, class_name)
+    return _provider_classes[kind]
+
+
+def parse_provider_spec(spec: str) -> Tuple[str, str, Dict[str, str]]:
+    """
+    解析数据源配置: '类型:目标|priority=1|timeout=5'
+    如 'rss:http://127.0.0.1:8080/feed.xml|timeout=5'、'local_json:/data/news.json'
+    """
+    head, *options = spec.split("|")
+    kind, sep, target = head.strip().partition(":")
+    if not sep or not kind or not target.strip():
+        raise ValueError(f"数据源格式错误: {spec} (应为 '类型:目标')")
+    parsed_options = {}
+    for option in options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"数据源参数格式错误: {option} (应为 key=value)")
+        parsed_options[key.strip()] = value.strip()
+    return kind.strip(), target.strip(), parsed_options
+
+
+def build_provider(spec: str, logger, default_priority: int) -> NewsProvider:
+    kind, target, options = parse_provider_spec(spec)
+    provider_cls = load_provider_class(kind)
+    priority = int(options.get("priority", default_priority))
+    timeout = float(options["timeout"]) if "timeout" in options else None
+    return provider_cls(target, logger, priority=priority, timeout=timeout)
+
+
+def _dedup_key(item: str) -> str:
+    return _DEDUP_STRIP_RE.sub("", _LEADING_NUMBER_RE.sub("", item)).lower()
+
+
+def merge_payloads(primary: NewsPayload, others: List[NewsPayload]) -> NewsPayload:
+    """把同一天其他数据源的新闻追加到主数据源之后，忽略标点/空白/编号差异后去重"""
+    seen = {_dedup_key(item) for item in primary.news}
+    news = list(primary.news)
+    for payload in others:
+        if payload.date != primary.date:
+            continue
+        for item in payload.news:
+            key = _dedup_key(item)
+            if key and key not in seen:
+                seen.add(key)
+                news.append(item)
+    if len(news) == len(primary.news):
+        return primary
+    return NewsPayload(
+        date=primary.date,
+        news=tuple(news),
+        tip=primary.tip,
+        image=primary.image,
+        day_of_week=primary.day_of_week,
+        lunar_date=primary.lunar_date,
+    )
+
+
+async def _fetch_one(provider: NewsProvider, session: aiohttp.ClientSession) -> Optional[NewsPayload]:
+    try:
+        if provider.timeout is None:
+            payload = await provider.fetch(session)
+        else:
+            payload = await asyncio.wait_for(provider.fetch(session), provider.timeout)
+        if payload is not None and not payload.has_standard_date:
+            provider.logger.warning(
+                f"[每日早报] 数据源 {provider.name} 返回的日期无法识别，按原文使用（不存档、不本地绘制）: {payload.date}"
+            )
+        return payload
+    except asyncio.TimeoutError:
+        provider.logger.warning(f"[每日早报] 数据源 {provider.name} 超时 ({provider.timeout}秒)")
+    except Exception as e:
+        provider.logger.warning(f"[每日早报] 数据源 {provider.name} 获取失败: {e}")
+    return None
+
+
+async def fetch_from_providers(
+    providers: List[NewsProvider], session: aiohttp.ClientSession, merge: bool = False
+) -> Optional[NewsPayload]:
+    """
+    并发请求所有数据源
+    - merge=False：优先级最高的成功结果一经确定（更高优先级的都已失败）立即返回，其余请求取消
+    - merge=True：等待全部数据源结束，以优先级最高的结果为主，合并其余同日期数据源的新闻
+    """
+    if not providers:
+        return None
+    ordered = sorted(providers, key=lambda p: p.priority)
+    tasks = [asyncio.ensure_future(_fetch_one(p, session)) for p in ordered]
+    try:
+        if merge:
+            results = await asyncio.gather(*tasks)
+            successes = [r for r in results if r]
+            if not successes:
+                return None
+            return merge_payloads(successes[0], successes[1:])
+
+        for task in tasks:
+            result = await task
+            if result:
+                return result
+        return None
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+__all__ = [
+    "NewsProvider",
+    "PROVIDER_TYPES",
+    "load_provider_class",
+    "parse_provider_spec",
+    "build_provider",
+    "merge_payloads",
+    "fetch_from_providers",
+]
@@ -0,0 +1,36 @@
+from typing import Optional
+
+import aiohttp
+
+try:
+    from ..news_payload import NewsPayload
+except ImportError:
+    from news_payload import NewsPayload
+
+
+class NewsProvider:
+    """
+    早报数据源基类
+    子类设置 kind（配置中的类型名），实现 fetch()；priority 越小优先级越高
+    """
+
+    kind = ""
+    default_timeout: Optional[float] = 12.0  # None 表示不额外限制，由数据源自身的请求超时兜底
+
+    def __init__(self, target: str, logger, priority: int = 0, timeout: Optional[float] = None):
+        self.target = target
+        self.logger = logger
+        self.priority = priority
+        self.timeout = timeout if timeout is not None else self.default_timeout
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}:{self.target}"
+
+    async def fetch(self, session: aiohttp.ClientSession) -> Optional[NewsPayload]:
+        """获取一期早报，失败返回 None（不抛出异常）"""
+        raise NotImplementedError
+
+    async def health_check(self, session: aiohttp.ClientSession) -> None:
+        """后台健康检查，默认无操作"""
+        return None
@@ -0,0 +1,40 @@
+import os
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from .base import NewsProvider
+
+try:
+    from ..news_payload import NewsPayload, parse_news_payload
+except ImportError:
+    from news_payload import NewsPayload, parse_news_payload
+
+
+class LocalJsonProvider(NewsProvider):
+    """
+    本地 JSON 文件数据源，文件结构与 60s 接口一致（{data: {date, news, tip}} 或直接 {date, news, tip}）
+    适合人工编辑的早报或由其他程序定时生成的文件
+    """
+
+    kind = "local_json"
+    default_timeout = 3.0
+
+    def _read(self) -> bytes:
+        with open(self.target, "rb") as f:
+            return f.read()
+
+    async def fetch(self, session: aiohttp.ClientSession) -> Optional[NewsPayload]:
+        if not os.path.isfile(self.target):
+            self.logger.warning(f"[每日早报] 本地早报文件不存在: {self.target}")
+            return None
+        try:
+            raw = await asyncio.to_thread(self._read)
+        except OSError as e:
+            self.logger.warning(f"[每日早报] 读取本地早报文件失败: {e}")
+            return None
+        payload = parse_news_payload(raw)
+        if payload is None:
+            self.logger.warning(f"[每日早报] 本地早报文件结构异常: {self.target}")
+        return payload
@@ -0,0 +1,65 @@
+import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from xml.etree import ElementTree
+
+import aiohttp
+
+from .base import NewsProvider
+
+try:
+    from ..news_payload import NewsPayload
+except ImportError:
+    from news_payload import NewsPayload
+
+MAX_RSS_ITEMS = 30  # 最多取前多少条
+
+
+class RSSProvider(NewsProvider):
+    """
+    RSS 2.0 数据源：每个 <item> 的标题作为一条新闻，日期取最新一条的 pubDate（缺失时为今天）
+    频道的 <description> 作为“一言”
+    """
+
+    kind = "rss"
+    default_timeout = 10.0
+
+    def _parse(self, raw: bytes) -> Optional[NewsPayload]:
+        channel = ElementTree.fromstring(raw).find("channel")
+        if channel is None:
+            return None
+
+        news = []
+        dates = []
+        for item in channel.findall("item")[:MAX_RSS_ITEMS]:
+            title = (item.findtext("title") or "").strip()
+            if title:
+                news.append(title)
+            pub_date = item.findtext("pubDate")
+            if pub_date:
+                try:
+                    dates.append(parsedate_to_datetime(pub_date.strip()).date())
+                except (TypeError, ValueError):
+                    pass
+
+        edition_date = max(dates) if dates else datetime.date.today()
+        return NewsPayload.from_raw({
+            "date": edition_date.isoformat(),
+            "news": news,
+            "tip": channel.findtext("description") or "",
+        })
+
+    async def fetch(self, session: aiohttp.ClientSession) -> Optional[NewsPayload]:
+        try:
+            async with session.get(self.target) as response:
+                if response.status != 200:
+                    self.logger.warning(f"[每日早报] RSS 返回错误代码: {response.status} ({self.target})")
+                    return None
+                raw = await response.read()
+            payload = self._parse(raw)
+        except Exception as e:
+            self.logger.warning(f"[每日早报] 从 RSS {self.target} 获取数据时出错: {e}")
+            return None
+        if payload is None:
+            self.logger.warning(f"[每日早报] RSS 结构异常，已跳过: {self.target}")
+        return payload
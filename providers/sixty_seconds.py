@@ -0,0 +1,78 @@
+import time
+import asyncio
+from typing import List, Optional
+
+import aiohttp
+
+from .base import NewsProvider
+
+try:
+    from ..mirror_health import MirrorPool
+    from ..news_payload import NewsPayload, parse_news_payload
+except ImportError:
+    from mirror_health import MirrorPool
+    from news_payload import NewsPayload, parse_news_payload
+
+
+class SixtySecondsProvider(NewsProvider):
+    """
+    60s 早报接口（及兼容接口），按顺序尝试镜像并跳过已熔断的镜像
+    target 为逗号分隔的镜像地址
+    """
+
+    kind = "60s"
+    default_timeout = None  # 每个镜像请求已有超时，整体不再额外限制
+
+    def __init__(self, target: str, logger, priority: int = 0, timeout: Optional[float] = None, pool: Optional[MirrorPool] = None):
+        super().__init__(target, logger, priority, timeout)
+        self.pool = pool or MirrorPool([url.strip() for url in target.split(",") if url.strip()])
+
+    @property
+    def urls(self) -> List[str]:
+        return list(self.pool.mirrors)
+
+    def _record_failure(self, url: str, error: str, start: float) -> None:
+        if self.pool.record_failure(url, error, time.monotonic() - start):
+            self.logger.warning(f"[每日早报] 镜像 {url} 连续失败，已熔断，冷却后再探测")
+
+    async def _request(self, session: aiohttp.ClientSession, url: str) -> Optional[NewsPayload]:
+        """请求单个镜像并记录健康状态；其他请求正在对该镜像做半开探测时跳过，返回 None"""
+        if not self.pool.begin_request(url):
+            self.logger.debug(f"[每日早报] 镜像 {url} 正在探测中，本次跳过")
+            return None
+        start = time.monotonic()
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    self.logger.warning(f"[每日早报] API返回错误代码: {response.status} ({url})")
+                    self._record_failure(url, f"HTTP {response.status}", start)
+                    return None
+                payload = parse_news_payload(await response.read())
+        except Exception as e:
+            self.logger.warning(f"[每日早报] 从 {url} 获取数据时出错: {e}")
+            self._record_failure(url, type(e).__name__, start)
+            return None
+
+        if payload is None:
+            self.logger.warning(f"[每日早报] API返回结构异常，已跳过: {url}")
+            self._record_failure(url, "返回结构异常", start)
+            return None
+        self.pool.record_success(url, time.monotonic() - start)
+        return payload
+
+    async def fetch(self, session: aiohttp.ClientSession) -> Optional[NewsPayload]:
+        for mirror in self.pool.select():
+            payload = await self._request(session, mirror.url)
+            if payload:
+                return payload
+        return None
+
+    async def health_check(self, session: aiohttp.ClientSession) -> None:
+        """对冷却结束的熔断镜像做半开探测，使其在下次推送前恢复"""
+        due = self.pool.due_for_probe()
+        if not due:
+            return
+        results = await asyncio.gather(*(self._request(session, m.url) for m in due))
+        for mirror, payload in zip(due, results):
+            if payload:
+                self.logger.info(f"[每日早报] 镜像 {mirror.url} 探测成功，已恢复")
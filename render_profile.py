@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+# --- 输出格式 ---
+SUPPORTED_FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+
+# --- 取值范围 ---
+MIN_WIDTH, MAX_WIDTH = 720, 2000  # 宽度过小时日期区域的农历、标题、公历会重叠
+MIN_SCALE, MAX_SCALE = 0.25, 4.0
+
+DEFAULT_PROFILE_PREFIX = "*"  # 未单独配置的平台使用的默认档位
+
+
+@dataclass(frozen=True, slots=True)
+class RenderProfile:
+    """
+    本地绘制的输出档位
+    - width: 排版宽度（换行以此为准），scale: 整体缩放倍数，输出图片宽度为 width * scale
+    - format / quality: 编码格式与质量（PNG 忽略 quality）
+    """
+
+    width: int = 1000
+    scale: float = 1.0
+    format: str = "PNG"
+    quality: int = 88
+
+    @property
+    def key(self) -> str:
+        """档位标识，用于图片缓存/存档区分不同档位"""
+        if self.format == "PNG":
+            return f"{self.width}x{self.scale:g}.png"
+        return f"{self.width}x{self.scale:g}.{self.format.lower()}{self.quality}"
+
+    @property
+    def layout_key(self) -> Tuple[int, float]:
+        """排版只取决于宽度与缩放，格式不同的档位可以共用同一张画布"""
+        return self.width, self.scale
+
+
+DEFAULT_PROFILE = RenderProfile()
+
+
+def parse_render_profile(spec: str) -> Tuple[str, RenderProfile]:
+    """
+    解析输出档位配置: '平台前缀|width=800|scale=1.5|format=jpeg|quality=85'
+    平台前缀为群组ID的第一段（如 'aiocqhttp'、'telegram'），'*' 表示默认档位；未写的参数使用默认值
+    """
+    head, *options = spec.split("|")
+    prefix = head.strip()
+    if not prefix or ":" in prefix:
+        raise ValueError(f"输出档位格式错误: {spec} (应为 '平台前缀|key=value')")
+
+    values = {}
+    for option in options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"输出档位参数格式错误: {option} (应为 key=value)")
+        values[key.strip()] = value.strip()
+    unknown = set(values) - {"width", "scale", "format", "quality"}
+    if unknown:
+        raise ValueError(f"未知的输出档位参数: {', '.join(sorted(unknown))}")
+
+    width = int(values.get("width", DEFAULT_PROFILE.width))
+    scale = float(values.get("scale", DEFAULT_PROFILE.scale))
+    image_format = SUPPORTED_FORMATS.get(values.get("format", DEFAULT_PROFILE.format).lower())
+    quality = int(values.get("quality", DEFAULT_PROFILE.quality))
+    if not MIN_WIDTH <= width <= MAX_WIDTH:
+        raise ValueError(f"width 应在 {MIN_WIDTH}~{MAX_WIDTH} 之间: {width}")
+    if not MIN_SCALE <= scale <= MAX_SCALE:
+        raise ValueError(f"scale 应在 {MIN_SCALE:g}~{MAX_SCALE:g} 之间: {scale}")
+    if image_format is None:
+        raise ValueError(f"不支持的图片格式: {values['format']}，可选: png / jpeg / webp")
+    if not 1 <= quality <= 100:
+        raise ValueError(f"quality 应在 1~100 之间: {quality}")
+    return prefix, RenderProfile(width=width, scale=scale, format=image_format, quality=quality)
+
+
+def select_profile(profiles: Dict[str, RenderProfile], origin: str) -> RenderProfile:
+    """按群组ID（或消息来源）的平台前缀选择输出档位"""
+    prefix = origin.split(":", 1)[0] if isinstance(origin, str) else ""
+    profile = profiles.get(prefix) or profiles.get(DEFAULT_PROFILE_PREFIX)
+    return profile or DEFAULT_PROFILE
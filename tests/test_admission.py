@@ -0,0 +1,112 @@
+import asyncio
+
+from admission import AdmissionController, Rejection
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_user_cooldown():
+    clock = FakeClock()
+    controller = AdmissionController(user_cooldown=10, clock=clock)
+    assert controller.try_acquire("u1", "g1") is None
+    controller.release()
+
+    clock.now += 4
+    rejection = controller.try_acquire("u1", "g1")
+    assert rejection == Rejection("cooldown", 6.0, True)
+    # 冷却期内只提示一次
+    assert controller.try_acquire("u1", "g1").notify is False
+    # 其他用户不受影响
+    assert controller.try_acquire("u2", "g1") is None
+    controller.release()
+
+    clock.now += 6
+    assert controller.try_acquire("u1", "g1") is None
+    assert controller.stats.admitted == 3
+    assert controller.stats.rejected_cooldown == 2
+
+
+def test_group_cooldown_applies_to_every_user():
+    clock = FakeClock()
+    controller = AdmissionController(group_cooldown=30, clock=clock)
+    assert controller.try_acquire("u1", "g1") is None
+    assert controller.try_acquire("u2", "g1").reason == "cooldown"
+    assert controller.try_acquire("u3", "g2") is None
+
+
+def test_max_concurrent():
+    controller = AdmissionController(max_concurrent=2, clock=FakeClock())
+    assert controller.try_acquire("u1", "g") is None
+    assert controller.try_acquire("u2", "g") is None
+    assert controller.try_acquire("u3", "g") == Rejection("busy")
+    controller.release()
+    assert controller.try_acquire("u3", "g") is None
+    assert controller.stats.rejected_busy == 1
+
+
+def test_concurrent_requests_collapse_into_one_fetch():
+    controller = AdmissionController()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "news"
+
+    async def main():
+        results = await asyncio.gather(*(controller.collapse("news", fetch) for _ in range(5)))
+        # 完成后再次请求会启动新的工作
+        again = await controller.collapse("news", fetch)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert results == ["news"] * 5
+    assert again == "news"
+    assert calls == 2
+    assert controller.stats.collapsed == 4
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    controller = AdmissionController()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(controller.collapse("k", fetch))
+        second = asyncio.ensure_future(controller.collapse("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 42
+
+
+def test_collapsed_failure_reaches_every_waiter():
+    controller = AdmissionController()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            controller.collapse("k", fetch), controller.collapse("k", fetch), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_rejection_messages():
+    assert Rejection("cooldown", 6.0).message == "⏳ 请求过于频繁，请 7 秒后再试"
+    assert Rejection("cooldown", 0.2).message == "⏳ 请求过于频繁，请 1 秒后再试"
+    assert Rejection("busy").message == "⏳ 当前获取早报的请求较多，请稍后再试"
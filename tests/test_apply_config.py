@@ -0,0 +1,129 @@
+import asyncio
+import importlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("astrbot")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def plugin_module(tmp_path, monkeypatch):
+    """以包的形式导入插件（main.py 使用相对导入），数据目录换成临时目录"""
+    monkeypatch.syspath_prepend(os.path.dirname(REPO_DIR))
+    package = os.path.basename(REPO_DIR)
+    main = importlib.import_module(f"{package}.main")
+    config = importlib.import_module(f"{package}.config")
+    monkeypatch.setattr(config, "get_plugin_data_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(main, "get_plugin_data_dir", lambda: str(tmp_path))
+    return main
+
+
+BASE_CONFIG = {
+    "target_groups": ["qq:GroupMessage:1"],
+    "push_time": "08:00",
+    "use_local_image_draw": False,
+    "health_check_interval": 0,
+    "manual_user_cooldown": 10,
+}
+
+
+class FakeContext:
+    async def send_message(self, origin, chain):
+        return True
+
+
+def run_with_plugin(plugin_module, scenario, **extra):
+    async def runner():
+        plugin = plugin_module.DailyNewsPlugin(FakeContext(), dict(BASE_CONFIG, **extra))
+        try:
+            await scenario(plugin)
+        finally:
+            await plugin.terminate()
+
+    asyncio.run(runner())
+
+
+def test_push_time_change_reschedules(plugin_module):
+    async def scenario(plugin):
+        daily_task = plugin._daily_task
+        assert daily_task is not None
+
+        changed = await plugin.apply_config(dict(BASE_CONFIG, show_text_news=True))
+        assert changed == ["show_text_news"]
+        assert plugin._daily_task is daily_task
+
+        await plugin.apply_config(dict(BASE_CONFIG, show_text_news=True, push_time="09:30"))
+        await asyncio.sleep(0)
+        assert plugin.push_time == "09:30"
+        assert (plugin.push_hour, plugin.push_minute) == (9, 30)
+        assert plugin._daily_task is not daily_task
+        assert daily_task.cancelled()
+
+    run_with_plugin(plugin_module, scenario)
+
+
+def test_groups_and_render_profiles_apply_live(plugin_module):
+    async def scenario(plugin):
+        groups = ["qq:GroupMessage:1", "aiocqhttp:GroupMessage:2"]
+        new_config = dict(BASE_CONFIG, target_groups=groups, render_profiles=["aiocqhttp|format=jpeg|quality=80"])
+        changed = await plugin.apply_config(new_config)
+        assert changed == ["render_profiles", "target_groups"]
+        assert plugin.target_groups == groups
+        assert plugin.render_profiles["aiocqhttp"].format == "JPEG"
+        assert plugin.config["target_groups"] == groups
+        # 再次应用相同配置没有变化
+        assert await plugin.apply_config(new_config) == []
+
+    run_with_plugin(plugin_module, scenario)
+
+
+def test_invalid_value_keeps_previous_and_applies_the_rest(plugin_module):
+    async def scenario(plugin):
+        groups = ["qq:GroupMessage:1", "qq:GroupMessage:2"]
+        changed = await plugin.apply_config(dict(BASE_CONFIG, target_groups=groups, manual_user_cooldown="abc"))
+        assert changed == ["target_groups"]
+        assert plugin.target_groups == groups
+        assert plugin.admission.user_cooldown == 10
+
+        # 改正后生效
+        assert await plugin.apply_config(dict(BASE_CONFIG, target_groups=groups, manual_user_cooldown="30")) == [
+            "manual_user_cooldown"
+        ]
+        assert plugin.admission.user_cooldown == 30
+
+    run_with_plugin(plugin_module, scenario)
+
+
+def test_empty_archive_days_uses_default(plugin_module):
+    async def scenario(plugin):
+        changed = await plugin.apply_config(dict(BASE_CONFIG, archive_max_days="", memory_budget_mb=64))
+        assert changed == ["archive_max_days", "memory_budget_mb"]
+        assert plugin.archive.max_days == 30
+        assert plugin.memory_budget.budget == 64 * 1024 * 1024
+
+    run_with_plugin(plugin_module, scenario, archive_max_days=7)
+
+
+def test_failed_apply_is_retried(plugin_module):
+    async def scenario(plugin):
+        build_providers = plugin._build_providers
+
+        def broken(raw_specs):
+            raise RuntimeError("boom")
+
+        plugin._build_providers = broken
+        new_config = dict(BASE_CONFIG, news_providers=["rss:https://example.com/feed"], manual_user_cooldown=30)
+        with pytest.raises(RuntimeError):
+            await plugin.apply_config(new_config)
+        # 未记录为已应用，下次检查时同样的配置仍会完整应用一次
+        assert plugin._applied_config == BASE_CONFIG
+
+        plugin._build_providers = build_providers
+        assert await plugin.apply_config(new_config) == ["manual_user_cooldown", "news_providers"]
+        assert plugin.admission.user_cooldown == 30
+
+    run_with_plugin(plugin_module, scenario)
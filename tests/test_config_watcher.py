@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from config import ConfigWatcher, int_setting, invalid_settings
+
+
+def _write(path, config, mtime_ns=None):
+    path.write_text(json.dumps(config), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def watched(tmp_path):
+    path = tmp_path / "astrbot_plugin_morning_news_config.json"
+    config = {"push_time": "08:00", "target_groups": []}
+    _write(path, config, 1_000_000_000)
+    return path, ConfigWatcher(str(path), dict(config))
+
+
+def test_unchanged_stamp_skips_reading(watched):
+    path, watcher = watched
+    # 修改时间与大小都未变时不读取文件（写入等长的无效内容验证）
+    path.write_text("x" * path.stat().st_size, encoding="utf-8")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert watcher.poll() is None
+
+
+def test_same_content_returns_none(watched):
+    path, watcher = watched
+    # 重新保存相同内容：修改时间变了，但内容与上次应用的配置相同
+    _write(path, watcher.snapshot, 2_000_000_000)
+    assert watcher.poll() is None
+    # 已确认内容相同的文件之后不再读取
+    path.write_text("x" * path.stat().st_size, encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert watcher.poll() is None
+
+
+def test_changed_content_until_committed(watched):
+    path, watcher = watched
+    new_config = {"push_time": "09:30", "target_groups": []}
+    _write(path, new_config, 2_000_000_000)
+    assert watcher.poll() == new_config
+    # 应用失败（未 commit）时下次检查重新返回
+    assert watcher.poll() == new_config
+    watcher.commit(new_config)
+    assert watcher.snapshot == new_config
+    assert watcher.poll() is None
+
+
+def test_partial_write_raises_and_retries(watched):
+    path, watcher = watched
+    path.write_text('{"push_time": "09', encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    with pytest.raises(ValueError):
+        watcher.poll()
+    _write(path, {"push_time": "09:30"}, 2_000_000_000)
+    assert watcher.poll() == {"push_time": "09:30"}
+
+
+def test_missing_file_returns_none(tmp_path):
+    watcher = ConfigWatcher(str(tmp_path / "missing.json"), {})
+    assert watcher.poll() is None
+
+
+def test_invalid_settings():
+    config = {
+        "manual_user_cooldown": "abc",
+        "manual_cache_ttl": "60",
+        "image_page_height": None,
+        "archive_max_days": "",
+        "memory_budget_mb": [1],
+    }
+    assert invalid_settings(config) == {"manual_user_cooldown": "abc", "memory_budget_mb": [1]}
+
+
+def test_int_setting_defaults_when_unset():
+    assert int_setting({}, "archive_max_days", minimum=1) == 30
+    assert int_setting({"archive_max_days": None}, "archive_max_days", minimum=1) == 30
+    assert int_setting({"archive_max_days": ""}, "archive_max_days", minimum=1) == 30
+    assert int_setting({"archive_max_days": 0}, "archive_max_days", minimum=1) == 1
+    # 0 表示关闭的配置项保持为 0
+    assert int_setting({"config_watch_interval": 0}, "config_watch_interval") == 0
+    assert int_setting({"manual_cache_ttl": "60"}, "manual_cache_ttl") == 60
+    assert int_setting({"manual_group_cooldown": -5}, "manual_group_cooldown") == 0
+    with pytest.raises(ValueError):
+        int_setting({"manual_user_cooldown": "abc"}, "manual_user_cooldown")
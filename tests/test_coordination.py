@@ -0,0 +1,105 @@
+import asyncio
+import collections
+import logging
+
+import pytest
+
+from coordination import SqliteCoordinator, run_slot, takeover_shards
+
+logger = logging.getLogger("test_coordination")
+GROUPS = [f"qq:GroupMessage:{i}" for i in range(10)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Crash(Exception):
+    """模拟节点在推送中途崩溃"""
+
+
+def make_push(sent, crash_after=None):
+    async def push(groups, after_group):
+        for group_id in groups:
+            if crash_after is not None and len(sent) >= crash_after:
+                raise Crash()
+            sent.append(group_id)
+            if not await after_group(group_id, True):
+                return
+
+    return push
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "coordination.db")
+    a = SqliteCoordinator(path, "a", lease=10, clock=clock)
+    b = SqliteCoordinator(path, "b", lease=10, clock=clock)
+    a.heartbeat()
+    b.heartbeat()
+    return clock, a, b
+
+
+def test_takeover_after_crash_mid_shard(nodes):
+    clock, a, b = nodes
+    sent_a, sent_b = [], []
+
+    # a 领取第一个分片，推送 2 个群组后崩溃，分片仍由 a 持有
+    with pytest.raises(Crash):
+        asyncio.run(run_slot(a, "slot", GROUPS, make_push(sent_a, crash_after=2), logger))
+    assert len(sent_a) == 2
+
+    # b 推送完自己的分片后立即返回，不等待 a 的租约过期
+    assert asyncio.run(run_slot(b, "slot", GROUPS, make_push(sent_b), logger)) == len(GROUPS) // 2
+    assert b.pending_shards("slot") == 1
+    # 租约未过期时没有可接管的分片
+    assert asyncio.run(takeover_shards(b, "slot", make_push(sent_b), logger)) == 0
+
+    clock.now += a.lease + 1
+    assert asyncio.run(takeover_shards(b, "slot", make_push(sent_b), logger)) == len(GROUPS) // 2 - 2
+    assert b.pending_shards("slot") == 0
+
+    counts = collections.Counter(sent_a + sent_b)
+    assert set(counts) == set(GROUPS)
+    assert max(counts.values()) == 1
+
+
+def test_lease_lost_stops_pushing(nodes):
+    clock, a, b = nodes
+    sent_a, sent_b = [], []
+    a.open_slot("slot", GROUPS)
+    shard = a.claim_shard("slot")
+    assert a.record(shard, shard.groups[0], True)
+    sent_a.append(shard.groups[0])
+
+    # a 卡住超过租约，分片被 b 接管后 a 的记录失败，不再继续推送
+    clock.now += a.lease + 1
+    asyncio.run(run_slot(b, "slot", GROUPS, make_push(sent_b), logger))
+    assert not a.record(shard, shard.groups[1], True)
+
+    counts = collections.Counter(sent_a + sent_b)
+    assert set(counts) == set(GROUPS)
+    assert max(counts.values()) == 1
+
+
+def test_bounded_wait_takes_over_expired_lease(tmp_path):
+    path = str(tmp_path / "coordination.db")
+    a = SqliteCoordinator(path, "a", lease=0.2)
+    b = SqliteCoordinator(path, "b", lease=0.2)
+    a.heartbeat()
+    b.heartbeat()
+    sent_a, sent_b = [], []
+    with pytest.raises(Crash):
+        asyncio.run(run_slot(a, "slot", GROUPS, make_push(sent_a, crash_after=1), logger))
+
+    # 最多等待 2 倍租约，期间 a 的租约过期，由 b 直接接管
+    asyncio.run(run_slot(b, "slot", GROUPS, make_push(sent_b), logger, takeover_wait=2 * b.lease))
+    assert b.pending_shards("slot") == 0
+    counts = collections.Counter(sent_a + sent_b)
+    assert set(counts) == set(GROUPS)
+    assert max(counts.values()) == 1
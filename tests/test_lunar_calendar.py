@@ -0,0 +1,48 @@
+import datetime
+
+import pytest
+
+from lunar_calendar import LunarDate, format_lunar_date, to_lunar
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        (datetime.date(1900, 1, 31), "庚子年正月初一"),
+        (datetime.date(2023, 3, 22), "癸卯年闰二月初一"),
+        (datetime.date(2025, 7, 25), "乙巳年闰六月初一"),
+        (datetime.date(2026, 1, 15), "乙巳年十一月廿七"),
+        (datetime.date(2033, 12, 22), "癸丑年闰十一月初一"),
+    ],
+)
+def test_reference_dates(date, expected):
+    assert format_lunar_date(date) == expected
+
+
+@pytest.mark.parametrize(
+    "date",
+    [
+        datetime.date(1899, 12, 31),
+        datetime.date(1900, 1, 30),
+        datetime.date(2101, 1, 1),
+        datetime.date(2150, 6, 1),
+    ],
+)
+def test_out_of_range_is_empty(date):
+    assert to_lunar(date) is None
+    assert format_lunar_date(date) == ""
+
+
+def test_last_supported_day():
+    assert format_lunar_date(datetime.date(2100, 12, 31)) != ""
+
+
+def test_accepts_datetime():
+    assert format_lunar_date(datetime.datetime(2026, 1, 15, 8, 0)) == "乙巳年十一月廿七"
+
+
+def test_leap_month_and_zodiac():
+    lunar = to_lunar(datetime.date(2023, 3, 22))
+    assert lunar == LunarDate(2023, 2, 1, True)
+    assert lunar.ganzhi_year == "癸卯"
+    assert lunar.zodiac == "兔"
@@ -0,0 +1,161 @@
+import asyncio
+import re
+import tracemalloc
+import types
+from collections import OrderedDict
+
+import pytest
+
+from memory_budget import MB, MemoryBudget, images_bytes
+
+
+class ListLogger:
+    def __init__(self):
+        self.records = []
+
+    def info(self, message):
+        self.records.append(("info", message))
+
+    def warning(self, message):
+        self.records.append(("warning", message))
+
+
+def _cache(*sizes_mb):
+    return OrderedDict((f"edition{i}", ["x" * int(size * MB)]) for i, size in enumerate(sizes_mb))
+
+
+def _cached_bytes(image_cache):
+    return sum(images_bytes(images) for images in image_cache.values())
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    """真实的绘制模块，保留的画布换成指定大小的灰度图"""
+    pytest.importorskip("PIL")
+    import news_image_generator
+
+    monkeypatch.setattr(news_image_generator, "_last_rendered", {})
+    return news_image_generator
+
+
+def _retain(renderer, key, size_mb):
+    from PIL import Image
+
+    image = Image.new("L", (1024, int(size_mb * 1024)))
+    renderer._last_rendered[key] = types.SimpleNamespace(image=image)
+
+
+def test_trim_releases_oldest_canvases_first(renderer):
+    for key in ("a", "b", "c"):
+        _retain(renderer, key, 0.5)
+    image_cache = _cache(0.25)
+    budget = MemoryBudget(budget_mb=1)
+
+    freed = budget.trim(image_cache, renderer)
+    assert _cached_bytes(image_cache) + renderer.retained_canvas_bytes() <= budget.budget
+    assert freed == 1 * MB
+    assert list(renderer._last_rendered) == ["c"]
+    # 画布释放后已在预算内，图片缓存不受影响
+    assert list(image_cache) == ["edition0"]
+
+
+def test_release_canvases_honors_limit(renderer):
+    for key in ("a", "b", "c", "d"):
+        _retain(renderer, key, 0.25)
+    assert renderer.release_canvases(int(0.5 * MB)) == int(0.5 * MB)
+    assert renderer.retained_canvas_bytes() == int(0.5 * MB)
+    assert list(renderer._last_rendered) == ["c", "d"]
+    assert renderer.release_canvases() == int(0.5 * MB)
+    assert renderer.retained_canvas_bytes() == 0
+
+
+def test_trim_evicts_least_recently_used_images(renderer):
+    _retain(renderer, "a", 0.5)
+    image_cache = _cache(0.5, 0.5, 0.5, 0.5)
+    budget = MemoryBudget(budget_mb=1)
+
+    budget.trim(image_cache, renderer)
+    assert renderer.retained_canvas_bytes() == 0
+    assert list(image_cache) == ["edition2", "edition3"]
+    assert _cached_bytes(image_cache) <= budget.budget
+
+
+def test_trim_keeps_most_recent_entry_and_unlimited_budget():
+    image_cache = _cache(2, 3)
+    assert MemoryBudget(budget_mb=0).trim(image_cache) == 0
+    assert len(image_cache) == 2
+
+    MemoryBudget(budget_mb=1).trim(image_cache)
+    # 最近使用的一份即使超出预算也保留
+    assert list(image_cache) == ["edition1"]
+
+
+def _report_mb(report, name):
+    return float(re.search(rf"{name} \+(-?[\d.]+)MB", report).group(1))
+
+
+def test_track_reports_real_peak():
+    budget = MemoryBudget(budget_mb=4, report=True)
+    logger = ListLogger()
+
+    # 已在统计时（如其他插件开启了 tracemalloc），推送开始前的峰值不计入
+    tracemalloc.start()
+    try:
+        before = bytearray(32 * MB)
+        del before
+        with budget.track("推送", logger, lambda: None):
+            block = bytearray(8 * MB)
+            del block
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    peak = _report_mb(budget.last_report, "Python 堆峰值")
+    assert 8 <= peak < 9
+    assert _report_mb(budget.last_report, "结束时") < 1
+    assert ("warning", "[每日早报] 推送期间内存峰值超出预算 4MB") in logger.records
+
+
+def test_overlapping_tracks_keep_tracing_until_the_last_ends():
+    first = MemoryBudget(report=True)
+    second = MemoryBudget(report=True)
+    logger = ListLogger()
+    assert not tracemalloc.is_tracing()
+
+    async def push(budget, label, size_mb, started, release):
+        with budget.track(label, logger, lambda: None):
+            block = bytearray(size_mb * MB)
+            started.set()
+            await release.wait()
+            del block
+
+    async def scenario():
+        first_started, second_started = asyncio.Event(), asyncio.Event()
+        release_first, release_second = asyncio.Event(), asyncio.Event()
+        first_task = asyncio.create_task(push(first, "定时推送", 4, first_started, release_first))
+        await first_started.wait()
+        second_task = asyncio.create_task(push(second, "修订补发", 8, second_started, release_second))
+        await second_started.wait()
+
+        # 先开始的推送先结束，不能关闭仍在记录的另一次推送的统计
+        release_first.set()
+        await first_task
+        assert tracemalloc.is_tracing()
+        release_second.set()
+        await second_task
+        assert not tracemalloc.is_tracing()
+
+    asyncio.run(scenario())
+    assert 8 <= _report_mb(second.last_report, "Python 堆峰值") < 13
+    assert 12 <= _report_mb(first.last_report, "Python 堆峰值") < 13
+    assert first.last_report.endswith("（与其他推送同时进行）")
+    assert second.last_report.endswith("（与其他推送同时进行）")
+
+
+def test_track_disabled_does_nothing():
+    budget = MemoryBudget(report=False)
+    logger = ListLogger()
+    with budget.track("推送", logger, lambda: None):
+        pass
+    assert budget.last_report == ""
+    assert logger.records == []
@@ -0,0 +1,63 @@
+import mirror_health
+from mirror_health import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, MirrorPool
+
+URL = "https://mirror.example/v2/60s"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _half_open_pool(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(mirror_health.time, "monotonic", clock)
+    pool = MirrorPool([URL, "https://other.example/v2/60s"], failure_threshold=1, cooldown=300)
+    assert pool.record_failure(URL, "timeout")
+    assert pool.mirrors[URL].state == STATE_OPEN
+    assert [m.url for m in pool.select()] == ["https://other.example/v2/60s"]
+    clock.now += 300
+    return clock, pool
+
+
+def test_half_open_allows_one_probe(monkeypatch):
+    clock, pool = _half_open_pool(monkeypatch)
+    assert pool.begin_request(URL)
+    assert pool.mirrors[URL].state == STATE_HALF_OPEN
+    # 探测结果返回前，其他并发请求跳过该镜像
+    assert not pool.begin_request(URL)
+    assert not pool.begin_request(URL)
+    # 正常镜像不受限制
+    assert pool.begin_request("https://other.example/v2/60s")
+    assert pool.begin_request("https://other.example/v2/60s")
+
+    pool.record_success(URL, 0.1)
+    assert pool.mirrors[URL].state == STATE_CLOSED
+    assert pool.begin_request(URL)
+    assert pool.begin_request(URL)
+
+
+def test_failed_probe_reopens_with_longer_cooldown(monkeypatch):
+    clock, pool = _half_open_pool(monkeypatch)
+    assert pool.begin_request(URL)
+    assert pool.record_failure(URL, "timeout")
+    mirror = pool.mirrors[URL]
+    assert mirror.state == STATE_OPEN
+    assert mirror.cooldown == 600
+
+    clock.now += 600
+    assert pool.begin_request(URL)
+    assert not pool.begin_request(URL)
+
+
+def test_stuck_probe_expires(monkeypatch):
+    clock, pool = _half_open_pool(monkeypatch)
+    assert pool.begin_request(URL)
+    # 探测请求被取消、没有记录结果时，超时后允许再次探测
+    clock.now += mirror_health.PROBE_TIMEOUT - 1
+    assert not pool.begin_request(URL)
+    clock.now += 1
+    assert pool.begin_request(URL)
@@ -0,0 +1,40 @@
+import pytest
+
+from news_payload import NewsPayload, normalize_date
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "2024-05-01",
+        "2024/05/01",
+        "2024/5/1",
+        "2024.05.01",
+        "2024年5月1日",
+        "20240501",
+        "2024-05-01 08:00:00",
+        "2024-05-01T08:00:00+08:00",
+    ],
+)
+def test_common_date_formats_are_normalized(raw):
+    payload = NewsPayload.from_raw({"data": {"date": raw, "news": ["新闻"]}})
+    assert payload.date == "2024-05-01"
+    assert payload.has_standard_date
+
+
+def test_unrecognized_date_is_kept():
+    payload = NewsPayload.from_raw({"date": "五月一日", "news": ["新闻"]})
+    assert payload.date == "五月一日"
+    assert not payload.has_standard_date
+
+
+@pytest.mark.parametrize("raw", [{"date": "", "news": ["新闻"]}, {"news": ["新闻"]}, {"date": "2024-05-01", "news": []}])
+def test_missing_required_fields(raw):
+    assert NewsPayload.from_raw(raw) is None
+
+
+def test_normalize_date_rejects_invalid_dates():
+    assert normalize_date("2024-02-30") is None
+    assert normalize_date("2024-13-01") is None
+    assert normalize_date("202405011") is None
+    assert normalize_date("2024-02-29") == "2024-02-29"